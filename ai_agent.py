@@ -2,6 +2,7 @@ import os
 from openai import OpenAI
 import pandas as pd
 import json
+from metrics import CHAT_SECONDS, CHAT_FAILURES, LLM_SECONDS, LLM_TOKENS
 
 # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
 # do not change this unless explicitly requested by the user
@@ -126,6 +127,7 @@ Always maintain a helpful, educational tone while being precise with economic co
             }
         ]
 
+    @CHAT_SECONDS.timed()
     def chat(self, user_message, economic_context=None, conversation_history=None):
         """
         Main chat function that responds to user queries with economic context and autonomous actions.
@@ -157,12 +159,14 @@ Always maintain a helpful, educational tone while being precise with economic co
         
         try:
             # Make initial API call with tools enabled
-            response = openai.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=self.tools,
-                max_completion_tokens=2048
-            )
+            with LLM_SECONDS.time(model=self.model, call='initial'):
+                response = openai.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    tools=self.tools,
+                    max_completion_tokens=2048
+                )
+            self._record_usage(response)
             
             response_message = response.choices[0].message
             tool_calls = []
@@ -206,11 +210,13 @@ Always maintain a helpful, educational tone while being precise with economic co
                     })
                 
                 # Make second API call to get final response with tool results
-                final_response = openai.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_completion_tokens=2048
-                )
+                with LLM_SECONDS.time(model=self.model, call='final'):
+                    final_response = openai.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_completion_tokens=2048
+                    )
+                self._record_usage(final_response)
                 
                 final_text = final_response.choices[0].message.content
                 return final_text, tool_calls
@@ -219,8 +225,17 @@ Always maintain a helpful, educational tone while being precise with economic co
                 return response_message.content, []
                 
         except Exception as e:
+            CHAT_FAILURES.inc()
             return f"I encountered an error: {str(e)}. Please try again.", []
 
+    def _record_usage(self, response):
+        """Add a completion's token usage to the LLM token counters."""
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, model=self.model, kind='prompt')
+        LLM_TOKENS.inc(usage.completion_tokens or 0, model=self.model, kind='completion')
+
     def _format_economic_context(self, context):
         """Format economic data into a readable context string for the AI."""
         formatted = []
@@ -261,6 +276,9 @@ Always maintain a helpful, educational tone while being precise with economic co
         if 'put_call_ratio' in context:
             formatted.append(f"Put/Call Ratio: {context['put_call_ratio']:.2f}")
         
+        if 'liquidity' in context:
+            formatted.append(f"Market Liquidity: {context['liquidity']}")
+        
         if 'fear_greed_index' in context:
             formatted.append(f"Fear & Greed Index: {context['fear_greed_index']:.1f} ({context.get('fear_greed_label', 'N/A')})")
         
@@ -1,12 +1,19 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from data_fetcher import EconomicDataFetcher, MarketDataFetcher
+from data_pipeline import build_snapshots
 from business_cycle import BusinessCycleAnalyzer
+from timeseries import TimeSeries
+from indicator_panel import IndicatorPanel
+from indicator_graph import build_indicator_graph
+from circuit_breaker import breaker_states
+from rate_limiter import RateLimited, limiter_states
+from provenance import RECORDER
+from metrics import RENDER_SECONDS, start_metrics_server
+import json
 from backtesting import HistoricalBacktester
 from portfolio_positioning import PortfolioPositioner
 from watchlist import WatchlistManager
-from fear_greed_calculator import FearGreedCalculator
 from ai_agent import MacroCycleAgent
 import pandas as pd
 import os
@@ -18,95 +25,83 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-@st.cache_data(ttl=3600)
-def load_economic_data():
-    fetcher = EconomicDataFetcher()
-    return {
-        'gdp': fetcher.get_gdp_data(),
-        'inflation': fetcher.get_inflation_data(),
-        'unemployment': fetcher.get_unemployment_data(),
-        'interest_rate': fetcher.get_interest_rate_data(),
-        'm2_supply': fetcher.get_m2_supply_data(),
-        'bond_yields': fetcher.get_bond_yields(),
-        'gold_price': fetcher.get_gold_price(),
-        'bitcoin_price': fetcher.get_bitcoin_price(),
-        'dxy': fetcher.get_dxy_data(),
-        'vix': fetcher.get_vix(),
-        'vvix': fetcher.get_vvix(),
-        'credit_spread': fetcher.get_credit_spread(),
-        'hy_ig_spread': fetcher.get_hy_ig_credit_spread(),
-        'ted_spread': fetcher.get_ted_spread(),
-        'fed_balance_sheet': fetcher.get_fed_balance_sheet(),
-        'reverse_repo': fetcher.get_reverse_repo(),
-        'ism_manufacturing': fetcher.get_ism_manufacturing(),
-        'ism_services': fetcher.get_ism_services(),
-        'fear_greed': fetcher.get_fear_greed_index(),
-        'sp500': fetcher.get_sp500_data(),
-        'put_call_ratio': fetcher.get_put_call_ratio(),
-        'nyse_highs_lows': fetcher.get_nyse_highs_lows(),
-        'market_breadth': fetcher.get_market_breadth(),
-        'safe_haven_demand': fetcher.get_safe_haven_demand(),
-        'nfci': fetcher.get_nfci_data(),
-        'market_momentum': fetcher.get_market_momentum(),
-        'aaii_sentiment': fetcher.get_aaii_sentiment()
-    }
+@st.cache_resource
+def get_data_snapshots():
+    return build_snapshots()
 
-def assess_liquidity(vix, credit_spread, ted_spread):
-    score = 0
-    
-    if vix < 15:
-        score += 2
-    elif vix < 20:
-        score += 1
-    elif vix > 30:
-        score -= 2
-    elif vix > 25:
-        score -= 1
-    
-    if credit_spread < 3:
-        score += 2
-    elif credit_spread < 4:
-        score += 1
-    elif credit_spread > 6:
-        score -= 2
-    elif credit_spread > 5:
-        score -= 1
-    
-    if ted_spread < 0.3:
-        score += 1
-    elif ted_spread > 0.5:
-        score -= 2
-    elif ted_spread > 0.4:
-        score -= 1
-    
-    if score >= 3:
-        return "Healthy", "🟢", "Strong liquidity conditions with low volatility and tight spreads"
-    elif score >= 0:
-        return "Moderate", "🟡", "Normal liquidity with some volatility present"
-    else:
-        return "Stressed", "🔴", "Tightening liquidity with elevated volatility and widening spreads"
+@st.cache_resource
+def start_metrics():
+    # No-op unless MACROCYCLE_METRICS_PORT is set
+    return start_metrics_server()
+
+def load_economic_data():
+    return get_data_snapshots()['economic'].get().data
 
-@st.cache_data(ttl=1800)
 def load_market_data():
-    fetcher = MarketDataFetcher()
-    econ_fetcher = EconomicDataFetcher()
-    return {
-        'sectors': fetcher.get_sector_performance('1y'),
-        'assets': fetcher.get_asset_class_data('5y'),
-        'sentiment': {
-            'put_call_ratio': econ_fetcher.get_put_call_ratio_latest(),
-            'put_call_historical': econ_fetcher.get_put_call_ratio_chart_data(2),
-            'vvix': econ_fetcher.get_vvix(),
-            'vvix_historical': econ_fetcher.get_vvix_historical(2),
-            'hy_ig_spread': econ_fetcher.get_hy_ig_credit_spread(),
-            'hy_ig_historical': econ_fetcher.get_hy_ig_spread_historical(5),
-            'etf_flows': econ_fetcher.get_etf_flows(30),
-            'aaii': econ_fetcher.get_aaii_sentiment(),
-            'aaii_historical': econ_fetcher.get_aaii_sentiment_historical(52)
-        }
-    }
+    return get_data_snapshots()['market'].get().data
+
+@st.cache_resource
+def get_indicator_graph():
+    return build_indicator_graph()
+
+def load_indicators():
+    """Derived-indicator graph, synced to the current economic snapshot"""
+    snapshot = get_data_snapshots()['economic'].get()
+    graph = get_indicator_graph()
+    graph.sync(snapshot.data, snapshot.version, snapshot.derive('indicators', lambda data: None))
+    return graph
+
+def warm_data(names):
+    """Start loading datasets in the background so a later page finds them ready"""
+    snapshots = get_data_snapshots()
+    for name in names:
+        snapshots[name].warm()
+
+def load_indicator_panel():
+    """Economic indicators aligned to shared calendars, built once per data snapshot"""
+    snapshot = get_data_snapshots()['economic'].get()
+    return snapshot.derive('indicator_panel', lambda data: IndicatorPanel.build(data, snapshot.version))
+
+# Navigation pages and the datasets each one renders from
+PAGE_DATASETS = {
+    # Dashboard
+    "🧮 Key Indicators": ('economic', 'market'),
+    # AI Agent
+    "🤖 AI Research Agent": ('economic',),
+    # Cycle Analysis
+    "🔄 Business Cycle": ('economic', 'market'),
+    # Market Data
+    "📊 Market Analysis": ('economic', 'market'),
+    "📚 Resources": (),
+    # Info
+    "ℹ️ About": (),
+    # Admin
+    "🛠️ Data Provenance": ()
+}
+
+def _format_age(seconds):
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    return f"{seconds / 3600:.1f} h ago"
+
+def _render_snapshot_status():
+    for name, cache in get_data_snapshots().items():
+        snapshot = cache.peek()
+        if snapshot is None:
+            if cache.refreshing:
+                st.sidebar.caption(f"📦 {name.title()} data: loading in background…")
+            continue
+        status = f"📦 {name.title()} data: updated {_format_age(snapshot.age)}"
+        if cache.refreshing:
+            status += " · refreshing…"
+        elif isinstance(cache.last_error, RateLimited):
+            status += " · refresh throttled upstream, will retry"
+        st.sidebar.caption(status)
 
 def main():
+    start_metrics()
     st.sidebar.title("MacroCycle AI Agent")
     
     # Initialize session state for cross-page context
@@ -123,30 +118,23 @@ def main():
     
     # Grouped navigation
     st.sidebar.markdown("---")
-    page = st.sidebar.radio(
-        "Navigation",
-        [
-            # Dashboard
-            "🧮 Key Indicators",
-            # AI Agent
-            "🤖 AI Research Agent",
-            # Cycle Analysis
-            "🔄 Business Cycle",
-            # Market Data
-            "📊 Market Analysis",
-            "📚 Resources",
-            # Info
-            "ℹ️ About"
-        ]
-    )
-    
-    economic_data = load_economic_data()
-    market_data = load_market_data()
+    page = st.sidebar.radio("Navigation", list(PAGE_DATASETS))
+    
+    # Only block on what this page renders; the rest loads in the background after it
+    datasets = PAGE_DATASETS[page]
+    try:
+        economic_data = load_economic_data() if 'economic' in datasets else None
+        market_data = load_market_data() if 'market' in datasets else None
+    except RateLimited as e:
+        # Nothing loaded yet and upstream is throttling: say so rather than render sample data
+        st.error(f"⏳ Data sources are rate limiting requests ({e}). Please retry in a minute.")
+        st.stop()
+    _render_snapshot_status()
     
     if page == "🧮 Key Indicators":
         show_key_indicators(economic_data, market_data)
     elif page == "🤖 AI Research Agent":
-        show_ai_research_agent(economic_data, market_data)
+        show_ai_research_agent(economic_data)
     elif page == "🔄 Business Cycle":
         show_business_cycle_consolidated(economic_data, market_data)
     elif page == "📊 Market Analysis":
@@ -155,17 +143,17 @@ def main():
         show_resources()
     elif page == "ℹ️ About":
         show_about()
+    elif page == "🛠️ Data Provenance":
+        show_data_provenance()
+    
+    warm_data(name for name in get_data_snapshots() if name not in datasets)
 
+@RENDER_SECONDS.timed()
 def _render_business_cycle(economic_data):
     st.header("🔄 Business Cycle Phase")
     st.caption("Leading and coincident indicators for cycle positioning")
     
-    analyzer = BusinessCycleAnalyzer()
-    cycle_analysis = analyzer.analyze_cycle_phase(
-        economic_data['gdp'],
-        economic_data['unemployment'],
-        economic_data['inflation']
-    )
+    cycle_analysis = load_indicators().value('cycle_analysis')
     
     # Current Phase (large and prominent)
     phase = cycle_analysis['phase']
@@ -206,10 +194,7 @@ def _render_business_cycle(economic_data):
     
     # 1. Yield Curve Spread (Leading Indicator - Recession Predictor)
     with col1:
-        bond_yields = economic_data['bond_yields']
-        yield_10y = bond_yields.get('10Y', 0)
-        yield_2y = bond_yields.get('2Y', 0)
-        yield_spread = yield_10y - yield_2y
+        yield_spread = load_indicators().value('yield_spread')
         
         st.metric("Yield Curve Spread", f"{yield_spread:.2f}%", 
                  help="10Y-2Y Treasury spread - Leading recession indicator")
@@ -336,6 +321,7 @@ def _render_business_cycle(economic_data):
     
     st.caption("📊 Data Sources: [FRED](https://fred.stlouisfed.org) - GDP, Treasury Yields, NFCI | ISM PMI (Synthetic)")
 
+@RENDER_SECONDS.timed()
 def _render_macro_economics(economic_data):
     st.header("📊 Macro Economics")
     st.caption("Core economic indicators - GDP, Inflation, Unemployment, and Fed Policy")
@@ -494,6 +480,7 @@ def _render_macro_economics(economic_data):
     st.plotly_chart(fig_policy, use_container_width=True)
     st.caption("📊 Data Source: [FRED - FEDFUNDS](https://fred.stlouisfed.org/series/FEDFUNDS) | For FOMC projections: [Federal Reserve](https://www.federalreserve.gov/monetarypolicy/fomccalendars.htm)")
 
+@RENDER_SECONDS.timed()
 def _render_liquidity_credit(economic_data):
     st.header("💵 Liquidity & Credit")
     st.caption("Money supply growth and credit conditions - Key drivers of asset price liquidity")
@@ -502,13 +489,7 @@ def _render_liquidity_credit(economic_data):
     st.caption("Liquidity trend - Money supply growth impacts asset prices")
     
     m2_df = economic_data['m2_supply']
-    if len(m2_df) >= 12:
-        current_m2 = m2_df['value'].iloc[-1]
-        year_ago_m2 = m2_df['value'].iloc[-12]
-        m2_yoy = ((current_m2 / year_ago_m2 - 1) * 100) if year_ago_m2 > 0 else 0
-    else:
-        m2_yoy = 0
-        current_m2 = m2_df['value'].iloc[-1] if len(m2_df) > 0 else 0
+    m2_yoy = load_indicators().value('m2_growth')
     
     col1, col2 = st.columns(2)
     with col1:
@@ -525,12 +506,9 @@ def _render_liquidity_credit(economic_data):
             st.error("🔴 **Contracting** - Liquidity headwind for assets")
     
     if len(m2_df) >= 12:
-        m2_yoy_series = []
-        dates = []
-        for i in range(12, len(m2_df)):
-            yoy = ((m2_df['value'].iloc[i] / m2_df['value'].iloc[i-12] - 1) * 100)
-            m2_yoy_series.append(yoy)
-            dates.append(m2_df['date'].iloc[i])
+        # Each month against the same month a year earlier
+        m2_yoy_series = (m2_df['value'].pct_change(12, fill_method=None) * 100).iloc[12:]
+        dates = m2_df['date'].iloc[12:]
         
         fig_m2 = go.Figure()
         fig_m2.add_trace(go.Scatter(
@@ -594,6 +572,7 @@ def _render_liquidity_credit(economic_data):
     st.plotly_chart(fig_nfci, use_container_width=True)
     st.caption("📊 Data Source: [FRED - NFCI](https://fred.stlouisfed.org/series/NFCI)")
 
+@RENDER_SECONDS.timed()
 def _render_market_sentiment(economic_data):
     st.header("😱 Market Sentiment")
     st.caption("Fear, volatility, and investor psychology indicators")
@@ -618,17 +597,7 @@ def _render_market_sentiment(economic_data):
     
     # 2. Put/Call Ratio (Risk appetite)
     with col2:
-        put_call_data = economic_data.get('put_call_ratio', 1.0)
-        # Extract scalar value - DataFrame has 'value' column
-        if isinstance(put_call_data, pd.DataFrame):
-            if 'value' in put_call_data.columns:
-                put_call = float(put_call_data['value'].iloc[-1] if len(put_call_data) > 0 else 1.0)
-            else:
-                put_call = float(put_call_data.iloc[-1, -1] if len(put_call_data) > 0 else 1.0)
-        elif isinstance(put_call_data, pd.Series):
-            put_call = float(put_call_data.iloc[-1] if len(put_call_data) > 0 else 1.0)
-        else:
-            put_call = float(put_call_data)
+        put_call = float(_safe_extract_value(economic_data.get('put_call_ratio', 1.0), default=1.0))
         
         st.metric("Put/Call Ratio", f"{put_call:.2f}", help="Options market risk appetite")
         if put_call > 1.15:
@@ -640,15 +609,7 @@ def _render_market_sentiment(economic_data):
     
     # 3. VVIX (Volatility of volatility)
     with col3:
-        vvix_data = economic_data.get('vvix', 80.0)
-        # VVIX returns a scalar directly
-        if isinstance(vvix_data, (pd.DataFrame, pd.Series)):
-            if isinstance(vvix_data, pd.DataFrame) and 'value' in vvix_data.columns:
-                vvix = float(vvix_data['value'].iloc[-1] if len(vvix_data) > 0 else 80.0)
-            else:
-                vvix = float(vvix_data.iloc[-1] if len(vvix_data) > 0 else 80.0)
-        else:
-            vvix = float(vvix_data)
+        vvix = float(_safe_extract_value(economic_data.get('vvix', 80.0), default=80.0))
         
         st.metric("VVIX", f"{vvix:.1f}", help="Volatility of VIX - Uncertainty about volatility")
         if vvix > 120:
@@ -660,15 +621,7 @@ def _render_market_sentiment(economic_data):
     
     # 4. Credit Spread (Credit market fear)
     with col4:
-        hy_ig_data = economic_data.get('hy_ig_spread', 3.5)
-        # HY-IG returns a scalar directly
-        if isinstance(hy_ig_data, (pd.DataFrame, pd.Series)):
-            if isinstance(hy_ig_data, pd.DataFrame) and 'value' in hy_ig_data.columns:
-                hy_ig_spread = float(hy_ig_data['value'].iloc[-1] if len(hy_ig_data) > 0 else 3.5)
-            else:
-                hy_ig_spread = float(hy_ig_data.iloc[-1] if len(hy_ig_data) > 0 else 3.5)
-        else:
-            hy_ig_spread = float(hy_ig_data)
+        hy_ig_spread = float(_safe_extract_value(economic_data.get('hy_ig_spread', 3.5), default=3.5))
         
         st.metric("HY-IG Spread", f"{hy_ig_spread:.2f}%", help="High Yield to Investment Grade credit spread")
         if hy_ig_spread > 5:
@@ -756,6 +709,7 @@ def _render_market_sentiment(economic_data):
     
     st.caption("📊 Data Sources: [FRED - VIX](https://fred.stlouisfed.org/series/VIXCLS) | [AAII Sentiment Survey](https://www.aaii.com/sentimentsurvey) | Sample data for Put/Call, VVIX, HY-IG")
 
+@RENDER_SECONDS.timed()
 def _render_market_structure(economic_data, market_data):
     st.header("📉 Market Structure")
     st.caption("Yield curve and market momentum - Structural indicators of market health")
@@ -764,9 +718,7 @@ def _render_market_structure(economic_data, market_data):
     st.caption("Recession predictor - Inverted curve often precedes recessions")
     
     bond_yields = economic_data['bond_yields']
-    yield_10y = bond_yields.get('10Y', 0)
-    yield_2y = bond_yields.get('2Y', 0)
-    yield_spread = yield_10y - yield_2y
+    yield_spread = load_indicators().value('yield_spread')
     
     col1, col2 = st.columns([2, 1])
     
@@ -859,6 +811,7 @@ def _render_market_structure(economic_data, market_data):
     
     st.caption("📊 Data Source: [Yahoo Finance](https://finance.yahoo.com)")
 
+@RENDER_SECONDS.timed()
 def _render_sectors_assets(market_data, economic_data):
     st.header("💰 Sectors & Assets")
     st.caption("Sector performance and alternative asset tracking")
@@ -991,17 +944,12 @@ def show_business_cycle_consolidated(economic_data, market_data):
     with tab4:
         _render_sector_watchlist(economic_data, market_data)
 
+@RENDER_SECONDS.timed()
 def _render_cycle_analysis(economic_data):
     st.header("🔄 Business Cycle Analysis")
     
     analyzer = BusinessCycleAnalyzer()
-    cycle_analysis = analyzer.analyze_cycle_phase(
-        economic_data['gdp'],
-        economic_data['unemployment'],
-        economic_data['inflation'],
-        economic_data['ism_manufacturing'],
-        economic_data['ism_services']
-    )
+    cycle_analysis = load_indicators().value('cycle_analysis_ism')
     
     # Save to session state for cross-page context
     st.session_state.cycle_phase = cycle_analysis['phase']
@@ -1105,7 +1053,7 @@ def _render_cycle_analysis(economic_data):
     with col1:
         st.markdown("**🔮 Leading Indicators** (Signal future changes)")
         leading_indicators = [
-            ("Yield Curve (10Y-2Y)", economic_data['bond_yields'].get('10Y', 0) - economic_data['bond_yields'].get('2Y', 0)),
+            ("Yield Curve (10Y-2Y)", load_indicators().value('yield_spread')),
             ("ISM Manufacturing PMI", ism_mfg_current),
             ("ISM Services PMI", ism_svc_current),
         ]
@@ -1289,6 +1237,7 @@ def show_market_analysis(economic_data, market_data):
     with tab2:
         _render_fear_greed_index(economic_data)
 
+@RENDER_SECONDS.timed()
 def _render_market_performance(market_data):
     st.header("📊 Market Performance")
     
@@ -1710,6 +1659,7 @@ def _render_market_performance(market_data):
             st.info(f"📊 No historical data available for {selected_sector}. Please try again later or select a different sector.")
 
 
+@RENDER_SECONDS.timed()
 def _render_fear_greed_index(economic_data):
     st.header("😱 Fear & Greed Index")
     st.warning("📚 **Educational Purposes Only**: This is a calculated approximation of CNN's Fear & Greed Index methodology using publicly available data. Results may differ significantly from [CNN's Official Index](https://www.cnn.com/markets/fear-and-greed) due to normalization ranges, data sources, and timing. Use CNN's official index for investment decisions.")
@@ -1729,9 +1679,7 @@ def _render_fear_greed_index(economic_data):
         """)
     
     # Calculate Fear & Greed Index using real market data
-    calculator = FearGreedCalculator()
-    fear_greed_calc = calculator.calculate(economic_data)
-    fear_greed = fear_greed_calc
+    fear_greed = load_indicators().value('fear_greed')
     
     col1, col2 = st.columns([1, 3])
     
@@ -1870,6 +1818,7 @@ def _render_fear_greed_index(economic_data):
                     st.caption("Greed 🤑")
 
 
+@RENDER_SECONDS.timed()
 def _render_historical_backtesting(economic_data):
     st.header("⏮️ Historical Backtesting")
     
@@ -1877,12 +1826,7 @@ def _render_historical_backtesting(economic_data):
     if st.session_state.cycle_phase:
         st.success(f"🔗 **Connected Context:** Using {st.session_state.cycle_phase} phase from Business Cycle page (Confidence: {st.session_state.cycle_confidence}%)")
     
-    analyzer = BusinessCycleAnalyzer()
-    cycle_analysis = analyzer.analyze_cycle_phase(
-        economic_data['gdp'],
-        economic_data['unemployment'],
-        economic_data['inflation']
-    )
+    cycle_analysis = load_indicators().value('cycle_analysis')
     
     # Navigation hint
     st.info(f"📍 **Current Cycle:** {cycle_analysis['phase']} | 💡 See [Business Cycle Analysis](#) for phase details | [Portfolio Positioning](#) for allocation insights")
@@ -2034,6 +1978,7 @@ def _render_historical_backtesting(economic_data):
         """)
 
 
+@RENDER_SECONDS.timed()
 def _render_portfolio_positioning(economic_data):
     st.header("💼 Portfolio Positioning Insights")
     
@@ -2041,12 +1986,7 @@ def _render_portfolio_positioning(economic_data):
     if st.session_state.cycle_phase:
         st.success(f"🔗 **Connected Context:** Using {st.session_state.cycle_phase} phase from Business Cycle page (Confidence: {st.session_state.cycle_confidence}%)")
     
-    analyzer = BusinessCycleAnalyzer()
-    cycle_analysis = analyzer.analyze_cycle_phase(
-        economic_data['gdp'],
-        economic_data['unemployment'],
-        economic_data['inflation']
-    )
+    cycle_analysis = load_indicators().value('cycle_analysis')
     
     # Navigation hint
     st.info(f"📍 **Current Cycle:** {cycle_analysis['phase']} | 💡 See [Business Cycle Analysis](#) for phase details | [Historical Backtesting](#) for past patterns")
@@ -2221,6 +2161,7 @@ def _render_portfolio_positioning(economic_data):
         st.info("No specific tactical patterns identified for current conditions. Historical data suggests maintaining balanced allocation.")
 
 
+@RENDER_SECONDS.timed()
 def _render_sector_watchlist(economic_data, market_data):
     st.header("⭐ Sector Watchlist & Historical Patterns")
     
@@ -2234,12 +2175,7 @@ def _render_sector_watchlist(economic_data, market_data):
     if context_parts:
         st.success(f"🔗 **Connected Context:** Using {' | '.join(context_parts)} from other pages")
     
-    analyzer = BusinessCycleAnalyzer()
-    cycle_analysis = analyzer.analyze_cycle_phase(
-        economic_data['gdp'],
-        economic_data['unemployment'],
-        economic_data['inflation']
-    )
+    cycle_analysis = load_indicators().value('cycle_analysis')
     
     # Navigation hint
     st.info(f"📍 **Current Cycle:** {cycle_analysis['phase']} | 💡 See [Business Cycle Analysis](#) for phase details | [Portfolio Positioning](#) for allocation patterns")
@@ -2559,6 +2495,72 @@ def show_resources():
     - *"Human Compatible"* by Stuart Russell - AI alignment & safety
     """)
 
+def show_data_provenance():
+    st.title("🛠️ Data Provenance")
+    st.caption("Timing, traffic, cache use and sample substitution for every fetcher call in this process")
+    
+    summary = RECORDER.summary()
+    if not summary:
+        st.info("No fetcher calls recorded yet.")
+        return
+    
+    summary_df = pd.DataFrame(summary)
+    calls = int(summary_df['calls'].sum())
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Getter calls", calls)
+    col2.metric("Fetch time", f"{summary_df['total_time'].sum():.1f}s")
+    col3.metric("Cache hit rate", f"{summary_df['cache_hits'].sum() / calls:.0%}")
+    col4.metric("Sample data", f"{summary_df['samples'].sum() / calls:.0%}")
+    
+    st.subheader("⏱️ Latency by getter")
+    st.caption("Sorted by total wall time, so the sources that dominate refresh latency are at the top")
+    summary_df['kb'] = summary_df['bytes'] / 1024
+    summary_df['last_called'] = pd.to_datetime(summary_df['last_called'], unit='s')
+    st.dataframe(
+        summary_df[['fetcher', 'getter', 'calls', 'total_time', 'mean_time', 'max_time', 'queued', 'requests',
+                    'kb', 'retries', 'cache_hits', 'samples', 'errors', 'last_called']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'total_time': st.column_config.NumberColumn("total (s)", format="%.2f"),
+            'mean_time': st.column_config.NumberColumn("mean (s)", format="%.3f"),
+            'max_time': st.column_config.NumberColumn("max (s)", format="%.3f"),
+            'queued': st.column_config.NumberColumn("rate-limit wait (s)", format="%.2f"),
+            'kb': st.column_config.NumberColumn("KB", format="%.1f")
+        }
+    )
+    
+    fig = px.bar(summary_df.head(15), x='total_time', y='getter', orientation='h',
+                 labels={'total_time': 'Total wall time (s)', 'getter': ''})
+    fig.update_layout(height=420, yaxis={'categoryorder': 'total ascending'})
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.subheader("🔌 Upstream sources")
+    st.caption("Circuit breaker state and rate-limit bucket (tokens left, requests queued) per source")
+    breakers = breaker_states()
+    limiters = limiter_states()
+    sources = sorted(set(breakers) | set(limiters))
+    if sources:
+        st.dataframe(
+            pd.DataFrame([{'source': source, **breakers.get(source, {}), **limiters.get(source, {})} for source in sources]),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    records = [record.as_dict() for record in RECORDER.records()]
+    st.subheader("🧾 Recent calls")
+    recent_df = pd.DataFrame(records[-200:][::-1])
+    recent_df['started_at'] = pd.to_datetime(recent_df['started_at'], unit='s')
+    recent_df['requests'] = recent_df['requests'].apply(lambda requests: ', '.join(f"{k}×{v}" for k, v in requests.items()))
+    recent_df['cache'] = recent_df['cache'].apply(lambda cache: ', '.join(f"{k}:{v}" for k, v in cache.items()))
+    st.dataframe(recent_df, use_container_width=True, hide_index=True)
+    st.download_button(
+        "Download provenance log (JSON lines)",
+        '\n'.join(json.dumps(record, default=str) for record in records),
+        file_name="fetch_provenance.jsonl",
+        mime="application/json"
+    )
+
 def show_about():
     st.title("ℹ️ About MacroCycle AI Agent")
     
@@ -2997,8 +2999,12 @@ def show_about():
         """)
     
 
-def _safe_extract_value(data, key='value'):
-    """Safely extract a scalar value from economic data that can be DataFrame, Series, or scalar."""
+def _safe_extract_value(data, key='value', default=None):
+    """Safely extract the latest scalar from economic data that can be TimeSeries, DataFrame, Series, or scalar."""
+    if isinstance(data, (TimeSeries, pd.DataFrame, pd.Series)) and len(data) == 0 and default is not None:
+        return default
+    if isinstance(data, TimeSeries):
+        return data.latest
     if isinstance(data, pd.DataFrame):
         if key in data.columns:
             return data[key].iloc[-1]
@@ -3044,7 +3050,7 @@ def _display_tool_call(tool_call):
         st.info(f"🔍 **Sector Analysis**: Analyzing top {top_n} performers over {time_frame}")
         st.caption("Note: Detailed sector analysis available on the Market Analysis page")
 
-def show_ai_research_agent(economic_data, market_data):
+def show_ai_research_agent(economic_data):
     st.title("🤖 AI Research Agent")
     st.caption("Ask questions about economic data, business cycles, and market insights")
     
@@ -3069,45 +3075,28 @@ def show_ai_research_agent(economic_data, market_data):
     if 'ai_messages' not in st.session_state:
         st.session_state.ai_messages = []
     
-    analyzer = BusinessCycleAnalyzer()
-    cycle_analysis = analyzer.analyze_cycle_phase(
-        economic_data['gdp'],
-        economic_data['unemployment'],
-        economic_data['inflation']
-    )
+    panel = load_indicator_panel()
+    indicators = load_indicators()
+    cycle_analysis = indicators.value('cycle_analysis')
     
     # Calculate GDP growth rate from cycle analysis (it does the calculation correctly)
     gdp_growth = cycle_analysis['gdp_growth']
-    unemployment = _safe_extract_value(economic_data['unemployment'])
-    inflation = _safe_extract_value(economic_data['inflation'])
-    interest_rate = _safe_extract_value(economic_data['interest_rate'])
+    unemployment = panel.latest('unemployment', None)
+    inflation = panel.latest('inflation', None)
+    interest_rate = panel.latest('interest_rate', None)
     
-    ism_mfg_val = _safe_extract_value(economic_data['ism_manufacturing'])
-    ism_svc_val = _safe_extract_value(economic_data['ism_services'])
+    ism_mfg_val = panel.latest('ism_manufacturing', None)
+    ism_svc_val = panel.latest('ism_services', None)
     vix_val = _safe_extract_value(economic_data['vix'])
     
-    bond_yields_data = economic_data['bond_yields']
-    if isinstance(bond_yields_data, pd.DataFrame):
-        bond_yields_10y = bond_yields_data['10Y'].iloc[-1]
-        bond_yields_2y = bond_yields_data['2Y'].iloc[-1]
-    else:
-        bond_yields_10y = 4.0
-        bond_yields_2y = 3.5
-    yield_spread = (bond_yields_10y - bond_yields_2y) * 100
-    
-    m2_data = economic_data['m2_supply']
-    if isinstance(m2_data, pd.DataFrame) and len(m2_data) > 13:
-        m2_growth = ((m2_data['value'].iloc[-1] / m2_data['value'].iloc[-13] - 1) * 100)
-    elif isinstance(m2_data, pd.Series) and len(m2_data) > 13:
-        m2_growth = ((m2_data.iloc[-1] / m2_data.iloc[-13] - 1) * 100)
-    else:
-        m2_growth = 0
+    yield_spread = indicators.value('yield_spread_bps')
+    m2_growth = indicators.value('m2_growth')
+    liquidity, _, _ = indicators.value('liquidity')
     
-    nfci_val = _safe_extract_value(economic_data['nfci'])
-    put_call_val = _safe_extract_value(economic_data['put_call_ratio'])
+    nfci_val = panel.latest('nfci', None)
+    put_call_val = panel.latest('put_call_ratio', None)
     
-    fear_greed_calculator = FearGreedCalculator()
-    fg_result = fear_greed_calculator.calculate(economic_data)
+    fg_result = indicators.value('fear_greed')
     
     economic_context = {
         'cycle_phase': cycle_analysis['phase'],
@@ -3123,6 +3112,7 @@ def show_ai_research_agent(economic_data, market_data):
         'm2_growth': m2_growth,
         'nfci': nfci_val,
         'put_call_ratio': put_call_val,
+        'liquidity': liquidity,
         'fear_greed_index': fg_result['score'],
         'fear_greed_label': fg_result['rating']
     }
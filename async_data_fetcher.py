@@ -0,0 +1,299 @@
+import asyncio
+import base64
+import copy
+import functools
+import weakref
+import httpx
+from fredapi import Fred
+from cassette import get_cassette
+from circuit_breaker import NEUTRAL_ERRORS, get_breaker
+from data_fetcher import EconomicDataFetcher, MarketDataFetcher
+from http_session import POOL_MAXSIZE, note_response, parse_fred_response, throttled
+from metrics import FETCH_SECONDS
+from provenance import RECORDER, FetchRecord
+from rate_limiter import get_limiter
+
+# One connection limit and one HTTP client per event loop, shared by every async fetcher on that loop
+_loop_limits = weakref.WeakKeyDictionary()
+_loop_clients = weakref.WeakKeyDictionary()
+
+DEFAULT_MAX_CONNECTIONS = 8
+
+# Attempts at a getter, each after fetching the request the previous one stopped at; one
+# more than the most requests a getter makes (bond yields: four series, each retried)
+MAX_ROUNDS = 10
+
+
+def _shared_limit(max_connections):
+    loop = asyncio.get_running_loop()
+    limit = _loop_limits.get(loop)
+    if limit is None:
+        limit = asyncio.Semaphore(max_connections)
+        _loop_limits[loop] = limit
+    return limit
+
+
+def _shared_client():
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        cassette = get_cassette()
+        limits = httpx.Limits(max_connections=POOL_MAXSIZE, max_keepalive_connections=POOL_MAXSIZE)
+        transport = CassetteTransport(cassette, limits=limits) if cassette is not None else None
+        client = httpx.AsyncClient(transport=transport, limits=limits, headers={'Accept-Encoding': 'gzip, deflate'})
+        _loop_clients[loop] = client
+    return client
+
+
+def _async_getter(name, sync_method):
+    @functools.wraps(sync_method)
+    async def getter(self, *args, **kwargs):
+        return await self._run(name, args, kwargs)
+    return getter
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx counterpart of cassette.CassetteAdapter: records responses to, or replays them from, a Cassette"""
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        self.transport = httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request):
+        keys = self.cassette.request_keys(request.method, str(request.url))
+        if self.cassette.replaying:
+            entry = self.cassette.play(keys)
+            return httpx.Response(entry['status'], headers=entry['headers'],
+                                  content=base64.b64decode(entry['body']), request=request)
+        response = await self.transport.handle_async_request(request)
+        await response.aread()
+        self.cassette.record_response(keys, response)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class _Unfetched(BaseException):
+    """
+    A request the getter made that has not been fetched yet.
+
+    Not an Exception, so the getters' own error handling (fallbacks, alternative series)
+    does not mistake it for an upstream failure: the attempt stops at the first request
+    that is missing, and only requests the getter really gets to are fetched.
+    """
+
+
+class _Exchanges:
+    # Upstream results fetched ahead of one getter call, keyed by request: (result or error, captured provenance)
+
+    def __init__(self):
+        self.results = {}
+        self.missing = {}
+        self._served = set()
+
+    def next_round(self):
+        self.missing = {}
+        self._served = set()
+
+    def serve(self, key):
+        if key not in self.results:
+            self.missing[key] = None
+            raise _Unfetched(f"{key[0]} request not fetched yet")
+        result, captured = self.results[key]
+        if key not in self._served:
+            # Counted once per attempt, however often the getter asks
+            self._served.add(key)
+            RECORDER.absorb(captured)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class _PrefetchedFred(Fred):
+    # fredapi client answering from the exchanges, so fredapi still builds the URLs and parses the XML
+
+    def __init__(self, fred, exchanges):
+        super().__init__(api_key=fred.api_key)
+        self.root_url = fred.root_url
+        self.exchanges = exchanges
+
+    def _Fred__fetch_data(self, url):
+        return self.exchanges.serve(('fred', url))
+
+
+class _AsyncFetcherBase:
+    """
+    Coroutine counterpart of a synchronous fetcher.
+
+    Each getter runs the synchronous implementation in the default executor against a copy
+    of the fetcher whose transports answer from results fetched ahead of it, so parsing and
+    store I/O stay off the event loop. A request that has not been fetched yet stops the
+    attempt; it is then fetched and the getter run again, until it completes. FRED and CNN
+    requests go out through a shared httpx.AsyncClient; Yahoo (yfinance) only ships a
+    blocking client, so price downloads run in the executor too. Series registry, store,
+    breakers and rate limits are shared with the synchronous fetcher, and concurrency is
+    bounded by a semaphore shared by all async fetchers on the running event loop, so
+    gathering dozens of series does not open dozens of upstream connections at once.
+    """
+    sync_class = None
+
+    def __init__(self, fetcher=None, max_connections=DEFAULT_MAX_CONNECTIONS, semaphore=None, client=None):
+        self.fetcher = fetcher if fetcher is not None else self.sync_class()
+        self.max_connections = max_connections
+        self.semaphore = semaphore
+        self.client = client
+
+    def _limit(self):
+        if self.semaphore is not None:
+            return self.semaphore
+        return _shared_limit(self.max_connections)
+
+    def _client(self):
+        return self.client if self.client is not None else _shared_client()
+
+    def _prefetched(self, exchanges):
+        # Shallow copy: registry, store and price store stay shared with self.fetcher
+        fetcher = copy.copy(self.fetcher)
+        if getattr(self.fetcher, 'fred', None) is not None:
+            fetcher.fred = _PrefetchedFred(self.fetcher.fred, exchanges)
+        fetcher._get_json = lambda url, timeout=10: exchanges.serve(('json', url))
+        fetcher._price_panel = lambda tickers, period: exchanges.serve(('yahoo', tuple(tickers), period))
+        return fetcher
+
+    async def _run(self, name, args, kwargs):
+        method = getattr(type(self.fetcher), name)
+        # The getter without its provenance wrapper: attempts that fetch more are not published
+        body = getattr(method, '__wrapped__', method)
+        exchanges = _Exchanges()
+        fetcher = self._prefetched(exchanges)
+        for _ in range(MAX_ROUNDS):
+            exchanges.next_round()
+            try:
+                return await asyncio.to_thread(self._attempt, name, body, fetcher, args, kwargs)
+            except _Unfetched:
+                await self._fetch(exchanges)
+        raise RuntimeError(f"{name} made more than {MAX_ROUNDS} rounds of requests")
+
+    def _attempt(self, name, body, fetcher, args, kwargs):
+        # Runs in the executor; the record lives on that thread, where the getter notes into it
+        record = RECORDER.start(self.fetcher.provenance_name, name)
+        try:
+            result = body(fetcher, *args, **kwargs)
+        except _Unfetched:
+            RECORDER.discard(record)
+            raise
+        except Exception as error:
+            RECORDER.finish(record, error)
+            raise
+        RECORDER.finish(record)
+        return result
+
+    async def _fetch(self, exchanges):
+        keys = list(exchanges.missing)
+        results = await asyncio.gather(*(self._exchange(key) for key in keys))
+        exchanges.results.update(zip(keys, results))
+
+    async def _exchange(self, key):
+        captured = FetchRecord(None, None)
+        try:
+            async with self._limit():
+                if key[0] == 'fred':
+                    result = await self._fetch_fred(key[1], captured)
+                elif key[0] == 'json':
+                    result = await self._fetch_json(key[1], captured)
+                else:
+                    result = await asyncio.to_thread(self._download_prices, list(key[1]), key[2], captured)
+        except Exception as error:
+            return error, captured
+        return result, captured
+
+    async def _send(self, source, url, captured, **kwargs):
+        captured.queued += await get_limiter(source).acquire_async()
+        with FETCH_SECONDS.time(source=source):
+            response = await self._client().get(url, **kwargs)
+        with RECORDER.capture(captured):
+            note_response(response)
+        return response
+
+    async def _fetch_fred(self, url, captured):
+        # SessionFred's fetch over httpx
+        fred = self.fetcher.fred
+        breaker = get_breaker('fred')
+        breaker.check()
+        try:
+            # Merged into the query fredapi built; httpx's params= would replace it
+            url = httpx.URL(url).copy_merge_params({'api_key': fred.api_key})
+            response = await self._send('fred', url, captured, timeout=fred.timeout)
+            root = parse_fred_response(response)
+        except NEUTRAL_ERRORS:
+            breaker.abandon()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        # A 4xx with an XML error body (e.g. unknown series) means FRED itself is healthy
+        breaker.record_success()
+        if response.status_code >= 400:
+            raise ValueError(root.get('message'))
+        return root
+
+    async def _fetch_json(self, url, captured, timeout=10):
+        # EconomicDataFetcher._get_json over httpx
+        breaker = get_breaker('cnn')
+        breaker.check()
+        try:
+            response = await self._send('cnn', url, captured, timeout=timeout)
+            throttled(response, 'cnn')
+            response.raise_for_status()
+            data = response.json()
+        except NEUTRAL_ERRORS:
+            breaker.abandon()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return data
+
+    def _download_prices(self, tickers, period, captured):
+        # Runs in the executor: yfinance through the shared registry and store
+        with RECORDER.capture(captured):
+            return self.fetcher._price_panel(tickers, period)
+
+    async def gather(self, calls):
+        """
+        Run several getters concurrently.
+
+        Args:
+            calls: Dict mapping result keys to a getter name, or to a (name, args) / (name, args, kwargs) tuple
+
+        Returns:
+            Dict of results in the same key order; a getter that raises yields None
+        """
+        keys = list(calls)
+        coroutines = []
+        for key in keys:
+            call = calls[key]
+            if isinstance(call, str):
+                call = (call,)
+            name, args, kwargs = call[0], tuple(call[1]) if len(call) > 1 else (), call[2] if len(call) > 2 else {}
+            coroutines.append(getattr(self, name)(*args, **kwargs))
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+        return {key: (None if isinstance(result, Exception) else result) for key, result in zip(keys, results)}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in dir(cls.sync_class):
+            if name.startswith('get_') and callable(getattr(cls.sync_class, name)):
+                setattr(cls, name, _async_getter(name, getattr(cls.sync_class, name)))
+
+
+class AsyncEconomicDataFetcher(_AsyncFetcherBase):
+    """Async counterpart of EconomicDataFetcher exposing every get_* method as a coroutine."""
+    sync_class = EconomicDataFetcher
+
+
+class AsyncMarketDataFetcher(_AsyncFetcherBase):
+    """Async counterpart of MarketDataFetcher exposing every get_* method as a coroutine."""
+    sync_class = MarketDataFetcher
@@ -0,0 +1,214 @@
+"""
+Refresh benchmark for load_economic_data / load_market_data against a local stand-in of the
+FRED, Yahoo chart and CNN endpoints (see stand_in_server.py).
+
+Scenarios:
+    cold      empty disk store and process caches, healthy upstream
+    warm      restart with a populated disk store (snapshot and registry dropped)
+    cached    snapshot already built in this process
+    shared    restart on a host whose shared SQLite cache another process already filled
+    degraded  cold, with slower upstream and failing requests
+
+Usage:
+    python benchmark.py                      # run and compare against the stored baseline
+    python benchmark.py --save-baseline      # run and store the results as the new baseline
+    python benchmark.py --latency 0.1 --failure-rate 0.3 --repeat 5
+
+Exits with status 1 if any scenario is slower than its baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+SCENARIOS = ('cold', 'warm', 'cached', 'shared', 'degraded')
+# Differences below this many seconds are never reported as regressions
+NOISE_FLOOR = 0.05
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='Per-request upstream latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Uniform latency jitter in seconds')
+    parser.add_argument('--degraded-latency', type=float, default=0.4, help='Latency in the degraded scenario')
+    parser.add_argument('--failure-rate', type=float, default=0.2, help='Share of failed requests when degraded')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario; the median is reported')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline (0.25 = 25%%)')
+    return parser.parse_args(argv)
+
+
+def _configure_environment(server, cache_dir):
+    # Must happen before the app modules are imported, which read these at import time
+    os.environ['MACROCYCLE_FRED_URL'] = server.fred_url
+    os.environ['MACROCYCLE_CNN_URL'] = server.cnn_url
+    os.environ['MACROCYCLE_CACHE_DIR'] = cache_dir
+    os.environ.setdefault('FRED_API_KEY', 'benchmark')
+    os.environ.pop('MACROCYCLE_CASSETTE', None)
+
+
+def _stand_in_missing_modules():
+    # The economic bundle's derived indicators need fear_greed_calculator, which not every
+    # checkout ships; without it time the fetch path with a neutral stand-in instead
+    from stand_in_server import StandInFearGreedCalculator
+    try:
+        import fear_greed_calculator
+    except ModuleNotFoundError:
+        print("fear_greed_calculator not found; using a stand-in calculator")
+        module = types.ModuleType('fear_greed_calculator')
+        module.FearGreedCalculator = StandInFearGreedCalculator
+        sys.modules['fear_greed_calculator'] = module
+
+
+class _App:
+    """app.py's bundle loading (get_data_snapshots, load_*_data) without Streamlit or the page modules"""
+
+    def __init__(self):
+        self.snapshots = None
+
+    def clear(self):
+        self.snapshots = None
+
+    def load(self, name):
+        from data_pipeline import build_snapshots
+        if self.snapshots is None:
+            self.snapshots = build_snapshots()
+        return self.snapshots[name].get().data
+
+    def load_economic_data(self):
+        return self.load('economic')
+
+    def load_market_data(self):
+        return self.load('market')
+
+
+def _reset_process_state(app):
+    from circuit_breaker import reset_breakers
+    from http_session import reset_sessions
+    from rate_limiter import reset_limiters
+    app.clear()
+    reset_breakers()
+    reset_limiters()
+    reset_sessions()
+
+
+def _clear_shared_cache():
+    from shared_cache import shared_cache_path
+    path = shared_cache_path()
+    for suffix in ('', '-wal', '-shm'):
+        if path and os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _timed_load(app, server):
+    server.reset_stats()
+    started = time.perf_counter()
+    app.load_economic_data()
+    economic = time.perf_counter() - started
+    started = time.perf_counter()
+    app.load_market_data()
+    market = time.perf_counter() - started
+    return {'economic': economic, 'market': market, 'total': economic + market,
+            'requests': server.stats()['total']}
+
+
+def run_scenario(name, app, server, cache_dir, args):
+    store_dir = os.path.join(cache_dir, 'series')
+    if name == 'degraded':
+        server.configure(latency=args.degraded_latency, failure_rate=args.failure_rate)
+    else:
+        server.configure(latency=args.latency, failure_rate=0.0)
+    if name in ('cold', 'degraded'):
+        _reset_process_state(app)
+        shutil.rmtree(store_dir, ignore_errors=True)
+        _clear_shared_cache()
+    elif name == 'warm':
+        _reset_process_state(app)
+        if not os.path.isdir(store_dir):
+            # Populate the store once without timing it
+            app.load_economic_data()
+            app.load_market_data()
+            _reset_process_state(app)
+        # A restarted host: series on disk, but no bundle shared by another process yet
+        _clear_shared_cache()
+    elif name == 'cached':
+        app.load_economic_data()
+        app.load_market_data()
+    elif name == 'shared':
+        app.load_economic_data()
+        app.load_market_data()
+        _reset_process_state(app)
+    return _timed_load(app, server)
+
+
+def run(args):
+    from stand_in_server import StandInServer, StandInYahoo
+    cache_dir = tempfile.mkdtemp(prefix='macrocycle-bench-')
+    server = StandInServer(latency=args.latency, jitter=args.jitter).start()
+    try:
+        _configure_environment(server, cache_dir)
+        import data_fetcher
+        data_fetcher.yf = StandInYahoo(server.yahoo_url)
+        _stand_in_missing_modules()
+        app = _App()
+        results = {}
+        for name in SCENARIOS:
+            runs = [run_scenario(name, app, server, cache_dir, args) for _ in range(args.repeat)]
+            results[name] = {
+                key: statistics.median(run[key] for run in runs)
+                for key in ('economic', 'market', 'total', 'requests')
+            }
+            print(f"{name:<9} economic {results[name]['economic']:7.3f}s  market {results[name]['market']:7.3f}s  "
+                  f"total {results[name]['total']:7.3f}s  requests {results[name]['requests']:5.0f}")
+        return results
+    finally:
+        server.stop()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regressions of results against a stored baseline"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        for key in ('economic', 'market', 'total'):
+            limit = previous[key] * (1 + tolerance)
+            if result[key] > limit and result[key] - previous[key] > NOISE_FLOOR:
+                regressions.append(f"{name}/{key}: {result[key]:.3f}s vs baseline {previous[key]:.3f}s")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    config = {'latency': args.latency, 'jitter': args.jitter, 'degraded_latency': args.degraded_latency,
+              'failure_rate': args.failure_rate, 'repeat': args.repeat}
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'results': results, 'created_at': time.time()}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline stored yet; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('config') != config:
+        print("Warning: baseline was recorded with different settings", baseline.get('config'))
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from metrics import CYCLE_ANALYSIS_SECONDS
 
 class BusinessCycleAnalyzer:
     def __init__(self):
@@ -12,6 +13,7 @@ class BusinessCycleAnalyzer:
             'Trough': 'Economic bottom, high unemployment, potential for recovery'
         }
     
+    @CYCLE_ANALYSIS_SECONDS.timed()
     def analyze_cycle_phase(self, gdp_data, unemployment_data, inflation_data, ism_mfg_data=None, ism_svc_data=None):
         gdp_trend = self._calculate_trend(gdp_data)
         unemployment_trend = self._calculate_trend(unemployment_data)
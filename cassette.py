@@ -0,0 +1,177 @@
+import atexit
+import base64
+import gzip
+import io
+import json
+import os
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Query parameters that never identify a response (credentials) or that move with the clock
+SECRET_PARAMS = {'api_key'}
+DATE_PARAMS = {'observation_start', 'observation_end', 'start', 'end'}
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when no recorded response matches a request"""
+
+
+class Cassette:
+    """
+    Local recording of upstream responses for offline replay.
+
+    In 'record' mode every response seen by the fetchers is stored; in 'replay' mode requests
+    are answered from the recording without touching the network. Responses are matched on
+    method, URL path and query (credentials removed), falling back to a match that ignores
+    date-window parameters so a cassette recorded on one day still replays on another.
+    Repeated requests replay recorded responses in order, then repeat the last one.
+    """
+
+    def __init__(self, path, mode='replay'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._entries = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def _open(self, mode):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path + ('.tmp' if 'w' in mode else ''), mode + 't', encoding='utf-8')
+        return open(self.path + ('.tmp' if 'w' in mode else ''), mode, encoding='utf-8')
+
+    def _load(self):
+        with self._open('r') as f:
+            self._entries = json.load(f)
+
+    def save(self):
+        with self._lock:
+            entries = dict(self._entries)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._open('w') as f:
+            json.dump(entries, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    def request_keys(self, method, url, params=None):
+        """Exact and date-insensitive lookup keys for a request"""
+        parts = urlsplit(url)
+        query = [(k, v) for k, v in parse_qsl(parts.query) + list((params or {}).items())
+                 if k not in SECRET_PARAMS]
+        exact = f"{method.upper()} {parts.netloc}{parts.path}?{urlencode(sorted(query))}"
+        loose = f"{method.upper()} {parts.netloc}{parts.path}?{urlencode(sorted((k, v) for k, v in query if k not in DATE_PARAMS))}"
+        return exact, loose
+
+    def record(self, keys, entry):
+        exact, loose = keys
+        with self._lock:
+            slot = self._entries.setdefault(exact, {'loose': loose, 'responses': []})
+            slot['responses'].append(entry)
+
+    def play(self, keys):
+        exact, loose = keys
+        with self._lock:
+            key = exact if exact in self._entries else None
+            if key is None:
+                # Most recently recorded request that differs only in its date window
+                matches = [k for k, slot in self._entries.items() if slot['loose'] == loose]
+                key = matches[-1] if matches else None
+            if key is None:
+                raise CassetteMiss(exact)
+            responses = self._entries[key]['responses']
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return responses[min(position, len(responses) - 1)]
+
+    # Raw HTTP responses (FRED, CNN) -------------------------------------------------------
+
+    def record_response(self, keys, response):
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+        self.record(keys, {
+            'status': response.status_code,
+            'headers': headers,
+            'body': base64.b64encode(response.content).decode('ascii')
+        })
+
+    def build_response(self, keys, request):
+        entry = self.play(keys)
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = base64.b64decode(entry['body'])
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    # yfinance downloads, recorded at the fetcher boundary ---------------------------------
+
+    def record_frame(self, keys, frame):
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer)
+        self.record(keys, {'frame': base64.b64encode(buffer.getvalue()).decode('ascii')})
+
+    def play_frame(self, keys):
+        entry = self.play(keys)
+        return pd.read_parquet(io.BytesIO(base64.b64decode(entry['frame'])))
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records responses to, or replays them from, a Cassette"""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        keys = self.cassette.request_keys(request.method, request.url)
+        if self.cassette.replaying:
+            return self.cassette.build_response(keys, request)
+        response = super().send(request, **kwargs)
+        self.cassette.record_response(keys, response)
+        return response
+
+
+_cassette = None
+_lock = threading.Lock()
+
+
+def use_cassette(path, mode='replay'):
+    """Route all fetcher traffic through a cassette (mode 'record' or 'replay'); None disables"""
+    global _cassette
+    with _lock:
+        _cassette = Cassette(path, mode) if path else None
+        if _cassette is not None and _cassette.recording:
+            atexit.register(_cassette.save)
+    # Sessions are rebuilt so the new transport takes effect
+    from http_session import reset_sessions
+    reset_sessions()
+    return _cassette
+
+
+def get_cassette():
+    """Active cassette, configured from MACROCYCLE_CASSETTE / MACROCYCLE_CASSETTE_MODE on first use"""
+    global _cassette
+    with _lock:
+        if _cassette is None and os.environ.get('MACROCYCLE_CASSETTE'):
+            _cassette = Cassette(os.environ['MACROCYCLE_CASSETTE'], os.environ.get('MACROCYCLE_CASSETTE_MODE', 'replay'))
+            if _cassette.recording:
+                atexit.register(_cassette.save)
+        return _cassette
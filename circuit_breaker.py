@@ -0,0 +1,122 @@
+import threading
+import time
+from cassette import CassetteMiss
+from metrics import FETCH_FAILURES
+from rate_limiter import RateLimited
+
+# Errors that say nothing about the source's health: the call is abandoned, not failed.
+# A replay miss means the cassette lacks the request, not that the source is down.
+NEUTRAL_ERRORS = (RateLimited, CassetteMiss)
+
+
+class SourceUnavailable(Exception):
+    """Raised instead of calling an upstream source whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker with negative caching.
+
+    After failure_threshold consecutive failures the breaker opens and calls are rejected
+    immediately for a cool-down window. When the window expires a single probe call is let
+    through (half-open): success closes the breaker, failure re-opens it with the cool-down
+    doubled, up to max_cooldown. A probe that ends without an answer either way (e.g. it was
+    throttled, or missed in a cassette replay) is abandoned, so the next call probes again.
+    """
+
+    def __init__(self, name, failure_threshold=3, cooldown=60, max_cooldown=900):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() >= self.opened_until:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._probing = False
+
+    def record_failure(self):
+        FETCH_FAILURES.inc(source=self.name)
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open':
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.failures >= self.failure_threshold:
+                self._open()
+
+    def abandon(self):
+        """Record a call that neither succeeded nor failed, releasing a half-open probe"""
+        with self._lock:
+            self._probing = False
+
+    def _open(self):
+        self.state = 'open'
+        self.opened_until = time.monotonic() + self.cooldown
+        self._probing = False
+
+    def check(self):
+        """Raise SourceUnavailable if calls to this source should be skipped right now"""
+        if not self.allow():
+            raise SourceUnavailable(f"{self.name} is unavailable (circuit open)")
+
+    def call(self, fn, *args, **kwargs):
+        self.check()
+        try:
+            result = fn(*args, **kwargs)
+        except NEUTRAL_ERRORS:
+            self.abandon()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def status(self):
+        with self._lock:
+            retry_in = max(0.0, self.opened_until - time.monotonic()) if self.state == 'open' else 0.0
+            return {'state': self.state, 'failures': self.failures, 'retry_in': retry_in}
+
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+def get_breaker(source):
+    """Process-wide breaker for an upstream source ('fred', 'yahoo', 'cnn')"""
+    with _lock:
+        if source not in _breakers:
+            _breakers[source] = CircuitBreaker(source)
+        return _breakers[source]
+
+
+def breaker_states():
+    with _lock:
+        breakers = dict(_breakers)
+    return {source: breaker.status() for source, breaker in breakers.items()}
+
+
+def reset_breakers():
+    """Forget all breaker state, e.g. between benchmark runs"""
+    with _lock:
+        _breakers.clear()
@@ -1,88 +1,454 @@
 import yfinance as yf
 import pandas as pd
-import requests
-from fredapi import Fred
+import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import inspect
+import logging
+import threading
+import time
 import os
+import sys
+from cassette import get_cassette
+from circuit_breaker import NEUTRAL_ERRORS, get_breaker
+from http_session import SessionFred, get_session, get_yahoo_session, throttled, DEFAULT_RETRY_AFTER
+from metrics import FETCH_SECONDS
+from price_store import get_price_store
+from provenance import RECORDER, recorded
+from rate_limiter import RateLimited, current_priority, get_limiter, request_priority
+from refresh_policy import frequency_for
+from series_registry import SeriesRegistry, period_to_days, period_to_rows, days_to_period
+from synthetic_data import SAMPLE_DATA
+from timeseries import PriceHistory, TimeSeries
+
+CNN_FEAR_GREED_URL = os.environ.get('MACROCYCLE_CNN_URL', "https://production.dataviz.cnn.io/index/fearandgreed/graphdata")
+
+
+def fetch_concurrently(tasks, fallbacks=None, max_workers=8, timeout=20, timeouts=None, deadline=45):
+    """
+    Run independent fetcher calls on a bounded thread pool.
+
+    Args:
+        tasks: Dict mapping result keys to zero-argument callables
+        fallbacks: Dict mapping result keys to zero-argument callables used when a task
+            fails, exceeds its timeout or is still running at the deadline. A task that is
+            rate limited gets no fallback: RateLimited is raised for the whole fan-out, so
+            callers keep what they last loaded instead of mixing in sample data.
+        max_workers: Size of the worker pool
+        timeout: Default per-task timeout in seconds, measured from when the task starts
+        timeouts: Optional dict of per-key timeout overrides (e.g. a slower source)
+        deadline: Total wall-clock budget in seconds for the whole fan-out
+
+    Returns:
+        Dict with the same keys as tasks, in the same order
+    """
+    fallbacks = fallbacks or {}
+    timeouts = timeouts or {}
+    started = {}
+    results = {}
+    # Workers queue for rate-limit tokens at the caller's priority
+    priority = current_priority()
+
+    def run(key, task):
+        started[key] = time.monotonic()
+        with request_priority(priority):
+            return task()
+
+    def fallback(key, reason):
+        if key in fallbacks:
+            RECORDER.note_fallback('fetch_concurrently', key, reason)
+            return fallbacks[key]()
+        return None
+
+    begin = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+    futures = {executor.submit(run, key, task): key for key, task in tasks.items()}
+    pending = set(futures)
+    throttled = None
+    try:
+        while pending and throttled is None:
+            now = time.monotonic()
+            if now - begin >= deadline:
+                break
+            done, pending = wait(pending, timeout=min(0.25, deadline - (now - begin)),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except RateLimited as e:
+                    throttled = e
+                except Exception:
+                    results[key] = fallback(key, 'error')
+            now = time.monotonic()
+            for future in list(pending):
+                key = futures[future]
+                if not future.done() and key in started and now - started[key] >= timeouts.get(key, timeout):
+                    pending.discard(future)
+                    future.cancel()
+                    results[key] = fallback(key, 'timeout')
+        if throttled is not None:
+            raise throttled
+        for future in pending:
+            key = futures[future]
+            if future.done() and isinstance(future.exception(), RateLimited):
+                raise future.exception()
+            if future.done() and future.exception() is None:
+                results[key] = future.result()
+            else:
+                future.cancel()
+                results[key] = fallback(key, 'deadline')
+    finally:
+        # Abandoned calls keep running in the background; their results are discarded.
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {key: results.get(key) for key in tasks}
+
+
+def download_price_panel(tickers, period, registry=None, store=None):
+    """
+    Download OHLCV history for several tickers in a single Yahoo request.
+
+    When a SeriesRegistry is given, tickers it already holds for a covering window are
+    served from it and only the rest are downloaded. When a SeriesStore is given, stored
+    tickers are only topped up from shortly before their last stored date. 'Nd' periods
+    return each ticker's last N rows (trading sessions), however wide the window it was
+    served from.
+
+    Returns:
+        Dict mapping each ticker to its own OHLCV DataFrame (single-level columns, rows where
+        the ticker did not trade dropped). Tickers with no data are omitted.
+    """
+    panel = _price_history(list(dict.fromkeys(tickers)), period_to_days(period), registry, store)
+    rows = period_to_rows(period)
+    if rows is None:
+        return panel
+    return {ticker: data.tail(rows) for ticker, data in panel.items()}
+
+
+def _price_history(tickers, days, registry=None, store=None):
+    if registry is not None:
+        return registry.get_many(
+            'yahoo', tickers, days,
+            lambda ids, days: _price_history(ids, days, store=store)
+        )
+    if store is not None:
+        return store.sync_many(
+            'yahoo', tickers, days,
+            lambda ids, start: _download_panel(ids, period='max' if start is None else None, start=start)
+        )
+    return _download_panel(tickers, period=days_to_period(days))
+
+
+def _download_panel(tickers, period=None, start=None):
+    cassette = get_cassette()
+    keys = None
+    if cassette is not None:
+        # yfinance's own HTTP (curl_cffi, cookie/crumb handshake) is recorded at this boundary
+        keys = cassette.request_keys('GET', 'yfinance://download', {
+            'tickers': ','.join(tickers), 'period': period or '', 'start': str(start or '')
+        })
+    if cassette is not None and cassette.replaying:
+        data = cassette.play_frame(keys)
+    else:
+        breaker = get_breaker('yahoo')
+        breaker.check()
+        errors = _YahooErrors()
+        try:
+            # yfinance issues one chart request per ticker
+            get_limiter('yahoo').acquire(len(tickers))
+            with FETCH_SECONDS.time(source='yahoo'), errors:
+                data = yf.download(tickers, period=period, start=start, progress=False, group_by='ticker',
+                                   session=get_yahoo_session())
+        except RateLimited:
+            breaker.abandon()
+            raise
+        except Exception as e:
+            RECORDER.note_request('yahoo', ok=False)
+            if _yahoo_rate_limited([repr(e)]):
+                get_limiter('yahoo').pause(DEFAULT_RETRY_AFTER)
+                breaker.abandon()
+                raise RateLimited("yahoo is throttling requests") from e
+            breaker.record_failure()
+            raise
+        # yfinance swallows network errors and returns an empty frame
+        if data is None or data.empty or data.isna().all().all():
+            if _yahoo_rate_limited(errors.messages):
+                # Raised like the exception path above, so callers surface throttling instead of sample data
+                get_limiter('yahoo').pause(DEFAULT_RETRY_AFTER)
+                breaker.abandon()
+                RECORDER.note_request('yahoo', ok=False)
+                raise RateLimited("yahoo is throttling requests")
+            if _yahoo_unreachable(errors.messages):
+                breaker.record_failure()
+                RECORDER.note_request('yahoo', ok=False)
+                return {}
+            # Yahoo answered; it just has no prices for these symbols (e.g. ^NYA-HI). Still no data.
+            breaker.record_success()
+            RECORDER.note_request('yahoo', ok=False)
+            return {}
+        breaker.record_success()
+        if cassette is not None:
+            cassette.record_frame(keys, data)
+    if data is None or data.empty:
+        RECORDER.note_request('yahoo', ok=False)
+        return {}
+    panel = {}
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker]
+        elif len(tickers) == 1:
+            frame = data
+        else:
+            continue
+        frame = frame.dropna(how='all')
+        if not frame.empty:
+            panel[ticker] = frame
+    # A request counts as sourcing data only if it yielded rows. curl_cffi traffic is not
+    # visible here, so the in-memory size stands in for bytes.
+    RECORDER.note_request('yahoo', int(data.memory_usage(index=True).sum()) if panel else 0, ok=bool(panel))
+    return panel
+
+
+# Per-ticker yfinance errors meaning Yahoo could not be reached or failed, as opposed to
+# symbols it has no prices for ("possibly delisted; no price data found")
+YAHOO_OUTAGE_MARKERS = ('Failed to perform', 'curl', 'DNSError', 'Timeout', 'timed out', 'ConnectionError',
+                        'Server Error', 'HTTP Error 5')
+YAHOO_NO_DATA_MARKERS = ('no price data', 'possibly delisted', 'No data found', 'symbol may be delisted',
+                         'No timezone found')
+
+
+class _YahooErrors(logging.Handler):
+    """
+    Per-ticker failures of one yf.download call, collected from the log while it runs.
+
+    yf.download catches every per-ticker error and (in the 1.x releases requirements.txt
+    pins) keeps them in a per-call dict it never returns; yf.shared._ERRORS stays empty. Its
+    ERROR log lines are the only record of why a ticker came back empty. Only records of the calling thread
+    are kept: yfinance logs the summary there, and concurrent downloads log on their own.
+    """
 
-class EconomicDataFetcher:
     def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+        self._thread = None
+
+    def emit(self, record):
+        if record.thread == self._thread:
+            self.messages.append(record.getMessage())
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        logging.getLogger('yfinance').addHandler(self)
+        return self
+
+    def __exit__(self, *exc):
+        logging.getLogger('yfinance').removeHandler(self)
+
+
+def _yahoo_rate_limited(messages):
+    return any('RateLimit' in message or 'Too Many Requests' in message for message in messages)
+
+
+def _yahoo_unreachable(messages):
+    """
+    Whether a download that returned no rows failed rather than found nothing.
+
+    Any outage marker counts, and so does an empty download yfinance gave no "no data"
+    reason for (e.g. with its logger silenced): an empty answer is only taken as Yahoo's
+    when it said the symbols have no prices.
+    """
+    if any(marker in message for message in messages for marker in YAHOO_OUTAGE_MARKERS):
+        return True
+    return not any(marker in message for message in messages for marker in YAHOO_NO_DATA_MARKERS)
+
+
+@recorded('economic')
+class EconomicDataFetcher:
+    # What each getter returns when its upstream is unavailable: a value, or a function of the
+    # fetcher and the getter's arguments. See fallback().
+    FALLBACKS = {
+        'get_gdp_data': lambda self, years: self._get_sample_gdp_data(years),
+        'get_inflation_data': lambda self, years: self._get_sample_inflation_data(years),
+        'get_unemployment_data': lambda self, years: self._get_sample_unemployment_data(years),
+        'get_interest_rate_data': lambda self, years: self._get_sample_interest_rate_data(years),
+        'get_m2_supply_data': lambda self, years: self._get_sample_m2_data(years),
+        'get_ism_manufacturing': lambda self, years: self._get_sample_ism_data(years, 'manufacturing'),
+        'get_ism_services': lambda self, years: self._get_sample_ism_data(years, 'services'),
+        'get_bond_yields': lambda self: self._get_sample_bond_yields(),
+        'get_gold_price': 2000.0,
+        'get_bitcoin_price': 50000.0,
+        'get_dxy_data': 100.0,
+        'get_vix': 15.0,
+        'get_credit_spread': 3.5,
+        'get_ted_spread': 0.3,
+        'get_fed_balance_sheet': 7500.0,
+        'get_reverse_repo': 500.0,
+        'get_sp500_data': lambda self, days: self._get_sample_sp500_data(days),
+        'get_put_call_ratio': lambda self, days: self._get_sample_put_call_ratio(days),
+        'get_nyse_highs_lows': lambda self: self._get_sample_nyse_highs_lows(),
+        'get_market_breadth': lambda self, days: self._get_sample_market_breadth(days),
+        'get_safe_haven_demand': 5.0,
+        'get_fear_greed_index': lambda self: self._get_sample_fear_greed_index(),
+        'get_nfci_data': lambda self, years: self._get_sample_nfci_data(years),
+        'get_market_momentum': lambda self: self._get_sample_market_momentum(),
+        'get_put_call_ratio_latest': 0.85,
+        'get_put_call_ratio_chart_data': lambda self, years: self._get_sample_put_call_data(years),
+        'get_vvix': 90.0,
+        'get_vvix_historical': lambda self, years: self._get_sample_vvix_data(years),
+        'get_hy_ig_credit_spread': 2.5,
+        'get_hy_ig_spread_historical': lambda self, years: self._get_sample_credit_spread_data(years),
+        'get_etf_flows': lambda self, days: self._get_sample_etf_flows(days),
+        'get_aaii_sentiment': lambda self: self._get_sample_aaii_sentiment(),
+        'get_aaii_sentiment_historical': lambda self, weeks: self._get_sample_aaii_sentiment_historical(weeks),
+    }
+
+    def __init__(self, registry=None, store=None):
         self.fred_api_key = os.environ.get('FRED_API_KEY', None)
-        if self.fred_api_key:
-            self.fred = Fred(api_key=self.fred_api_key)
+        cassette = get_cassette()
+        if self.fred_api_key or (cassette is not None and cassette.replaying):
+            # Replay serves FRED from the cassette, so no real key is needed
+            self.fred = SessionFred(api_key=self.fred_api_key or 'replay', session=get_session())
         else:
             self.fred = None
+        # Coalesces duplicate series fetches; pass a shared registry to dedupe across fetchers
+        self.registry = registry if registry is not None else SeriesRegistry()
+        # Optional on-disk SeriesStore; when set, history is delta-synced instead of refetched
+        self.store = store
+    
+    def _fred_series(self, series_id, days=None):
+        """Fetch a FRED series for the last `days` days (full history if None) through the registry"""
+        def load(fetch_days):
+            if self.store is not None:
+                return self.store.sync('fred', series_id, fetch_days,
+                                       lambda start: self.fred.get_series(series_id, start))
+            if fetch_days is None:
+                return self.fred.get_series(series_id)
+            end_date = datetime.now()
+            return self.fred.get_series(series_id, end_date - timedelta(days=fetch_days), end_date)
+        return self.registry.get('fred', series_id, days, load)
+    
+    def _fred_latest(self, series_id, lookback_days=45, limit=10):
+        """
+        Fetch only the most recent observations of a FRED series for scalar getters.
+
+        Asks FRED for a bounded window in descending order with a small limit instead of the
+        full history, widening to the whole history (still limited) for series whose last
+        observation is older than the window. Reuses a history already fetched this refresh.
+
+        Returns:
+            Series of the latest non-missing observations in ascending date order
+        """
+        cached = self.registry.peek('fred', series_id)
+        if cached is not None and len(cached.dropna()) > 0:
+            RECORDER.note_cache('registry', 'hit')
+            return cached.dropna().iloc[-limit:]
+        
+        def load(_):
+            start = datetime.now() - timedelta(days=lookback_days)
+            latest = self.fred.get_series(series_id, start, sort_order='desc', limit=limit).dropna()
+            if len(latest) == 0:
+                RECORDER.note_retry()
+                latest = self.fred.get_series(series_id, sort_order='desc', limit=limit).dropna()
+            return latest.sort_index()
+        return self.registry.get('fred-latest', series_id, None, load)
+    
+    def _timeseries(self, series, series_id, name=None):
+        """Wrap a FRED series (or one derived from it) as a TimeSeries at the series' native frequency"""
+        return TimeSeries.from_series(series, freq=frequency_for('fred', series_id), name=name or series_id)
+    
+    def _price_panel(self, tickers, period):
+        return download_price_panel(tickers, period, self.registry, self.store)
+    
+    def _yahoo_history(self, ticker, period):
+        """Fetch OHLCV history for one ticker through the registry (empty DataFrame if unavailable)"""
+        return self._price_panel([ticker], period).get(ticker, pd.DataFrame())
+    
+    def fallback(self, getter, *args, **kwargs):
+        """
+        The value a getter returns when its upstream is unavailable, without calling upstream.
+
+        Args:
+            getter: Name of the get_* method
+            *args, **kwargs: Arguments as the getter takes them; its own defaults fill in the rest
+        """
+        if isinstance(sys.exc_info()[1], RateLimited):
+            # Called from a getter's except clause while throttled: surface it rather than sample data
+            raise
+        default = self.FALLBACKS[getter]
+        arguments = inspect.signature(getattr(self, getter)).bind(*args, **kwargs)
+        # Whatever else the getter fetched, its result is this default
+        RECORDER.note_sample(getter)
+        if not callable(default):
+            return default
+        arguments.apply_defaults()
+        return default(self, *arguments.args, **arguments.kwargs)
     
     def get_gdp_data(self, years=10):
         if not self.fred:
-            return self._get_sample_gdp_data(years)
+            return self.fallback('get_gdp_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            gdp = self.fred.get_series('GDP', start_date, end_date)
-            return pd.DataFrame({'date': gdp.index, 'value': gdp.values})
-        except:
-            return self._get_sample_gdp_data(years)
+            gdp = self._fred_series('GDP', years*365)
+            return self._timeseries(gdp, 'GDP')
+        except Exception:
+            return self.fallback('get_gdp_data', years)
     
     def get_inflation_data(self, years=10):
         if not self.fred:
-            return self._get_sample_inflation_data(years)
+            return self.fallback('get_inflation_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            cpi = self.fred.get_series('CPIAUCSL', start_date, end_date)
+            cpi = self._fred_series('CPIAUCSL', years*365)
             inflation = cpi.pct_change(12) * 100
-            return pd.DataFrame({'date': inflation.index, 'value': inflation.values})
-        except:
-            return self._get_sample_inflation_data(years)
+            return self._timeseries(inflation, 'CPIAUCSL', 'inflation')
+        except Exception:
+            return self.fallback('get_inflation_data', years)
     
     def get_unemployment_data(self, years=10):
         if not self.fred:
-            return self._get_sample_unemployment_data(years)
+            return self.fallback('get_unemployment_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            unemployment = self.fred.get_series('UNRATE', start_date, end_date)
-            return pd.DataFrame({'date': unemployment.index, 'value': unemployment.values})
-        except:
-            return self._get_sample_unemployment_data(years)
+            unemployment = self._fred_series('UNRATE', years*365)
+            return self._timeseries(unemployment, 'UNRATE')
+        except Exception:
+            return self.fallback('get_unemployment_data', years)
     
     def get_interest_rate_data(self, years=10):
         if not self.fred:
-            return self._get_sample_interest_rate_data(years)
+            return self.fallback('get_interest_rate_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
             # Use DFF (Daily Effective Federal Funds Rate) for most current data
             # Falls back to FEDFUNDS (monthly average) if daily data unavailable
+            series_id = 'DFF'
             try:
-                fed_funds = self.fred.get_series('DFF', start_date, end_date)
-            except:
-                fed_funds = self.fred.get_series('FEDFUNDS', start_date, end_date)
-            return pd.DataFrame({'date': fed_funds.index, 'value': fed_funds.values})
-        except:
-            return self._get_sample_interest_rate_data(years)
+                fed_funds = self._fred_series(series_id, years*365)
+            except RateLimited:
+                raise
+            except Exception:
+                series_id = 'FEDFUNDS'
+                fed_funds = self._fred_series(series_id, years*365)
+            return self._timeseries(fed_funds, series_id)
+        except Exception:
+            return self.fallback('get_interest_rate_data', years)
     
     def get_m2_supply_data(self, years=10):
         if not self.fred:
-            return self._get_sample_m2_data(years)
+            return self.fallback('get_m2_supply_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            m2 = self.fred.get_series('M2SL', start_date, end_date)
-            return pd.DataFrame({'date': m2.index, 'value': m2.values})
-        except:
-            return self._get_sample_m2_data(years)
+            m2 = self._fred_series('M2SL', years*365)
+            return self._timeseries(m2, 'M2SL')
+        except Exception:
+            return self.fallback('get_m2_supply_data', years)
     
     def get_ism_manufacturing(self, years=10):
-        return self._get_sample_ism_data(years, 'manufacturing')
+        return self.fallback('get_ism_manufacturing', years)
     
     def get_ism_services(self, years=10):
-        return self._get_sample_ism_data(years, 'services')
+        return self.fallback('get_ism_services', years)
     
     def get_bond_yields(self):
         if not self.fred:
-            return self._get_sample_bond_yields()
+            return self.fallback('get_bond_yields')
         try:
             yields = {}
             yield_series = {
@@ -93,167 +459,155 @@ class EconomicDataFetcher:
             }
             for name, series_id in yield_series.items():
                 try:
-                    data = self.fred.get_series(series_id)
+                    data = self._fred_latest(series_id)
                     yields[name] = data.iloc[-1] if len(data) > 0 else None
-                except:
+                except RateLimited:
+                    raise
+                except Exception:
                     yields[name] = None
             return yields
-        except:
-            return self._get_sample_bond_yields()
+        except Exception:
+            return self.fallback('get_bond_yields')
     
     def get_gold_price(self):
         try:
-            gold = yf.Ticker("GC=F")
-            hist = gold.history(period="5d")
+            hist = self._yahoo_history("GC=F", "5d")
             if not hist.empty:
                 return hist['Close'].iloc[-1]
             else:
-                gold_etf = yf.Ticker("GLD")
-                hist = gold_etf.history(period="5d")
-                return hist['Close'].iloc[-1] if not hist.empty else 2000.0
-        except:
-            return 2000.0
+                hist = self._yahoo_history("GLD", "5d")
+                return hist['Close'].iloc[-1] if not hist.empty else self.fallback('get_gold_price')
+        except Exception:
+            return self.fallback('get_gold_price')
     
     def get_bitcoin_price(self):
         try:
-            btc = yf.Ticker("BTC-USD")
-            hist = btc.history(period="5d")
-            return hist['Close'].iloc[-1] if not hist.empty else 50000.0
-        except:
-            return 50000.0
+            hist = self._yahoo_history("BTC-USD", "5d")
+            return hist['Close'].iloc[-1] if not hist.empty else self.fallback('get_bitcoin_price')
+        except Exception:
+            return self.fallback('get_bitcoin_price')
     
     def get_dxy_data(self):
         try:
-            dxy = yf.Ticker("DX-Y.NYB")
-            hist = dxy.history(period="5d")
+            hist = self._yahoo_history("DX-Y.NYB", "5d")
             if not hist.empty:
                 return hist['Close'].iloc[-1]
             else:
-                uup = yf.Ticker("UUP")
-                hist = uup.history(period="5d")
-                return hist['Close'].iloc[-1] if not hist.empty else 100.0
-        except:
-            return 100.0
+                RECORDER.note_retry()
+                hist = self._yahoo_history("UUP", "5d")
+                return hist['Close'].iloc[-1] if not hist.empty else self.fallback('get_dxy_data')
+        except Exception:
+            return self.fallback('get_dxy_data')
     
     def get_vix(self):
         try:
-            vix = yf.Ticker("^VIX")
-            hist = vix.history(period="5d")
-            return hist['Close'].iloc[-1] if not hist.empty else 15.0
-        except:
-            return 15.0
+            hist = self._yahoo_history("^VIX", "5d")
+            return hist['Close'].iloc[-1] if not hist.empty else self.fallback('get_vix')
+        except Exception:
+            return self.fallback('get_vix')
     
     def get_credit_spread(self):
         if not self.fred:
-            return 3.5
+            return self.fallback('get_credit_spread')
         try:
-            spread = self.fred.get_series('BAMLH0A0HYM2')
-            return spread.iloc[-1] if len(spread) > 0 else 3.5
-        except:
-            return 3.5
+            spread = self._fred_latest('BAMLH0A0HYM2')
+            return spread.iloc[-1] if len(spread) > 0 else self.fallback('get_credit_spread')
+        except Exception:
+            return self.fallback('get_credit_spread')
     
     def get_ted_spread(self):
         if not self.fred:
-            return 0.3
+            return self.fallback('get_ted_spread')
         try:
-            ted = self.fred.get_series('TEDRATE')
-            return ted.iloc[-1] if len(ted) > 0 else 0.3
-        except:
-            return 0.3
+            ted = self._fred_latest('TEDRATE')
+            return ted.iloc[-1] if len(ted) > 0 else self.fallback('get_ted_spread')
+        except Exception:
+            return self.fallback('get_ted_spread')
     
     def get_fed_balance_sheet(self):
         if not self.fred:
-            return 7500.0
+            return self.fallback('get_fed_balance_sheet')
         try:
-            balance = self.fred.get_series('WALCL')
-            return balance.iloc[-1] if len(balance) > 0 else 7500.0
-        except:
-            return 7500.0
+            balance = self._fred_latest('WALCL')
+            return balance.iloc[-1] if len(balance) > 0 else self.fallback('get_fed_balance_sheet')
+        except Exception:
+            return self.fallback('get_fed_balance_sheet')
     
     def get_reverse_repo(self):
         if not self.fred:
-            return 500.0
+            return self.fallback('get_reverse_repo')
         try:
-            rrp = self.fred.get_series('RRPONTSYD')
-            return rrp.iloc[-1] if len(rrp) > 0 else 500.0
-        except:
-            return 500.0
+            rrp = self._fred_latest('RRPONTSYD')
+            return rrp.iloc[-1] if len(rrp) > 0 else self.fallback('get_reverse_repo')
+        except Exception:
+            return self.fallback('get_reverse_repo')
     
     def get_sp500_data(self, days=252):
         try:
             ticker = "^GSPC"
-            data = yf.download(ticker, period=f"{days}d", progress=False)
+            data = self._yahoo_history(ticker, f"{days}d")
             if len(data) == 0:
-                return self._get_sample_sp500_data(days)
-            return pd.DataFrame({
-                'date': data.index,
-                'price': data['Close'].values
-            })
-        except:
-            return self._get_sample_sp500_data(days)
+                return self.fallback('get_sp500_data', days)
+            return TimeSeries.from_series(data['Close'], freq='daily', name=ticker, value_name='price')
+        except Exception:
+            return self.fallback('get_sp500_data', days)
     
     def get_put_call_ratio(self, days=10):
         try:
             if not self.fred:
-                return self._get_sample_put_call_ratio(days)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            pc_ratio = self.fred.get_series('PCCE', start_date, end_date)
+                return self.fallback('get_put_call_ratio', days)
+            pc_ratio = self._fred_series('PCCE', days)
             if len(pc_ratio) == 0:
-                return self._get_sample_put_call_ratio(days)
-            return pd.DataFrame({'date': pc_ratio.index, 'value': pc_ratio.values})
-        except:
-            return self._get_sample_put_call_ratio(days)
+                return self.fallback('get_put_call_ratio', days)
+            return self._timeseries(pc_ratio, 'PCCE')
+        except Exception:
+            return self.fallback('get_put_call_ratio', days)
     
     def get_nyse_highs_lows(self):
         try:
             highs_ticker = "^NYA-HI"
             lows_ticker = "^NYA-LO"
-            highs = yf.download(highs_ticker, period="5d", progress=False)
-            lows = yf.download(lows_ticker, period="5d", progress=False)
+            panel = self._price_panel([highs_ticker, lows_ticker], "5d")
+            highs = panel.get(highs_ticker, pd.DataFrame())
+            lows = panel.get(lows_ticker, pd.DataFrame())
             
             if len(highs) > 0 and len(lows) > 0:
                 return {
                     'highs': highs['Close'].iloc[-1] if len(highs) > 0 else 100,
                     'lows': lows['Close'].iloc[-1] if len(lows) > 0 else 50
                 }
-            return self._get_sample_nyse_highs_lows()
-        except:
-            return self._get_sample_nyse_highs_lows()
+            return self.fallback('get_nyse_highs_lows')
+        except Exception:
+            return self.fallback('get_nyse_highs_lows')
     
     def get_market_breadth(self, days=90):
         try:
-            advance_decline = yf.download("^AD", period=f"{days}d", progress=False)
+            advance_decline = self._yahoo_history("^AD", f"{days}d")
             if len(advance_decline) == 0:
-                return self._get_sample_market_breadth(days)
+                return self.fallback('get_market_breadth', days)
             
             cumulative = advance_decline['Close'].cumsum()
-            return pd.DataFrame({
-                'date': cumulative.index,
-                'value': cumulative.values
-            })
-        except:
-            return self._get_sample_market_breadth(days)
+            return TimeSeries.from_series(cumulative, freq='daily', name='^AD')
+        except Exception:
+            return self.fallback('get_market_breadth', days)
     
     def get_safe_haven_demand(self, days=20):
         try:
-            sp500 = yf.download("^GSPC", period=f"{days}d", progress=False)
-            tlt = yf.download("TLT", period=f"{days}d", progress=False)
+            panel = self._price_panel(["^GSPC", "TLT"], f"{days}d")
+            sp500 = panel.get("^GSPC", pd.DataFrame())
+            tlt = panel.get("TLT", pd.DataFrame())
             
             if len(sp500) > 0 and len(tlt) > 0:
                 sp500_return = (sp500['Close'].iloc[-1] / sp500['Close'].iloc[0] - 1) * 100
                 tlt_return = (tlt['Close'].iloc[-1] / tlt['Close'].iloc[0] - 1) * 100
                 return sp500_return - tlt_return
-            return 5.0
-        except:
-            return 5.0
+            return self.fallback('get_safe_haven_demand')
+        except Exception:
+            return self.fallback('get_safe_haven_demand')
     
     def get_fear_greed_index(self):
         try:
-            url = "https://production.dataviz.cnn.io/index/fearandgreed/graphdata"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(CNN_FEAR_GREED_URL)
             
             return {
                 'score': data['fear_and_greed']['score'],
@@ -263,19 +617,37 @@ class EconomicDataFetcher:
                 'previous_week': data['fear_and_greed'].get('previous_1_week', None),
                 'previous_month': data['fear_and_greed'].get('previous_1_month', None)
             }
-        except:
-            return self._get_sample_fear_greed_index()
+        except Exception:
+            return self.fallback('get_fear_greed_index')
+    
+    def _get_json(self, url, timeout=10):
+        # Skips the request outright while the CNN endpoint is known to be down
+        breaker = get_breaker('cnn')
+        breaker.check()
+        try:
+            get_limiter('cnn').acquire()
+            with FETCH_SECONDS.time(source='cnn'):
+                response = get_session().get(url, timeout=timeout)
+            throttled(response, 'cnn')
+            response.raise_for_status()
+            data = response.json()
+        except NEUTRAL_ERRORS:
+            breaker.abandon()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return data
     
     def get_nfci_data(self, years=5):
         if not self.fred:
-            return self._get_sample_nfci_data(years)
+            return self.fallback('get_nfci_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            nfci = self.fred.get_series('NFCI', start_date, end_date)
-            return pd.DataFrame({'date': nfci.index, 'value': nfci.values})
-        except:
-            return self._get_sample_nfci_data(years)
+            nfci = self._fred_series('NFCI', years*365)
+            return self._timeseries(nfci, 'NFCI')
+        except Exception:
+            return self.fallback('get_nfci_data', years)
     
     def get_market_momentum(self):
         try:
@@ -285,18 +657,13 @@ class EconomicDataFetcher:
                 'IWM': 'Russell 2000'
             }
             
+            panel = self._price_panel(tickers.keys(), "300d")
             results = {}
             for ticker, name in tickers.items():
-                data = yf.download(ticker, period="300d", progress=False)
-                if len(data) > 0:
-                    # Handle multi-index columns from yfinance
-                    if isinstance(data['Close'].iloc[-1], pd.Series):
-                        current_price = float(data['Close'].iloc[-1].values[0])
-                        ma_series = data['Close'].rolling(window=210).mean().iloc[-1]
-                        ma_10m = float(ma_series.values[0]) if isinstance(ma_series, pd.Series) else float(ma_series)
-                    else:
-                        current_price = float(data['Close'].iloc[-1])
-                        ma_10m = float(data['Close'].rolling(window=210).mean().iloc[-1])
+                data = panel.get(ticker)
+                if data is not None and len(data) > 0:
+                    current_price = float(data['Close'].iloc[-1])
+                    ma_10m = float(data['Close'].rolling(window=210).mean().iloc[-1])
                     
                     # Check if MA is valid (not NaN)
                     if pd.isna(ma_10m) or ma_10m == 0:
@@ -312,129 +679,123 @@ class EconomicDataFetcher:
                         'above_ma': current_price > ma_10m
                     }
             
-            return results if results else self._get_sample_market_momentum()
+            return results if results else self.fallback('get_market_momentum')
         except Exception as e:
             print(f"Error in get_market_momentum: {e}")
-            return self._get_sample_market_momentum()
+            return self.fallback('get_market_momentum')
     
     def get_put_call_ratio_latest(self):
         """Get current Put/Call Ratio from FRED - scalar value"""
         if not self.fred:
-            return 0.85
+            return self.fallback('get_put_call_ratio_latest')
         try:
-            pc_ratio = self.fred.get_series('PUTCALL')
-            return pc_ratio.iloc[-1] if len(pc_ratio) > 0 else 0.85
-        except:
-            return 0.85
+            pc_ratio = self._fred_latest('PUTCALL')
+            return pc_ratio.iloc[-1] if len(pc_ratio) > 0 else self.fallback('get_put_call_ratio_latest')
+        except Exception:
+            return self.fallback('get_put_call_ratio_latest')
     
     def get_put_call_ratio_chart_data(self, years=2):
         """Get historical Put/Call Ratio data for charting"""
         if not self.fred:
-            return self._get_sample_put_call_data(years)
+            return self.fallback('get_put_call_ratio_chart_data', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            pc_ratio = self.fred.get_series('PUTCALL', start_date, end_date)
-            return pd.DataFrame({'date': pc_ratio.index, 'value': pc_ratio.values})
-        except:
-            return self._get_sample_put_call_data(years)
+            pc_ratio = self._fred_series('PUTCALL', years*365)
+            return self._timeseries(pc_ratio, 'PUTCALL')
+        except Exception:
+            return self.fallback('get_put_call_ratio_chart_data', years)
     
     def get_vvix(self):
         """Get current VVIX (Volatility of VIX) from FRED"""
         if not self.fred:
-            return 90.0
+            return self.fallback('get_vvix')
         try:
-            vvix = self.fred.get_series('VVIXCLS')
-            return vvix.iloc[-1] if len(vvix) > 0 else 90.0
-        except:
-            return 90.0
+            vvix = self._fred_latest('VVIXCLS')
+            return vvix.iloc[-1] if len(vvix) > 0 else self.fallback('get_vvix')
+        except Exception:
+            return self.fallback('get_vvix')
     
     def get_vvix_historical(self, years=2):
         """Get historical VVIX data"""
         if not self.fred:
-            return self._get_sample_vvix_data(years)
+            return self.fallback('get_vvix_historical', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            vvix = self.fred.get_series('VVIXCLS', start_date, end_date)
-            return pd.DataFrame({'date': vvix.index, 'value': vvix.values})
-        except:
-            return self._get_sample_vvix_data(years)
+            vvix = self._fred_series('VVIXCLS', years*365)
+            return self._timeseries(vvix, 'VVIXCLS')
+        except Exception:
+            return self.fallback('get_vvix_historical', years)
     
     def get_hy_ig_credit_spread(self):
         """Get HY-IG Credit Spread (High Yield minus Investment Grade)"""
         if not self.fred:
-            return 2.5
+            return self.fallback('get_hy_ig_credit_spread')
         try:
             # High Yield spread
-            hy_spread = self.fred.get_series('BAMLH0A0HYM2')
+            hy_spread = self._fred_latest('BAMLH0A0HYM2')
             # Investment Grade spread
-            ig_spread = self.fred.get_series('BAMLC0A0CM')
+            ig_spread = self._fred_latest('BAMLC0A0CM')
             
             if len(hy_spread) > 0 and len(ig_spread) > 0:
                 return hy_spread.iloc[-1] - ig_spread.iloc[-1]
             else:
-                return 2.5
-        except:
-            return 2.5
+                return self.fallback('get_hy_ig_credit_spread')
+        except Exception:
+            return self.fallback('get_hy_ig_credit_spread')
     
     def get_hy_ig_spread_historical(self, years=5):
         """Get historical HY-IG Credit Spread differential"""
         if not self.fred:
-            return self._get_sample_credit_spread_data(years)
+            return self.fallback('get_hy_ig_spread_historical', years)
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=years*365)
-            
-            hy_spread = self.fred.get_series('BAMLH0A0HYM2', start_date, end_date)
-            ig_spread = self.fred.get_series('BAMLC0A0CM', start_date, end_date)
+            hy_spread = self._fred_series('BAMLH0A0HYM2', years*365)
+            ig_spread = self._fred_series('BAMLC0A0CM', years*365)
             
             # Calculate differential
             spread_diff = hy_spread - ig_spread
-            return pd.DataFrame({'date': spread_diff.index, 'value': spread_diff.values})
-        except:
-            return self._get_sample_credit_spread_data(years)
+            return self._timeseries(spread_diff, 'BAMLH0A0HYM2', 'hy_ig_spread')
+        except Exception:
+            return self.fallback('get_hy_ig_spread_historical', years)
     
     def get_etf_flows(self, days=30):
         """Get ETF flows for major indexes - using calculated estimates from volume data"""
         # Note: True ETF flow data requires subscription services
         # This uses volume-based estimates as a proxy
-        return self._get_sample_etf_flows(days)
+        return self.fallback('get_etf_flows', days)
     
     def get_aaii_sentiment(self):
         """Get AAII Sentiment Survey - % Bullish/Bearish retail investors"""
         # Note: AAII data requires subscription or scraping
         # Using sample data for demonstration
-        return self._get_sample_aaii_sentiment()
+        return self.fallback('get_aaii_sentiment')
     
     def get_aaii_sentiment_historical(self, weeks=52):
         """Get historical AAII Sentiment Survey data"""
-        return self._get_sample_aaii_sentiment_historical(weeks)
+        return self.fallback('get_aaii_sentiment_historical', weeks)
     
     def _get_sample_gdp_data(self, years):
-        dates = pd.date_range(end=datetime.now(), periods=years*4, freq='Q')
-        values = [20000 + i*500 + (i%4)*200 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        periods = years*4
+        dates = SAMPLE_DATA.dates(periods, 'QE')
+        values = SAMPLE_DATA.ramp(periods, 20000, 500) + (np.arange(periods) % 4)*200
+        return TimeSeries(dates, values, freq='quarterly')
     
     def _get_sample_inflation_data(self, years):
-        dates = pd.date_range(end=datetime.now(), periods=years*12, freq='M')
-        values = [2.0 + (i%24)/12 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        dates = SAMPLE_DATA.dates(years*12, 'ME')
+        values = SAMPLE_DATA.sawtooth(years*12, 2.0, 24, 1/12)
+        return TimeSeries(dates, values, freq='monthly')
     
     def _get_sample_unemployment_data(self, years):
-        dates = pd.date_range(end=datetime.now(), periods=years*12, freq='M')
-        values = [4.5 + (i%36)/18 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        dates = SAMPLE_DATA.dates(years*12, 'ME')
+        values = SAMPLE_DATA.sawtooth(years*12, 4.5, 36, 1/18)
+        return TimeSeries(dates, values, freq='monthly')
     
     def _get_sample_interest_rate_data(self, years):
-        dates = pd.date_range(end=datetime.now(), periods=years*12, freq='M')
-        values = [2.0 + (i%48)/24 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        dates = SAMPLE_DATA.dates(years*12, 'ME')
+        values = SAMPLE_DATA.sawtooth(years*12, 2.0, 48, 1/24)
+        return TimeSeries(dates, values, freq='monthly')
     
     def _get_sample_m2_data(self, years):
-        dates = pd.date_range(end=datetime.now(), periods=years*12, freq='M')
-        values = [18000 + i*50 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        dates = SAMPLE_DATA.dates(years*12, 'ME')
+        values = SAMPLE_DATA.ramp(years*12, 18000, 50)
+        return TimeSeries(dates, values, freq='monthly')
     
     def _get_sample_bond_yields(self):
         return {
@@ -445,38 +806,35 @@ class EconomicDataFetcher:
         }
     
     def _get_sample_ism_data(self, years, type='manufacturing'):
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=years*12, freq='M')
+        periods = years*12
+        dates = SAMPLE_DATA.dates(periods, 'ME')
         if type == 'manufacturing':
-            base = 51.5
-            trend = [base + 3*np.sin(i*np.pi/12) + np.random.normal(0, 1.5) for i in range(len(dates))]
-            values = [max(45, min(58, v)) for v in trend]
+            trend = SAMPLE_DATA.wave(periods, 51.5, 3, 24) + SAMPLE_DATA.noise('ism_manufacturing', periods, 1.5)
+            values = np.clip(trend, 45, 58)
         else:
-            base = 52.5
-            trend = [base + 2.5*np.sin(i*np.pi/12 + 1) + np.random.normal(0, 1.2) for i in range(len(dates))]
-            values = [max(46, min(60, v)) for v in trend]
-        return pd.DataFrame({'date': dates, 'value': values})
+            trend = SAMPLE_DATA.wave(periods, 52.5, 2.5, 24, phase=1) + SAMPLE_DATA.noise('ism_services', periods, 1.2)
+            values = np.clip(trend, 46, 60)
+        return TimeSeries(dates, values, freq='monthly')
     
     def _get_sample_sp500_data(self, days):
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        prices = [4500 + i*2 + (i%20)*10 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'price': prices})
+        dates = SAMPLE_DATA.dates(days, 'D')
+        prices = SAMPLE_DATA.ramp(days, 4500, 2) + (np.arange(days) % 20)*10
+        return TimeSeries(dates, prices, freq='daily', value_name='price')
     
     def _get_sample_put_call_ratio(self, days):
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        values = [0.8 + (i%10)*0.05 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        dates = SAMPLE_DATA.dates(days, 'D')
+        values = SAMPLE_DATA.sawtooth(days, 0.8, 10, 0.05)
+        return TimeSeries(dates, values, freq='daily')
     
     def _get_sample_nyse_highs_lows(self):
         return {'highs': 120, 'lows': 45}
     
     def _get_sample_market_breadth(self, days):
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        values = [1000 + i*5 for i in range(len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values})
+        dates = SAMPLE_DATA.dates(days, 'D')
+        values = SAMPLE_DATA.ramp(days, 1000, 5)
+        return TimeSeries(dates, values, freq='daily')
     
     def _get_sample_fear_greed_index(self):
-        import numpy as np
         import random
         
         day_of_year = datetime.now().timetuple().tm_yday
@@ -518,37 +876,37 @@ class EconomicDataFetcher:
         }
     
     def _get_sample_nfci_data(self, years):
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=years*52, freq='W')
-        values = [-0.2 + 0.4*np.sin(np.arange(len(dates))*np.pi/26) + np.random.normal(0, 0.15, len(dates))]
-        return pd.DataFrame({'date': dates, 'value': values[0]})
+        periods = years*52
+        dates = SAMPLE_DATA.dates(periods, 'W')
+        values = SAMPLE_DATA.wave(periods, -0.2, 0.4, 52) + SAMPLE_DATA.noise('nfci', periods, 0.15)
+        return TimeSeries(dates, values, freq='weekly')
     
     def _get_sample_put_call_data(self, years):
         """Generate sample Put/Call Ratio data"""
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=years*252, freq='D')
+        periods = years*252
+        dates = SAMPLE_DATA.dates(periods, 'D')
         # Put/Call typically ranges 0.5-1.5, with mean around 0.85
-        values = 0.85 + 0.2*np.sin(np.arange(len(dates))*2*np.pi/252) + np.random.normal(0, 0.1, len(dates))
+        values = SAMPLE_DATA.wave(periods, 0.85, 0.2, 252) + SAMPLE_DATA.noise('put_call', periods, 0.1)
         values = np.clip(values, 0.4, 1.6)
-        return pd.DataFrame({'date': dates, 'value': values})
+        return TimeSeries(dates, values, freq='daily')
     
     def _get_sample_vvix_data(self, years):
         """Generate sample VVIX data"""
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=years*252, freq='D')
+        periods = years*252
+        dates = SAMPLE_DATA.dates(periods, 'D')
         # VVIX typically ranges 70-150
-        values = 90 + 15*np.sin(np.arange(len(dates))*2*np.pi/252) + np.random.normal(0, 8, len(dates))
+        values = SAMPLE_DATA.wave(periods, 90, 15, 252) + SAMPLE_DATA.noise('vvix', periods, 8)
         values = np.clip(values, 60, 180)
-        return pd.DataFrame({'date': dates, 'value': values})
+        return TimeSeries(dates, values, freq='daily')
     
     def _get_sample_credit_spread_data(self, years):
         """Generate sample HY-IG Credit Spread data"""
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=years*252, freq='D')
+        periods = years*252
+        dates = SAMPLE_DATA.dates(periods, 'D')
         # HY-IG spread typically ranges 2-6%
-        values = 3.0 + 1.5*np.sin(np.arange(len(dates))*2*np.pi/730) + np.random.normal(0, 0.3, len(dates))
+        values = SAMPLE_DATA.wave(periods, 3.0, 1.5, 730) + SAMPLE_DATA.noise('credit_spread', periods, 0.3)
         values = np.clip(values, 1.5, 8.0)
-        return pd.DataFrame({'date': dates, 'value': values})
+        return TimeSeries(dates, values, freq='daily')
     
     def _get_sample_market_momentum(self):
         return {
@@ -577,23 +935,15 @@ class EconomicDataFetcher:
     
     def _get_sample_etf_flows(self, days):
         """Generate sample ETF flow data for major indexes"""
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
+        dates = SAMPLE_DATA.dates(days, 'D')
         
         # Generate flows in billions for major ETFs
-        flows = {
-            'SPY': np.random.normal(0.2, 1.5, days),  # Mean slight inflow, high volatility
-            'QQQ': np.random.normal(0.1, 1.2, days),  # Tech flows
-            'IWM': np.random.normal(-0.05, 0.8, days),  # Small caps often see outflows
-            'TLT': np.random.normal(0.05, 0.6, days)  # Bond flows more stable
-        }
-        
         return pd.DataFrame({
             'date': dates,
-            'SPY': flows['SPY'],
-            'QQQ': flows['QQQ'],
-            'IWM': flows['IWM'],
-            'TLT': flows['TLT']
+            'SPY': SAMPLE_DATA.noise('flows_SPY', days, 1.5, loc=0.2),  # Mean slight inflow, high volatility
+            'QQQ': SAMPLE_DATA.noise('flows_QQQ', days, 1.2, loc=0.1),  # Tech flows
+            'IWM': SAMPLE_DATA.noise('flows_IWM', days, 0.8, loc=-0.05),  # Small caps often see outflows
+            'TLT': SAMPLE_DATA.noise('flows_TLT', days, 0.6, loc=0.05)  # Bond flows more stable
         })
     
     def _get_sample_aaii_sentiment(self):
@@ -617,14 +967,13 @@ class EconomicDataFetcher:
     
     def _get_sample_aaii_sentiment_historical(self, weeks):
         """Generate historical AAII sentiment data"""
-        import numpy as np
-        dates = pd.date_range(end=datetime.now(), periods=weeks, freq='W-THU')
+        dates = SAMPLE_DATA.dates(weeks, 'W-THU')
         
         # Generate sentiment waves with realistic patterns
-        bullish_base = 35 + 10*np.sin(np.arange(weeks)*2*np.pi/52) + np.random.normal(0, 5, weeks)
+        bullish_base = SAMPLE_DATA.wave(weeks, 35, 10, 52) + SAMPLE_DATA.noise('aaii_bullish', weeks, 5)
         bullish = np.clip(bullish_base, 20, 55)
         
-        neutral_base = 30 + 3*np.sin(np.arange(weeks)*2*np.pi/26 + 1) + np.random.normal(0, 3, weeks)
+        neutral_base = SAMPLE_DATA.wave(weeks, 30, 3, 26, phase=1) + SAMPLE_DATA.noise('aaii_neutral', weeks, 3)
         neutral = np.clip(neutral_base, 20, 40)
         
         # Bearish is the remainder to make it sum to 100
@@ -638,9 +987,13 @@ class EconomicDataFetcher:
             'bull_bear_spread': bullish - bearish
         })
 
-
+@recorded('market')
 class MarketDataFetcher:
-    def __init__(self):
+    def __init__(self, registry=None, store=None, prices=None):
+        self.registry = registry if registry is not None else SeriesRegistry()
+        self.store = store
+        # PriceStore the bundle's closes are mapped from, shared by every process on the host
+        self.prices = prices if prices is not None else get_price_store()
         self.sector_etfs = {
             'Technology': 'XLK',
             'Financials': 'XLF',
@@ -662,101 +1015,84 @@ class MarketDataFetcher:
             'Gold': 'GLD'
         }
     
-    def get_sector_performance(self, period='1y'):
-        sector_data = {}
-        for sector, ticker in self.sector_etfs.items():
+    def _price_panel(self, tickers, period):
+        return download_price_panel(tickers, period, self.registry, self.store)
+    
+    def _price_summaries(self, tickers, period, fallback):
+        # Closes only: the bundle is cached, hashed and pickled per replica, and no chart
+        # built from it needs Open/High/Low/Volume
+        try:
+            panel = self._price_panel(tickers.values(), period)
+        except RateLimited:
+            raise
+        except Exception:
+            panel = {}
+        panel = {ticker: data for ticker, data in panel.items() if data is not None and not data.empty}
+        histories = {}
+        if self.prices is not None:
             try:
-                data = yf.download(ticker, period=period, progress=False)
-                if not data.empty:
-                    performance = ((data['Close'][-1] / data['Close'][0]) - 1) * 100
-                    sector_data[sector] = {
-                        'performance': performance,
-                        'current_price': data['Close'][-1],
-                        'data': data
-                    }
-                else:
-                    sector_data[sector] = self._get_fallback_sector_data(sector)
-            except:
-                sector_data[sector] = self._get_fallback_sector_data(sector)
-        return sector_data
+                histories = self.prices.store(panel)
+            except Exception:
+                histories = {}
+        histories.update(PriceHistory.panel({ticker: data for ticker, data in panel.items() if ticker not in histories}))
+        summaries = {}
+        for name, ticker in tickers.items():
+            if ticker in panel:
+                close = panel[ticker]['Close']
+                summaries[name] = {
+                    'performance': ((close.iloc[-1] / close.iloc[0]) - 1) * 100,
+                    'current_price': close.iloc[-1],
+                    'data': histories[ticker]
+                }
+            else:
+                summaries[name] = fallback(name)
+        return summaries
+    
+    def get_sector_performance(self, period='1y'):
+        return self._price_summaries(self.sector_etfs, period, self._get_fallback_sector_data)
     
     def _get_fallback_sector_data(self, sector):
-        import random
-        import numpy as np
-        random.seed(hash(sector) % 1000)
-        performance = random.uniform(-10, 25)
-        price = random.uniform(80, 150)
+        rng = SAMPLE_DATA.rng('sector', sector)
+        performance = rng.uniform(-10, 25)
+        price = rng.uniform(80, 150)
         
-        # Generate sample historical data for chart
-        dates = pd.date_range(end=datetime.now(), periods=365, freq='D')
+        # Generate sample closes for chart
+        periods = 365
+        dates = SAMPLE_DATA.dates(periods, 'D')
         # Generate price series with some volatility
-        np.random.seed(hash(sector) % 1000)
-        returns = np.random.normal(0.0005, 0.01, len(dates))
-        prices = price * (1 + returns).cumprod()
-        
-        sample_data = pd.DataFrame({
-            'Close': prices,
-            'Open': prices * 0.99,
-            'High': prices * 1.01,
-            'Low': prices * 0.98,
-            'Volume': np.random.randint(1000000, 10000000, len(dates))
-        }, index=dates)
+        prices = SAMPLE_DATA.prices(sector, periods, price, 0.0005, 0.01)
         
         return {
             'performance': performance,
             'current_price': price,
-            'data': sample_data
+            'data': PriceHistory(dates, prices, self.sector_etfs.get(sector))
         }
     
     def get_asset_class_data(self, period='5y'):
-        asset_data = {}
-        for asset, ticker in self.asset_tickers.items():
-            try:
-                data = yf.download(ticker, period=period, progress=False)
-                if not data.empty:
-                    performance = ((data['Close'][-1] / data['Close'][0]) - 1) * 100
-                    asset_data[asset] = {
-                        'performance': performance,
-                        'current_price': data['Close'][-1],
-                        'data': data
-                    }
-                else:
-                    asset_data[asset] = self._get_fallback_asset_data(asset)
-            except:
-                asset_data[asset] = self._get_fallback_asset_data(asset)
-        return asset_data
+        return self._price_summaries(self.asset_tickers, period, self._get_fallback_asset_data)
     
     def _get_fallback_asset_data(self, asset):
-        import random
-        import numpy as np
-        random.seed(hash(asset) % 1000)
-        performance = random.uniform(-5, 40)
-        price = random.uniform(100, 300)
+        rng = SAMPLE_DATA.rng('asset', asset)
+        performance = rng.uniform(-5, 40)
+        price = rng.uniform(100, 300)
         
-        # Generate sample historical data for chart
-        dates = pd.date_range(end=datetime.now(), periods=365*5, freq='D')
+        # Generate sample closes for chart
+        periods = 365*5
+        dates = SAMPLE_DATA.dates(periods, 'D')
         # Generate price series with some volatility
-        np.random.seed(hash(asset) % 1000)
-        returns = np.random.normal(0.0003, 0.008, len(dates))
-        prices = price * (1 + returns).cumprod()
-        
-        sample_data = pd.DataFrame({
-            'Close': prices,
-            'Open': prices * 0.99,
-            'High': prices * 1.01,
-            'Low': prices * 0.98,
-            'Volume': np.random.randint(5000000, 50000000, len(dates))
-        }, index=dates)
+        prices = SAMPLE_DATA.prices(asset, periods, price, 0.0003, 0.008)
         
         return {
             'performance': performance,
             'current_price': price,
-            'data': sample_data
+            'data': PriceHistory(dates, prices, self.asset_tickers.get(asset))
         }
     
     def get_market_index_data(self, ticker='^GSPC', period='5y'):
+        """Full OHLCV history of one ticker, for charts that need more than the bundle's closes"""
         try:
-            data = yf.download(ticker, period=period, progress=False)
-            return data
-        except:
+            return self._price_panel([ticker], period).get(ticker, pd.DataFrame())
+        except RateLimited:
+            raise
+        except Exception:
             return pd.DataFrame()
@@ -0,0 +1,146 @@
+import functools
+import logging
+import os
+from data_fetcher import EconomicDataFetcher, MarketDataFetcher, fetch_concurrently
+from indicator_graph import build_indicator_graph
+from series_registry import SeriesRegistry
+from series_store import SeriesStore
+from shared_cache import HostSnapshotCache, SQLiteSnapshotStore, shared_cache_path
+from snapshot import SnapshotCache
+from snapshot_store import SharedSnapshotCache, SnapshotStore
+
+logger = logging.getLogger('macrocycle.pipeline')
+
+
+def fetch_economic_data(registry=None, store=None, concurrent=True):
+    fetcher = EconomicDataFetcher(registry=registry, store=store)
+    getters = {
+        'gdp': 'get_gdp_data',
+        'inflation': 'get_inflation_data',
+        'unemployment': 'get_unemployment_data',
+        'interest_rate': 'get_interest_rate_data',
+        'm2_supply': 'get_m2_supply_data',
+        'bond_yields': 'get_bond_yields',
+        'gold_price': 'get_gold_price',
+        'bitcoin_price': 'get_bitcoin_price',
+        'dxy': 'get_dxy_data',
+        'vix': 'get_vix',
+        'vvix': 'get_vvix',
+        'credit_spread': 'get_credit_spread',
+        'hy_ig_spread': 'get_hy_ig_credit_spread',
+        'ted_spread': 'get_ted_spread',
+        'fed_balance_sheet': 'get_fed_balance_sheet',
+        'reverse_repo': 'get_reverse_repo',
+        'ism_manufacturing': 'get_ism_manufacturing',
+        'ism_services': 'get_ism_services',
+        'fear_greed': 'get_fear_greed_index',
+        'sp500': 'get_sp500_data',
+        'put_call_ratio': 'get_put_call_ratio',
+        'nyse_highs_lows': 'get_nyse_highs_lows',
+        'market_breadth': 'get_market_breadth',
+        'safe_haven_demand': 'get_safe_haven_demand',
+        'nfci': 'get_nfci_data',
+        'market_momentum': 'get_market_momentum',
+        'aaii_sentiment': 'get_aaii_sentiment'
+    }
+    tasks = {key: getattr(fetcher, getter) for key, getter in getters.items()}
+    if not concurrent:
+        return {key: task() for key, task in tasks.items()}
+    
+    # What the getters return themselves when an upstream call fails
+    fallbacks = {key: functools.partial(fetcher.fallback, getter) for key, getter in getters.items()}
+    return fetch_concurrently(
+        tasks,
+        fallbacks=fallbacks,
+        max_workers=8,
+        timeout=20,
+        timeouts={'fear_greed': 10},
+        deadline=45
+    )
+
+
+def fetch_market_data(registry=None, store=None):
+    fetcher = MarketDataFetcher(registry=registry, store=store)
+    econ_fetcher = EconomicDataFetcher(registry=registry, store=store)
+    return {
+        'sectors': fetcher.get_sector_performance('1y'),
+        'assets': fetcher.get_asset_class_data('5y'),
+        'sentiment': {
+            'put_call_ratio': econ_fetcher.get_put_call_ratio_latest(),
+            'put_call_historical': econ_fetcher.get_put_call_ratio_chart_data(2),
+            'vvix': econ_fetcher.get_vvix(),
+            'vvix_historical': econ_fetcher.get_vvix_historical(2),
+            'hy_ig_spread': econ_fetcher.get_hy_ig_credit_spread(),
+            'hy_ig_historical': econ_fetcher.get_hy_ig_spread_historical(5),
+            'etf_flows': econ_fetcher.get_etf_flows(30),
+            'aaii': econ_fetcher.get_aaii_sentiment(),
+            'aaii_historical': econ_fetcher.get_aaii_sentiment_historical(52)
+        }
+    }
+
+
+# Snapshot bundles the app renders from: loader and how often (seconds) each is rebuilt
+BUNDLES = {
+    'economic': (fetch_economic_data, 3600),
+    'market': (fetch_market_data, 1800),
+}
+
+
+def derive_bundle(name, data, graph=None):
+    """
+    Artefacts published alongside a freshly fetched bundle, keyed like Snapshot.derive.
+
+    Best effort: a node that fails (and any node downstream of it) is logged and left out,
+    and readers compute it themselves when they need it, so one bad indicator never keeps a
+    fetched bundle from being published.
+
+    Args:
+        name: Bundle name
+        data: The bundle
+        graph: IndicatorGraph to reuse across calls (a new one is built otherwise)
+    """
+    if name != 'economic':
+        return {}
+    try:
+        graph = graph or build_indicator_graph()
+        graph.update(data)
+    except Exception:
+        logger.exception("Deriving indicators for the %s bundle failed; publishing it without them", name)
+        return {}
+    indicators = {}
+    for node in graph.nodes:
+        try:
+            indicators[node] = graph.value(node)
+        except Exception as e:
+            logger.warning("Indicator %s not derived (%s: %s); readers will compute it", node, type(e).__name__, e)
+    return {'indicators': indicators}
+
+
+def build_snapshots():
+    """
+    Snapshot caches of every bundle, keyed by bundle name.
+
+    Bundles come from refresher.py's snapshot directory if MACROCYCLE_SNAPSHOT_DIR is set,
+    otherwise from the host-wide SQLite cache unless it is disabled, otherwise from this
+    process alone.
+    """
+    # One registry for both bundles so a cold start fetches each upstream series once
+    registry = SeriesRegistry(max_age=300)
+    store = SeriesStore()
+    loaders = {name: (lambda fetch=fetch: fetch(registry, store)) for name, (fetch, _) in BUNDLES.items()}
+    snapshot_dir = os.environ.get('MACROCYCLE_SNAPSHOT_DIR')
+    if snapshot_dir:
+        # Read the bundles refresher.py publishes; only fetch here if it has never published
+        shared = SnapshotStore(snapshot_dir)
+        return {name: SharedSnapshotCache(shared, name, fallback=loader) for name, loader in loaders.items()}
+    if shared_cache_path():
+        # Every app process on this host shares one fetch and one stored copy of each bundle
+        shared = SQLiteSnapshotStore(shared_cache_path())
+        return {
+            name: HostSnapshotCache(shared, name, loaders[name], max_age=max_age, derive=derive_bundle)
+            for name, (_, max_age) in BUNDLES.items()
+        }
+    return {
+        name: SnapshotCache(loaders[name], max_age=max_age, name=name)
+        for name, (_, max_age) in BUNDLES.items()
+    }
@@ -0,0 +1,141 @@
+import os
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from fredapi import Fred
+from cassette import CassetteAdapter, get_cassette
+from circuit_breaker import NEUTRAL_ERRORS, get_breaker
+from metrics import FETCH_SECONDS
+from provenance import RECORDER
+from rate_limiter import RateLimited, get_limiter
+
+# Hosts kept in the pool (FRED, CNN, ...) and keep-alive connections kept per host
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 8
+
+# Pause a source this long after it answers 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 60
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_session(gzip=True):
+    """
+    Process-wide requests.Session shared by all fetchers.
+
+    Connections are kept alive and pooled per host (up to POOL_MAXSIZE each, blocking when
+    the pool is exhausted), so repeated calls to api.stlouisfed.org reuse one TLS handshake.
+    Set gzip=False to ask servers for uncompressed bodies. When a cassette is active
+    (see cassette.use_cassette) responses are recorded to or replayed from it.
+    """
+    key = ('requests', gzip)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            pool = dict(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0, pool_block=True)
+            cassette = get_cassette()
+            adapter = CassetteAdapter(cassette, **pool) if cassette is not None else HTTPAdapter(**pool)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['Accept-Encoding'] = 'gzip, deflate' if gzip else 'identity'
+            session.hooks['response'].append(note_response)
+            _sessions[key] = session
+        return session
+
+
+def note_response(response, *args, **kwargs):
+    """Attribute a response (requests or httpx) to the getter being served on this thread (see provenance)"""
+    RECORDER.note_request(urlsplit(str(response.url)).hostname, len(response.content), ok=response.status_code < 400)
+
+
+def throttled(response, source):
+    """If the response is a 429, pause the source's rate limiter and raise RateLimited"""
+    if response.status_code != 429:
+        return
+    try:
+        retry_after = float(response.headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+    except ValueError:
+        retry_after = DEFAULT_RETRY_AFTER
+    get_limiter(source).pause(retry_after)
+    raise RateLimited(f"{source} answered 429; pausing for {retry_after:.0f}s")
+
+
+def parse_fred_response(response):
+    """
+    XML root of a FRED response (requests or httpx).
+
+    Raises:
+        RateLimited: on a 429, after pausing the FRED limiter; throttling is not an outage,
+            so callers do not count it against the breaker
+        ValueError: on a 5xx
+    """
+    throttled(response, 'fred')
+    if response.status_code >= 500:
+        raise ValueError(f"FRED returned HTTP {response.status_code}")
+    return ET.fromstring(response.content)
+
+
+def reset_sessions():
+    """Drop the shared sessions so the next get_session() builds a fresh transport"""
+    with _lock:
+        for session in _sessions.values():
+            if session is not None:
+                session.close()
+        _sessions.clear()
+
+
+def get_yahoo_session():
+    """
+    Shared session for yfinance.
+
+    Yahoo only answers browser-like clients, which yfinance implements with curl_cffi; one
+    impersonating curl_cffi session is shared so its connections and cookie/crumb are reused.
+    Returns None (yfinance manages its own session) if curl_cffi is not installed.
+    """
+    with _lock:
+        if 'yahoo' not in _sessions:
+            try:
+                from curl_cffi import requests as curl_requests
+                _sessions['yahoo'] = curl_requests.Session(impersonate='chrome')
+            except ImportError:
+                _sessions['yahoo'] = None
+        return _sessions['yahoo']
+
+
+class SessionFred(Fred):
+    """
+    fredapi client that issues requests through the shared pooled session instead of urlopen.
+
+    MACROCYCLE_FRED_URL overrides the API root, e.g. to point at a local stand-in server.
+    """
+
+    def __init__(self, api_key=None, session=None, timeout=20, root_url=None, **kwargs):
+        super().__init__(api_key=api_key, **kwargs)
+        self.session = session if session is not None else get_session()
+        self.timeout = timeout
+        self.root_url = root_url or os.environ.get('MACROCYCLE_FRED_URL') or self.root_url
+
+    # Overrides the name-mangled Fred.__fetch_data used by every fredapi query
+    def _Fred__fetch_data(self, url):
+        breaker = get_breaker('fred')
+        breaker.check()
+        try:
+            get_limiter('fred').acquire()
+            with FETCH_SECONDS.time(source='fred'):
+                response = self.session.get(url, params={'api_key': self.api_key}, timeout=self.timeout)
+            root = parse_fred_response(response)
+        except NEUTRAL_ERRORS:
+            breaker.abandon()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        # A 4xx with an XML error body (e.g. unknown series) means FRED itself is healthy
+        breaker.record_success()
+        if response.status_code >= 400:
+            raise ValueError(root.get('message'))
+        return root
@@ -0,0 +1,238 @@
+import threading
+import numpy as np
+import pandas as pd
+from business_cycle import BusinessCycleAnalyzer
+from indicator_panel import IndicatorPanel
+from metrics import FEAR_GREED_SECONDS
+from timeseries import TimeSeries
+
+# Input name for nodes that read the whole data bundle rather than named series
+ALL_SOURCES = '*'
+
+
+def _fingerprint(value):
+    """Cheap content key used to tell whether a source or node value actually changed"""
+    if isinstance(value, TimeSeries):
+        return ('ts', len(value), hash(value.timestamps.tobytes()), hash(value.values.tobytes()))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        columns = tuple(value.columns) if isinstance(value, pd.DataFrame) else value.name
+        return ('pd', value.shape, columns, hash(pd.util.hash_pandas_object(value).to_numpy().tobytes()))
+    if isinstance(value, dict):
+        return ('dict', tuple((key, _fingerprint(item)) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_fingerprint(item) for item in value))
+    if value is None or isinstance(value, (bool, int, float, str, np.number, pd.Timestamp)):
+        # repr, because NaN never equals itself
+        return (type(value).__name__, repr(value))
+    return ('id', id(value))
+
+
+class _Node:
+    __slots__ = ('name', 'inputs', 'compute', 'stamps', 'value', 'fingerprint', 'version', 'runs')
+
+    def __init__(self, name, inputs, compute):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.compute = compute
+        self.stamps = None
+        self.value = None
+        self.fingerprint = None
+        self.version = 0
+        self.runs = 0
+
+
+class IndicatorGraph:
+    """
+    Declarative graph of derived indicators with memoized nodes.
+
+    Sources are the raw getter results of a data bundle (gdp, bond_yields, vix, ...). A node
+    declares the sources or earlier nodes it reads and a function of those values; since
+    inputs must already exist as nodes or are taken to be sources, the graph is acyclic by
+    construction. update() fingerprints each source and moves the version of only those that
+    changed. Nodes are evaluated on read: a node recomputes only if one of its inputs moved
+    since it last ran, and a recompute that yields an equal value leaves its own version
+    alone, so nothing further downstream reruns either.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._sources = {}
+        self._clock = 0
+        self._bundle_version = 0
+        self.synced_version = None
+        # Re-entrant: evaluating a node evaluates its inputs
+        self._lock = threading.RLock()
+
+    def add(self, name, inputs, compute):
+        """
+        Declare a derived indicator.
+
+        Args:
+            name: Node name
+            inputs: Source or node names (ALL_SOURCES for the whole bundle as a dict)
+            compute: Function called with the input values, in order
+        """
+        with self._lock:
+            if name in self._nodes:
+                raise ValueError(f"Node {name} is already defined")
+            self._nodes[name] = _Node(name, inputs, compute)
+
+    def update(self, data):
+        """
+        Load a new data bundle, bumping the version of each source whose content changed.
+
+        Returns:
+            Set of changed source names
+        """
+        changed = set()
+        with self._lock:
+            for name in set(self._sources) | set(data):
+                value = data.get(name)
+                fingerprint = _fingerprint(value)
+                current = self._sources.get(name)
+                if current is not None and current[0] == fingerprint:
+                    continue
+                self._clock += 1
+                self._sources[name] = (fingerprint, value, self._clock)
+                changed.add(name)
+            if changed:
+                self._bundle_version = self._clock
+        return changed
+
+    def sync(self, data, version, precomputed=None):
+        """
+        update() from a versioned snapshot, skipping the fingerprinting if already synced to it.
+
+        Args:
+            data: The snapshot's data bundle
+            version: The snapshot's version
+            precomputed: Optional node values already derived from this data (e.g. by the
+                refresher process); they are taken as is rather than recomputed
+        """
+        with self._lock:
+            if version == self.synced_version:
+                return set()
+            changed = self.update(data)
+            for node in self._nodes.values():
+                # Declaration order, so a node's inputs are settled before it
+                if precomputed and node.name in precomputed:
+                    stamps = tuple(self._input(name)[0] for name in node.inputs)
+                    self._store(node, precomputed[node.name], stamps)
+            self.synced_version = version
+            return changed
+
+    def _input(self, name):
+        # (version, value) of a node input
+        if name == ALL_SOURCES:
+            return self._bundle_version, {key: entry[1] for key, entry in self._sources.items()}
+        node = self._nodes.get(name)
+        if node is not None:
+            self._evaluate(node)
+            return node.version, node.value
+        entry = self._sources.get(name)
+        return (0, None) if entry is None else (entry[2], entry[1])
+
+    def _evaluate(self, node):
+        inputs = [self._input(name) for name in node.inputs]
+        stamps = tuple(version for version, _ in inputs)
+        if stamps == node.stamps:
+            return
+        self._store(node, node.compute(*(value for _, value in inputs)), stamps)
+        node.runs += 1
+
+    def _store(self, node, value, stamps):
+        fingerprint = _fingerprint(value)
+        if fingerprint != node.fingerprint:
+            self._clock += 1
+            node.version = self._clock
+            node.fingerprint = fingerprint
+        node.value = value
+        node.stamps = stamps
+
+    def value(self, name):
+        """Current value of a node (recomputed only if its inputs changed) or of a source"""
+        with self._lock:
+            if name not in self._nodes and name not in self._sources:
+                raise KeyError(f"Unknown indicator: {name}")
+            return self._input(name)[1]
+
+    def values(self, *names):
+        return {name: self.value(name) for name in names}
+
+    def runs(self, name):
+        """How many times a node has been computed"""
+        return self._nodes[name].runs
+
+    @property
+    def nodes(self):
+        return list(self._nodes)
+
+
+def assess_liquidity(vix, credit_spread, ted_spread):
+    score = 0
+
+    if vix < 15:
+        score += 2
+    elif vix < 20:
+        score += 1
+    elif vix > 30:
+        score -= 2
+    elif vix > 25:
+        score -= 1
+
+    if credit_spread < 3:
+        score += 2
+    elif credit_spread < 4:
+        score += 1
+    elif credit_spread > 6:
+        score -= 2
+    elif credit_spread > 5:
+        score -= 1
+
+    if ted_spread < 0.3:
+        score += 1
+    elif ted_spread > 0.5:
+        score -= 2
+    elif ted_spread > 0.4:
+        score -= 1
+
+    if score >= 3:
+        return "Healthy", "🟢", "Strong liquidity conditions with low volatility and tight spreads"
+    elif score >= 0:
+        return "Moderate", "🟡", "Normal liquidity with some volatility present"
+    else:
+        return "Stressed", "🔴", "Tightening liquidity with elevated volatility and widening spreads"
+
+
+def yield_spread(bond_yields):
+    """10Y minus 2Y Treasury yield in percentage points (a missing maturity counts as 0)"""
+    bond_yields = bond_yields or {}
+    return (bond_yields.get('10Y') or 0) - (bond_yields.get('2Y') or 0)
+
+
+def m2_growth(m2_supply):
+    """M2 year-over-year growth in percent, on the monthly calendar"""
+    return IndicatorPanel.build({'m2_supply': m2_supply}).change('m2_supply', 12)
+
+
+def fear_greed(data):
+    # The calculator reads the whole bundle, so this node depends on every source.
+    # Imported here so fetching and caching bundles does not need it.
+    from fear_greed_calculator import FearGreedCalculator
+    with FEAR_GREED_SECONDS.time():
+        return FearGreedCalculator().calculate(data)
+
+
+def build_indicator_graph():
+    """The derived indicators shown across the app and given to the AI agent"""
+    graph = IndicatorGraph()
+    analyzer = BusinessCycleAnalyzer()
+    graph.add('yield_spread', ['bond_yields'], yield_spread)
+    graph.add('yield_spread_bps', ['yield_spread'], lambda spread: spread * 100)
+    graph.add('m2_growth', ['m2_supply'], m2_growth)
+    graph.add('liquidity', ['vix', 'credit_spread', 'ted_spread'], assess_liquidity)
+    graph.add('fear_greed', [ALL_SOURCES], fear_greed)
+    graph.add('cycle_analysis', ['gdp', 'unemployment', 'inflation'], analyzer.analyze_cycle_phase)
+    graph.add('cycle_analysis_ism', ['gdp', 'unemployment', 'inflation', 'ism_manufacturing', 'ism_services'],
+              analyzer.analyze_cycle_phase)
+    return graph
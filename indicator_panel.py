@@ -0,0 +1,97 @@
+import math
+import threading
+import numpy as np
+import pandas as pd
+from refresh_policy import FREQUENCY_POLICIES
+from timeseries import TimeSeries
+
+# Calendar every indicator is aligned to, as a pandas offset (month ends)
+CALENDAR = 'ME'
+CALENDAR_DAYS = 31
+
+# How many days an observation may be carried forward onto later calendar dates. Unlisted
+# series use one native period plus the usual publication lag (see refresh_policy), so a
+# quarterly print fills the following months but a discontinued series does not run on forever.
+FILL_DAYS = {
+    'sp500': 5,
+    'market_breadth': 5,
+    'put_call_ratio': 5,
+}
+
+
+def _fill_limit(name, freq):
+    days = FILL_DAYS.get(name)
+    if days is None:
+        policy = FREQUENCY_POLICIES.get(freq or 'daily', FREQUENCY_POLICIES['daily'])
+        days = policy.period_days + policy.publication_lag_days
+    return max(1, math.ceil(days / CALENDAR_DAYS))
+
+
+class IndicatorPanel:
+    """
+    Latest readings and month-over-month changes of an economic data bundle's indicators.
+
+    Dated indicators (quarterly to daily) are resampled to month-end values on one shared
+    monthly calendar and forward-filled up to a per-series limit, so period-over-period
+    changes compare like with like whatever the native frequency. The aligned frame is built
+    lazily, once; latest values come straight from the native TimeSeries or scalar readings.
+    Build one per data snapshot (Snapshot.derive). Derived indicators that combine several
+    series live in the indicator graph (indicator_graph.py).
+    """
+
+    def __init__(self, native, scalars=None, version=None):
+        self._native = dict(native)
+        self.scalars = dict(scalars or {})
+        self.version = version
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, data, version=None):
+        """Build from an economic data bundle (dict of getter results)"""
+        native = {name: value for name, value in data.items() if isinstance(value, TimeSeries) and len(value) > 0}
+        scalars = {name: float(value) for name, value in data.items()
+                   if isinstance(value, (int, float, np.floating, np.integer)) and not isinstance(value, bool)}
+        return cls(native, scalars, version)
+
+    def frame(self):
+        """DataFrame indexed by month ends with one column per dated indicator"""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    self._frame = self._align()
+        return self._frame
+
+    def _align(self):
+        resampled = {name: ts.to_series().resample(CALENDAR).last() for name, ts in self._native.items()}
+        if not resampled:
+            return pd.DataFrame()
+        start = min(series.index[0] for series in resampled.values())
+        end = max(series.index[-1] for series in resampled.values())
+        index = pd.date_range(start, end, freq=CALENDAR)
+        columns = {
+            name: series.reindex(index).ffill(limit=_fill_limit(name, self._native[name].freq))
+            for name, series in resampled.items()
+        }
+        return pd.DataFrame(columns, index=index)
+
+    def latest(self, name, default=np.nan):
+        """Most recent native observation of an indicator (or its scalar reading)"""
+        ts = self._native.get(name)
+        if ts is not None:
+            return ts.latest
+        return self.scalars.get(name, default)
+
+    def change(self, name, periods, default=0.0):
+        """Percent change of an indicator over `periods` months (e.g. 12 = year over year)"""
+        if name not in self._native:
+            return default
+        series = self.frame()[name]
+        last = series.last_valid_index()
+        position = series.index.get_loc(last) if last is not None else -1
+        if position < periods:
+            return default
+        current, base = series.iloc[position], series.iloc[position - periods]
+        if pd.isna(base) or base == 0:
+            return default
+        return (current / base - 1) * 100
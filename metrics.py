@@ -0,0 +1,269 @@
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+logger = logging.getLogger('macrocycle.metrics')
+
+# Seconds; spans a cached lookup (ms) up to a slow LLM round trip (a minute)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (typically seconds) over fixed cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state['counts'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a with-block, including when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels):
+        """
+        Decorator observing the duration of every call.
+
+        Labels that are not given are filled with the decorated function's name, so
+        @RENDER_SECONDS.timed() labels each page renderer by name.
+        """
+        def decorate(fn):
+            call_labels = {name: labels.get(name, fn.__name__) for name in self.labelnames}
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(**call_labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return 0 if state is None else state['count']
+
+    def _render_samples(self, items):
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(float(bound))))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {state['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            # Re-registering returns the existing metric, so re-executed modules keep their counts
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+FETCH_SECONDS = REGISTRY.histogram(
+    'macrocycle_fetch_seconds', 'Upstream request latency by source', ['source'])
+FETCH_FAILURES = REGISTRY.counter(
+    'macrocycle_fetch_failures_total', 'Failed upstream requests by source', ['source'])
+GETTER_SECONDS = REGISTRY.histogram(
+    'macrocycle_getter_seconds', 'Fetcher getter wall time including cache lookups', ['fetcher', 'getter'])
+SAMPLE_SUBSTITUTIONS = REGISTRY.counter(
+    'macrocycle_sample_substitutions_total', 'Getter results replaced by sample data', ['fetcher', 'getter'])
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    'macrocycle_rate_limit_wait_seconds', 'Time upstream requests spent queued for a rate-limit token', ['source'])
+RATE_LIMITED = REGISTRY.counter(
+    'macrocycle_rate_limited_total', 'Upstream requests abandoned after queueing too long for a token', ['source'])
+CYCLE_ANALYSIS_SECONDS = REGISTRY.histogram(
+    'macrocycle_cycle_analysis_seconds', 'BusinessCycleAnalyzer.analyze_cycle_phase runtime')
+FEAR_GREED_SECONDS = REGISTRY.histogram(
+    'macrocycle_fear_greed_seconds', 'Fear & Greed index computation time')
+RENDER_SECONDS = REGISTRY.histogram(
+    'macrocycle_render_seconds', 'Page section render time by _render_* function', ['function'])
+LLM_SECONDS = REGISTRY.histogram(
+    'macrocycle_llm_request_seconds', 'OpenAI chat completion round trip', ['model', 'call'])
+LLM_TOKENS = REGISTRY.counter(
+    'macrocycle_llm_tokens_total', 'OpenAI tokens used by kind (prompt, completion)', ['model', 'kind'])
+CHAT_SECONDS = REGISTRY.histogram(
+    'macrocycle_agent_chat_seconds', 'MacroCycleAgent.chat round trip including tool calls')
+CHAT_FAILURES = REGISTRY.counter(
+    'macrocycle_agent_chat_failures_total', 'MacroCycleAgent.chat calls that ended in an error')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def _env_int(name, default):
+    value = os.environ.get(name, '')
+    return int(value) if value != '' else default
+
+
+def start_metrics_server(port=None, host=None, offset=None, span=None):
+    """
+    Serve /metrics for Prometheus on a background thread (once per process).
+
+    Several processes on one host (app replicas, the refresher) each need their own port:
+    give each an offset, or let them share a base port and a span and each take the first
+    free port in it.
+
+    Args:
+        port: Base port; defaults to MACROCYCLE_METRICS_PORT. Nothing is started if neither
+            is set.
+        host: Interface to bind; defaults to MACROCYCLE_METRICS_HOST or 0.0.0.0 so a scraper
+            behind the load balancer can reach each replica
+        offset: Added to the base port; defaults to MACROCYCLE_METRICS_PORT_OFFSET or 0
+        span: Number of consecutive ports tried from base + offset; defaults to
+            MACROCYCLE_METRICS_PORT_SPAN or 1
+
+    Returns:
+        The running server, or None if metrics serving is disabled or every port tried is
+        taken (logged as a warning)
+    """
+    global _server
+    port = port if port is not None else os.environ.get('MACROCYCLE_METRICS_PORT')
+    if port is None or port == '':
+        return None
+    host = host or os.environ.get('MACROCYCLE_METRICS_HOST', '0.0.0.0')
+    offset = offset if offset is not None else _env_int('MACROCYCLE_METRICS_PORT_OFFSET', 0)
+    span = max(span if span is not None else _env_int('MACROCYCLE_METRICS_PORT_SPAN', 1), 1)
+    first = int(port) + offset
+    with _server_lock:
+        if _server is None:
+            for candidate in range(first, first + span):
+                try:
+                    _server = ThreadingHTTPServer((host, candidate), _MetricsHandler)
+                    break
+                except OSError as e:
+                    error = e
+            else:
+                logger.warning("Metrics not served: no free port in %s:%d-%d (%s)",
+                               host, first, first + span - 1, error)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+            logger.info("Serving metrics on %s:%d", host, _server.server_address[1])
+        return _server
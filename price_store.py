@@ -0,0 +1,226 @@
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+from series_store import DEFAULT_STORE_DIR
+from timeseries import PriceHistory
+
+# Unset: keep closes in this directory. Set to a path to move it, or to '' to disable.
+DEFAULT_PRICE_DIR = os.path.join(DEFAULT_STORE_DIR, 'prices')
+
+# Fixed daily calendar every ticker file is laid out on: one float32 per calendar day
+EPOCH = pd.Timestamp('1990-01-01')
+DAYS = 70 * 366
+DAY_NS = 86_400 * 10**9
+
+# Superseded generations are kept this long, for snapshots that still refer to them
+RETAIN_SECONDS = 24 * 3600
+
+_calendar = None
+
+
+def price_store_path():
+    """Price directory from MACROCYCLE_PRICE_STORE, or None if the store is disabled"""
+    return os.environ.get('MACROCYCLE_PRICE_STORE', DEFAULT_PRICE_DIR) or None
+
+
+def calendar():
+    """int64 nanosecond timestamps of every calendar day the store covers"""
+    global _calendar
+    if _calendar is None:
+        _calendar = EPOCH.value + np.arange(DAYS, dtype=np.int64) * DAY_NS
+    return _calendar
+
+
+def _day(timestamps):
+    return (np.asarray(timestamps, dtype=np.int64) - EPOCH.value) // DAY_NS
+
+
+class MappedPriceHistory(PriceHistory):
+    """
+    PriceHistory whose closes are a window of one generation of a PriceStore file, mapped read-only.
+
+    Pickles and snapshot_format encode it as a reference (store root, ticker, generation,
+    window), so a process loading a bundle that holds it maps the same file instead of
+    receiving a copy. Generations are never written once published, so the window a
+    snapshot was built with is the window every later reader of it sees.
+    """
+    __slots__ = ('root', 'generation', 'start', 'stop')
+
+    def __init__(self, root, ticker, generation, start, stop, closes):
+        super().__init__(calendar()[start:stop], closes, ticker)
+        self.root = root
+        self.generation = generation
+        self.start = start
+        self.stop = stop
+
+    def __reduce__(self):
+        return (open_history, (self.root, self.ticker, self.generation, self.start, self.stop))
+
+
+class PriceStore:
+    """
+    Host-wide daily closes as a ticker x date matrix of memory-mapped float32 files.
+
+    Each ticker is a series of fixed-width generation files with a slot per calendar day from
+    EPOCH (NaN where it did not trade), so a date's position is plain arithmetic and a window
+    of a ticker is a slice of its file. A write that changes any close publishes a new
+    generation (a copy of the previous one with the changes applied) and never touches a
+    published file; every app and worker process maps them read-only, so however many
+    replicas run on the host, each generation's closes are held once, in the page cache.
+    Superseded generations are removed `retain` seconds after the one replacing them appeared,
+    which must outlast the oldest snapshot still loaded from disk (processes that already
+    mapped a removed file keep it).
+    """
+
+    def __init__(self, root, retain=RETAIN_SECONDS):
+        # Absolute, since bundles refer to histories by it from processes with other working dirs
+        self.root = os.path.abspath(root)
+        self.retain = retain
+        os.makedirs(root, exist_ok=True)
+
+    def _name(self, ticker):
+        return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in ticker)
+
+    def _path(self, ticker, generation):
+        return os.path.join(self.root, f"{self._name(ticker)}.{generation:08d}.f32")
+
+    def _generations(self, ticker):
+        # Published generation numbers of a ticker, oldest first
+        prefix = self._name(ticker) + '.'
+        generations = []
+        for filename in os.listdir(self.root):
+            stem, ext = os.path.splitext(filename)
+            if ext == '.f32' and stem.startswith(prefix) and stem[len(prefix):].isdigit():
+                generations.append(int(stem[len(prefix):]))
+        return sorted(generations)
+
+    def _publish(self, ticker, generation, closes):
+        # Write a temporary file and link it in as the generation; False if another writer got there first
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                closes.tofile(f)
+            # mkstemp creates the file private; readers may run as other users
+            os.chmod(tmp_path, 0o644)
+            try:
+                os.link(tmp_path, self._path(ticker, generation))
+            except FileExistsError:
+                return False
+            return True
+        finally:
+            os.remove(tmp_path)
+
+    def _prune(self, ticker, generations):
+        # Generations whose successor has been published for longer than `retain`
+        cutoff = time.time() - self.retain
+        for older, newer in zip(generations, generations[1:]):
+            try:
+                if os.path.getmtime(self._path(ticker, newer)) < cutoff:
+                    os.remove(self._path(ticker, older))
+            except OSError:
+                pass
+
+    def write(self, ticker, close):
+        """
+        Store a ticker's closes.
+
+        Args:
+            ticker: Ticker symbol
+            close: Series of closes indexed by date; days outside the calendar are skipped
+
+        Returns:
+            (generation, start, stop): the generation holding the closes and the calendar
+            positions they span, or None if none fit
+        """
+        close = close.dropna()
+        index = pd.DatetimeIndex(close.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        days = _day(index.as_unit('ns').asi8)
+        inside = (days >= 0) & (days < DAYS)
+        if not inside.any():
+            return None
+        days = days[inside]
+        values = close.to_numpy(dtype=np.float32)[inside]
+        span = int(days.min()), int(days.max()) + 1
+        while True:
+            generations = self._generations(ticker)
+            current = generations[-1] if generations else 0
+            if current:
+                closes = np.fromfile(self._path(ticker, current), dtype=np.float32)
+                if np.array_equal(closes[days], values, equal_nan=True):
+                    return (current,) + span
+            else:
+                closes = np.full(DAYS, np.nan, dtype=np.float32)
+            closes[days] = values
+            if self._publish(ticker, current + 1, closes):
+                self._prune(ticker, generations + [current + 1])
+                return (current + 1,) + span
+
+    def history(self, ticker, generation, start, stop):
+        """
+        Closes of one generation of a ticker over calendar positions [start, stop).
+
+        Raises:
+            FileNotFoundError: if the generation is not (or no longer) in the store
+        """
+        closes = np.memmap(self._path(ticker, generation), dtype=np.float32, mode='r', shape=(DAYS,))
+        return MappedPriceHistory(self.root, ticker, generation, start, stop, np.asarray(closes[start:stop]))
+
+    def store(self, frames):
+        """
+        Write each ticker's closes and read them back mapped.
+
+        Args:
+            frames: Dict mapping ticker to its OHLCV DataFrame
+
+        Returns:
+            Dict mapping each ticker to a MappedPriceHistory over the span of its frame
+        """
+        histories = {}
+        for ticker, frame in frames.items():
+            reference = self.write(ticker, frame['Close'])
+            if reference is not None:
+                histories[ticker] = self.history(ticker, *reference)
+        return histories
+
+    @property
+    def tickers(self):
+        names = set()
+        for filename in os.listdir(self.root):
+            stem, ext = os.path.splitext(filename)
+            if ext == '.f32' and not filename.startswith('.'):
+                names.add(stem.rsplit('.', 1)[0])
+        return sorted(names)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_price_store(root=None):
+    """Process-wide PriceStore for a directory (price_store_path() by default), or None if disabled"""
+    root = root or price_store_path()
+    if root is None:
+        return None
+    root = os.path.abspath(root)
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = PriceStore(root)
+        return _stores[root]
+
+
+def open_history(root, ticker, generation, start, stop):
+    """
+    A MappedPriceHistory from its reference.
+
+    Raises:
+        FileNotFoundError: if the store is not on this host or the generation has been
+            pruned; the bundle holding the reference can no longer be loaded
+    """
+    if not os.path.isdir(root):
+        raise FileNotFoundError(f"Price store {root} referenced by a snapshot is not on this host")
+    return get_price_store(root).history(ticker, generation, start, stop)
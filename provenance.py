@@ -0,0 +1,281 @@
+import collections
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from metrics import GETTER_SECONDS, SAMPLE_SUBSTITUTIONS
+
+logger = logging.getLogger('macrocycle.fetch')
+
+# Set MACROCYCLE_FETCH_LOG to a path to append one JSON line per getter call
+if os.environ.get('MACROCYCLE_FETCH_LOG'):
+    _handler = logging.FileHandler(os.environ['MACROCYCLE_FETCH_LOG'])
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+
+class FetchRecord:
+    """Provenance of one getter call: timing, upstream traffic, cache use and sample substitution"""
+    __slots__ = ('fetcher', 'getter', 'started_at', 'wall_time', 'requests', 'bytes', 'retries',
+                 'queued', 'cache', 'sourced', 'substituted', 'reason', 'error')
+
+    def __init__(self, fetcher, getter):
+        self.fetcher = fetcher
+        self.getter = getter
+        self.started_at = time.time()
+        self.wall_time = None
+        self.requests = {}
+        self.bytes = 0
+        self.retries = 0
+        # Seconds spent waiting for rate-limit tokens
+        self.queued = 0.0
+        self.cache = {}
+        # Whether any real data (upstream response or cache hit) backed the result
+        self.sourced = False
+        self.substituted = False
+        self.reason = None
+        self.error = None
+
+    @property
+    def cache_status(self):
+        """'hit' if served without going upstream, 'miss' if upstream was asked, None if no cache was involved"""
+        if self.requests:
+            return 'miss'
+        if any(outcome in ('hit', 'fresh') for outcome in self.cache.values()):
+            return 'hit'
+        return None
+
+    def as_dict(self):
+        return {
+            'fetcher': self.fetcher,
+            'getter': self.getter,
+            'started_at': self.started_at,
+            'wall_time': self.wall_time,
+            'requests': dict(self.requests),
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'queued': self.queued,
+            'cache': dict(self.cache),
+            'cache_status': self.cache_status,
+            'sample': self.substituted,
+            'reason': self.reason,
+            'error': self.error,
+        }
+
+
+class ProvenanceRecorder:
+    """
+    Collects a FetchRecord for every fetcher getter call.
+
+    The active record is tracked per thread, so the HTTP session, registry, store and Yahoo
+    download layers can annotate whichever getter they are serving without being passed
+    anything. A getter's result counts as sample data if a sample/fallback method was used
+    or nothing real backed it (no successful upstream response and no cache hit). Finished
+    records are kept in a bounded in-memory buffer and logged as JSON to 'macrocycle.fetch'.
+    """
+
+    def __init__(self, max_records=5000):
+        self._records = collections.deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def start(self, fetcher, getter):
+        record = FetchRecord(fetcher, getter)
+        record.wall_time = time.perf_counter()
+        self._stack().append(record)
+        return record
+
+    def finish(self, record, error=None):
+        record.wall_time = time.perf_counter() - record.wall_time
+        stack = self._stack()
+        if stack and stack[-1] is record:
+            stack.pop()
+        if error is not None:
+            record.error = f"{type(error).__name__}: {error}"
+        if not record.sourced and record.error is None:
+            record.substituted = True
+            record.reason = record.reason or 'no upstream data'
+        self._publish(record)
+
+    def discard(self, record):
+        """Drop a record from start() without publishing it, for an attempt whose result is thrown away"""
+        stack = self._stack()
+        if stack and stack[-1] is record:
+            stack.pop()
+
+    @contextlib.contextmanager
+    def capture(self, record=None):
+        """
+        Collect notes made on this thread into a record that is never published.
+
+        For work done ahead of the getter it serves (e.g. by the async fetchers); absorb()
+        adds what was collected to that getter's record once it runs.
+        """
+        record = record if record is not None else FetchRecord(None, None)
+        stack = self._stack()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            stack.remove(record)
+
+    def absorb(self, captured):
+        """Add the traffic and cache use collected by capture() to the current record"""
+        record = self.current()
+        if record is None:
+            return
+        for source, count in captured.requests.items():
+            record.requests[source] = record.requests.get(source, 0) + count
+        record.bytes += captured.bytes
+        record.retries += captured.retries
+        record.queued += captured.queued
+        record.cache.update(captured.cache)
+        record.sourced = record.sourced or captured.sourced
+        record.reason = record.reason or captured.reason
+
+    def _publish(self, record):
+        with self._lock:
+            self._records.append(record)
+        GETTER_SECONDS.observe(record.wall_time, fetcher=record.fetcher, getter=record.getter)
+        if record.substituted:
+            SAMPLE_SUBSTITUTIONS.inc(fetcher=record.fetcher, getter=record.getter)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record.as_dict(), default=str))
+
+    def note_request(self, source, nbytes=0, ok=True):
+        record = self.current()
+        if record is not None:
+            record.requests[source] = record.requests.get(source, 0) + 1
+            record.bytes += nbytes
+            record.sourced = record.sourced or ok
+
+    def note_cache(self, layer, outcome):
+        record = self.current()
+        if record is not None:
+            record.cache[layer] = outcome
+            # 'stale': a stored copy served because upstream was throttling; still real data
+            if outcome in ('hit', 'fresh', 'stale'):
+                record.sourced = True
+
+    def note_retry(self):
+        record = self.current()
+        if record is not None:
+            record.retries += 1
+
+    def note_queued(self, source, seconds, limited=False):
+        record = self.current()
+        if record is not None:
+            record.queued += seconds
+            if limited:
+                record.reason = record.reason or f"rate limited ({source})"
+
+    def note_sample(self, reason):
+        record = self.current()
+        if record is not None:
+            record.substituted = True
+            record.reason = record.reason or reason
+
+    def note_fallback(self, fetcher, getter, reason):
+        """Record a fallback substituted outside any getter call (e.g. a fan-out timeout)"""
+        record = FetchRecord(fetcher, getter)
+        record.wall_time = 0.0
+        record.substituted = True
+        record.reason = reason
+        self._publish(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def summary(self):
+        """
+        Aggregate records per getter, slowest total wall time first.
+
+        Returns:
+            List of dicts with calls, total/mean/max wall time, requests, bytes, retries,
+            rate-limit queueing time, cache hits and sample count for each (fetcher, getter)
+        """
+        rows = {}
+        for record in self.records():
+            row = rows.setdefault((record.fetcher, record.getter), {
+                'fetcher': record.fetcher, 'getter': record.getter, 'calls': 0, 'total_time': 0.0,
+                'max_time': 0.0, 'requests': 0, 'bytes': 0, 'retries': 0, 'queued': 0.0, 'cache_hits': 0,
+                'samples': 0, 'errors': 0, 'last_called': 0.0
+            })
+            row['calls'] += 1
+            row['total_time'] += record.wall_time
+            row['max_time'] = max(row['max_time'], record.wall_time)
+            row['requests'] += sum(record.requests.values())
+            row['bytes'] += record.bytes
+            row['retries'] += record.retries
+            row['queued'] += record.queued
+            row['cache_hits'] += record.cache_status == 'hit'
+            row['samples'] += record.substituted
+            row['errors'] += record.error is not None
+            row['last_called'] = max(row['last_called'], record.started_at)
+        for row in rows.values():
+            row['mean_time'] = row['total_time'] / row['calls']
+        return sorted(rows.values(), key=lambda row: row['total_time'], reverse=True)
+
+
+RECORDER = ProvenanceRecorder()
+
+
+def _recorded_getter(fetcher, name, method):
+    @functools.wraps(method)
+    def getter(self, *args, **kwargs):
+        record = RECORDER.start(fetcher, name)
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception as error:
+            RECORDER.finish(record, error)
+            raise
+        RECORDER.finish(record)
+        return result
+    return getter
+
+
+def _recorded_sample(name, method):
+    @functools.wraps(method)
+    def sample(self, *args, **kwargs):
+        RECORDER.note_sample(name)
+        return method(self, *args, **kwargs)
+    return sample
+
+
+def recorded(fetcher):
+    """
+    Class decorator recording provenance for every get_* method of a fetcher.
+
+    Calls to _get_sample_* / _get_fallback_* methods made while a getter runs mark its
+    result as sample data.
+    """
+    def decorate(cls):
+        cls.provenance_name = fetcher
+        for name, method in list(vars(cls).items()):
+            if not callable(method):
+                continue
+            if name.startswith('get_'):
+                setattr(cls, name, _recorded_getter(fetcher, name, method))
+            elif name.startswith(('_get_sample_', '_get_fallback_')):
+                setattr(cls, name, _recorded_sample(name, method))
+        return cls
+    return decorate
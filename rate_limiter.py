@@ -0,0 +1,211 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from metrics import RATE_LIMIT_WAIT_SECONDS, RATE_LIMITED
+from provenance import RECORDER
+
+# Request priorities, most urgent first. Data a user is waiting on goes before background
+# refreshes and prefetches of pages nobody has opened yet.
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# (tokens per second, bucket capacity) per source. Capacity plus a minute of refill stays
+# within FRED's 120 requests a minute per key; Yahoo throttles bursts, so it refills steadily.
+# Override with MACROCYCLE_RATE_LIMITS, e.g. "fred=1:60,yahoo=2:40".
+DEFAULT_LIMITS = {
+    'fred': (1.0, 60),
+    'yahoo': (2.0, 60),
+    'cnn': (0.5, 5),
+}
+
+# Longest a request waits in the queue before giving up with RateLimited
+DEFAULT_MAX_WAIT = 30
+
+# How often a coroutine queued behind other requests checks whether it is its turn
+ASYNC_POLL = 0.05
+
+_local = threading.local()
+
+
+class RateLimited(Exception):
+    """Raised when a request could not get a token from its source's bucket in time"""
+
+
+def current_priority():
+    return getattr(_local, 'priority', INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority):
+    """Run upstream requests made on this thread (and fan-outs it starts) at a priority"""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+class RateLimiter:
+    """
+    Token bucket for one upstream source with a priority queue in front of it.
+
+    Each request takes one token per upstream call (a multi-ticker Yahoo download takes one
+    per ticker). Tokens refill at `rate` per second up to `capacity`. Requests that find the
+    bucket empty queue up and are served strictly by priority, then arrival order, so a page
+    someone is waiting on overtakes a queued background refresh instead of failing over to
+    sample data. A request still queued after max_wait raises RateLimited.
+    """
+
+    def __init__(self, name, rate, capacity, max_wait=DEFAULT_MAX_WAIT):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        if now > self._updated:
+            start = max(self._updated, self.paused_until)
+            if now > start:
+                self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+            self._updated = now
+
+    def _take(self, entry, tokens, started, timeout):
+        # With the condition held: take the tokens if it is this entry's turn, else return how
+        # long to wait before trying again; raises RateLimited once the timeout has passed
+        now = time.monotonic()
+        self._refill(now)
+        if self._queue[0] == entry and now >= self.paused_until and self.tokens >= tokens:
+            self.tokens -= tokens
+            return None
+        waited = now - started
+        if waited >= timeout:
+            RATE_LIMITED.inc(source=self.name)
+            RECORDER.note_queued(self.name, waited, limited=True)
+            raise RateLimited(f"{self.name} rate limit: still queued after {waited:.1f}s")
+        if self._queue[0] == entry:
+            ready_in = max(self.paused_until - now, (tokens - self.tokens) / self.rate)
+        else:
+            ready_in = timeout
+        return min(ready_in, timeout - waited)
+
+    def _leave(self, entry):
+        # The condition's lock is reentrant, so this is also called with it held
+        with self._condition:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self._condition.notify_all()
+
+    def _waited(self, started):
+        waited = time.monotonic() - started
+        RATE_LIMIT_WAIT_SECONDS.observe(waited, source=self.name)
+        RECORDER.note_queued(self.name, waited)
+        return waited
+
+    def acquire(self, tokens=1, priority=None, timeout=None):
+        """
+        Block until `tokens` are available and no more urgent request is queued.
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(tokens, self.capacity)
+        priority = current_priority() if priority is None else priority
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        entry = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    wait = self._take(entry, tokens, started, timeout)
+                    if wait is None:
+                        break
+                    self._condition.wait(wait)
+            finally:
+                self._leave(entry)
+        return self._waited(started)
+
+    async def acquire_async(self, tokens=1, priority=None, timeout=None):
+        """
+        acquire() for coroutines: waits on the event loop instead of blocking its thread.
+
+        Shares the queue with threaded callers. A coroutine cannot be woken by the condition,
+        so it checks whether it is its turn at least every ASYNC_POLL seconds.
+        """
+        tokens = min(tokens, self.capacity)
+        priority = current_priority() if priority is None else priority
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        entry = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._take(entry, tokens, started, timeout)
+                if wait is None:
+                    break
+                await asyncio.sleep(min(wait, ASYNC_POLL))
+        finally:
+            self._leave(entry)
+        return self._waited(started)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for a while, e.g. after the source answered 429"""
+        with self._condition:
+            self._refill(time.monotonic())
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def status(self):
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            return {'tokens': round(self.tokens, 1), 'queued': len(self._queue),
+                    'paused_for': max(0.0, self.paused_until - now)}
+
+
+def _configured_limits():
+    limits = dict(DEFAULT_LIMITS)
+    for item in filter(None, os.environ.get('MACROCYCLE_RATE_LIMITS', '').split(',')):
+        source, _, spec = item.partition('=')
+        rate, _, capacity = spec.partition(':')
+        limits[source.strip()] = (float(rate), int(capacity or limits.get(source.strip(), (0, 1))[1]))
+    return limits
+
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+def get_limiter(source):
+    """Process-wide rate limiter for an upstream source ('fred', 'yahoo', 'cnn')"""
+    with _lock:
+        if source not in _limiters:
+            rate, capacity = _configured_limits().get(source, (10.0, 10))
+            _limiters[source] = RateLimiter(source, rate, capacity)
+        return _limiters[source]
+
+
+def limiter_states():
+    with _lock:
+        limiters = dict(_limiters)
+    return {source: limiter.status() for source, limiter in limiters.items()}
+
+
+def reset_limiters():
+    """Forget all limiter state, e.g. between benchmark runs"""
+    with _lock:
+        _limiters.clear()
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+import pandas as pd
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class RefreshPolicy:
+    """
+    When a stored series is worth asking upstream about again.
+
+    A new observation cannot appear before the end of the period after the last observation
+    plus the usual publication lag, so until then the series is only re-checked every max_ttl
+    (to pick up revisions). Once a release is due or overdue it is checked every min_ttl.
+    FRED dates monthly and quarterly observations at the start of their period (January's
+    CPI is 2024-01-01), daily and weekly ones at the day or week they cover.
+    """
+
+    def __init__(self, frequency, period_days, publication_lag_days, min_ttl, max_ttl, dated_at_start=False):
+        self.frequency = frequency
+        self.period_days = period_days
+        self.publication_lag_days = publication_lag_days
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.dated_at_start = dated_at_start
+
+    def next_release(self, last_observation):
+        """Earliest time the observation after `last_observation` can be published"""
+        period_end = pd.Timestamp(last_observation).to_pydatetime().replace(tzinfo=None)
+        if self.dated_at_start:
+            period_end += timedelta(days=self.period_days)
+        return period_end + timedelta(days=self.period_days + self.publication_lag_days)
+
+    def next_refresh(self, last_observation, synced_at):
+        """Epoch seconds after which the series should be synced again"""
+        if last_observation is None:
+            return synced_at + self.min_ttl
+        expected_at = self.next_release(last_observation).timestamp()
+        return synced_at + max(self.min_ttl, min(expected_at - synced_at, self.max_ttl))
+
+    def is_fresh(self, last_observation, synced_at, now=None):
+        if synced_at is None:
+            return False
+        now = now if now is not None else datetime.now().timestamp()
+        return now < self.next_refresh(last_observation, synced_at)
+
+
+FREQUENCY_POLICIES = {
+    'intraday': RefreshPolicy('intraday', 0, 0, 15 * 60, 15 * 60),
+    'daily': RefreshPolicy('daily', 1, 1, HOUR, 6 * HOUR),
+    'weekly': RefreshPolicy('weekly', 7, 5, 6 * HOUR, 2 * DAY),
+    'monthly': RefreshPolicy('monthly', 31, 14, 6 * HOUR, 7 * DAY, dated_at_start=True),
+    'quarterly': RefreshPolicy('quarterly', 92, 28, 12 * HOUR, 14 * DAY, dated_at_start=True),
+}
+
+# Native frequency of each registered series; anything unlisted is treated by source default
+SERIES_FREQUENCIES = {
+    ('fred', 'GDP'): 'quarterly',
+    ('fred', 'CPIAUCSL'): 'monthly',
+    ('fred', 'UNRATE'): 'monthly',
+    ('fred', 'M2SL'): 'monthly',
+    ('fred', 'FEDFUNDS'): 'monthly',
+    ('fred', 'NFCI'): 'weekly',
+    ('fred', 'WALCL'): 'weekly',
+    ('fred', 'DFF'): 'daily',
+    ('fred', 'RRPONTSYD'): 'daily',
+    ('fred', 'PUTCALL'): 'daily',
+    ('fred', 'PCCE'): 'daily',
+    ('fred', 'VVIXCLS'): 'daily',
+    ('fred', 'BAMLH0A0HYM2'): 'daily',
+    ('fred', 'BAMLC0A0CM'): 'daily',
+    ('fred', 'DGS2'): 'daily',
+    ('fred', 'DGS5'): 'daily',
+    ('fred', 'DGS10'): 'daily',
+    ('fred', 'DGS30'): 'daily',
+}
+
+SOURCE_DEFAULT_FREQUENCIES = {
+    'fred': 'daily',
+    'yahoo': 'intraday',
+}
+
+
+def frequency_for(source, series_id):
+    return SERIES_FREQUENCIES.get((source, series_id), SOURCE_DEFAULT_FREQUENCIES.get(source, 'intraday'))
+
+
+def policy_for(source, series_id):
+    return FREQUENCY_POLICIES[frequency_for(source, series_id)]
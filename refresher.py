@@ -0,0 +1,110 @@
+"""
+Background refresher: fetches the economic and market bundles on a schedule, derives the
+indicator graph from the economic bundle and publishes versioned snapshots to a shared
+SnapshotStore. App processes started with MACROCYCLE_SNAPSHOT_DIR pointing at the same
+directory only read those snapshots, so upstream load no longer grows with app replicas.
+Market closes are written to the host's PriceStore (MACROCYCLE_PRICE_STORE), and snapshots
+only refer to them, so every reader maps the same files rather than loading its own copy.
+
+Usage:
+    python refresher.py --dir /var/lib/macrocycle/snapshots
+    python refresher.py --once                       # publish each bundle once and exit (cron)
+    MACROCYCLE_SNAPSHOT_DIR=... streamlit run app.py # readers
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from data_pipeline import BUNDLES, derive_bundle
+from indicator_graph import build_indicator_graph
+from metrics import start_metrics_server
+from series_registry import SeriesRegistry
+from series_store import SeriesStore
+from snapshot_store import SnapshotStore
+
+logger = logging.getLogger('macrocycle.refresher')
+
+# Wait this long before retrying a bundle whose fetch failed
+RETRY_SECONDS = 60
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dir', default=os.environ.get('MACROCYCLE_SNAPSHOT_DIR'),
+                        help='Snapshot directory (default: MACROCYCLE_SNAPSHOT_DIR)')
+    parser.add_argument('--once', action='store_true', help='Publish every bundle once and exit')
+    parser.add_argument('--compression', choices=['none', 'lz4', 'zstd'], default='none',
+                        help='Snapshot file compression; uncompressed files are memory-mapped by readers (default none)')
+    for name, (_, interval) in BUNDLES.items():
+        parser.add_argument(f'--{name}-interval', type=float, default=interval,
+                            help=f'Seconds between {name} refreshes (default {interval})')
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error('--dir or MACROCYCLE_SNAPSHOT_DIR is required')
+    return args
+
+
+class Refresher:
+    """Runs fetch -> derive -> publish for each bundle when it is due"""
+
+    def __init__(self, snapshots, intervals):
+        self.snapshots = snapshots
+        self.intervals = intervals
+        self.bundles = {name: fetch for name, (fetch, _) in BUNDLES.items()}
+        self.registry = SeriesRegistry(max_age=300)
+        self.store = SeriesStore()
+        # Kept across runs, so only indicators downstream of changed series are recomputed
+        self.graph = build_indicator_graph()
+        self.due = {name: 0.0 for name in self.bundles}
+
+    def refresh(self, name):
+        started = time.time()
+        data = self.bundles[name](self.registry, self.store)
+        # Best effort: indicators that fail to derive are left for readers, never holding back the data
+        derived = derive_bundle(name, data, self.graph)
+        manifest = self.snapshots.publish(name, data, derived, created_at=started)
+        logger.info("Published %s v%d in %.1fs", name, manifest['version'], time.time() - started)
+        return manifest
+
+    def run_once(self):
+        for name in self.bundles:
+            self.refresh(name)
+
+    def run_forever(self):
+        while True:
+            now = time.time()
+            for name, due in self.due.items():
+                if due > now:
+                    continue
+                try:
+                    self.refresh(name)
+                    self.due[name] = time.time() + self.intervals[name]
+                except Exception:
+                    logger.exception("Refreshing %s failed; keeping the last published snapshot", name)
+                    self.due[name] = time.time() + RETRY_SECONDS
+            time.sleep(max(1.0, min(self.due.values()) - time.time()))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    if not os.environ.get('MACROCYCLE_FETCH_LOG'):
+        # Per-getter provenance lines only when asked for
+        logging.getLogger('macrocycle.fetch').setLevel(logging.WARNING)
+    start_metrics_server()
+    snapshots = SnapshotStore(args.dir, compression=None if args.compression == 'none' else args.compression)
+    intervals = {name: getattr(args, f'{name}_interval') for name in BUNDLES}
+    refresher = Refresher(snapshots, intervals)
+    if args.once:
+        refresher.run_once()
+        return 0
+    try:
+        refresher.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import math
+import threading
+import time
+import pandas as pd
+from datetime import datetime, timedelta
+from provenance import RECORDER
+
+# Widest window (lookback in days, None = full history) any getter asks for, per series.
+# The first fetch of a series pulls this superset so narrower getters are served from it.
+DEFAULT_SUPERSETS = {
+    ('fred', 'BAMLH0A0HYM2'): 5 * 365,
+    ('fred', 'BAMLC0A0CM'): 5 * 365,
+    ('fred', 'PUTCALL'): 2 * 365,
+    ('fred', 'VVIXCLS'): 2 * 365,
+    ('yahoo', '^GSPC'): 5 * 365,
+}
+
+
+# Trading sessions per calendar year, with slack for holidays, when sizing 'Nd' windows
+SESSIONS_PER_YEAR = 250
+
+
+def period_to_days(period):
+    """
+    Convert a Yahoo period string ('5d', '1y', 'max') to a lookback in days (None = full history).
+
+    'Nd' periods ask for N trading sessions, so their lookback is the calendar window that
+    covers N sessions; period_to_rows gives the row count to cut it down to.
+    """
+    if period is None or period == 'max':
+        return None
+    if period.endswith('mo'):
+        return int(period[:-2]) * 31
+    unit, count = period[-1], int(period[:-1])
+    if unit == 'y':
+        return count * 365
+    if unit == 'd':
+        return math.ceil(count * 365 / SESSIONS_PER_YEAR) + 5
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def period_to_rows(period):
+    """Number of rows (trading sessions) an 'Nd' period asks for, None for calendar periods"""
+    if period is not None and period.endswith('d'):
+        return int(period[:-1])
+    return None
+
+
+def days_to_period(days):
+    """Inverse of period_to_days for the lookbacks the registry fetches"""
+    if days is None:
+        return 'max'
+    if days % 365 == 0:
+        return f"{days // 365}y"
+    return f"{days}d"
+
+
+def _covers(have, want):
+    return have is None or (want is not None and have >= want)
+
+
+def _widest(a, b):
+    if a is None or b is None:
+        return None
+    return max(a, b)
+
+
+class SeriesRegistry:
+    """
+    Coalesces upstream series fetches within one refresh.
+
+    Entries are keyed by (source, series_id) and remember the lookback window they were
+    fetched with. A request for a window that an entry already covers is sliced from it;
+    otherwise the widest window seen for that series is fetched once and replaces the entry.
+    Concurrent requests for the same series wait on a per-series lock, so duplicate getters
+    running in parallel share one upstream call.
+    """
+
+    def __init__(self, max_age=300, supersets=None):
+        self.max_age = max_age
+        self.supersets = dict(DEFAULT_SUPERSETS if supersets is None else supersets)
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _series_lock(self, key):
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _fresh_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry['fetched_at'] > self.max_age:
+            return None
+        return entry
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get(self, source, series_id, days, loader):
+        """
+        Return a series (or DataFrame) indexed by date covering the last `days` days.
+
+        Args:
+            source: Upstream name, e.g. 'fred' or 'yahoo'
+            series_id: Upstream identifier (FRED series ID or ticker)
+            days: Lookback in days, or None for the full history
+            loader: Callable taking a lookback in days (or None) and returning the data
+        """
+        key = (source, series_id)
+        with self._series_lock(key):
+            entry = self._fresh_entry(key)
+            if entry is not None and _covers(entry['days'], days):
+                self._count('hits')
+                RECORDER.note_cache('registry', 'hit')
+                return self._slice(entry['data'], days)
+            self._count('misses')
+            RECORDER.note_cache('registry', 'miss')
+            fetch_days = _widest(days, self.supersets.get(key, days))
+            if entry is not None:
+                fetch_days = _widest(fetch_days, entry['days'])
+            data = loader(fetch_days)
+            self._entries[key] = {'days': fetch_days, 'data': data, 'fetched_at': time.monotonic()}
+            with self._lock:
+                # Remember the widest window so the next refresh fetches the superset first
+                self.supersets[key] = fetch_days
+            return self._slice(data, days)
+
+    def get_many(self, source, series_ids, days, loader):
+        """
+        Batched variant of get() for sources that accept several IDs per request.
+
+        Args:
+            loader: Callable taking (series_ids, days) and returning a dict of series_id -> data
+
+        Returns:
+            Dict of series_id -> data for every ID the loader (or the registry) could supply
+        """
+        series_ids = list(dict.fromkeys(series_ids))
+        locks = [self._series_lock((source, series_id)) for series_id in sorted(series_ids)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            results = {}
+            missing = {}
+            for series_id in series_ids:
+                key = (source, series_id)
+                entry = self._fresh_entry(key)
+                if entry is not None and _covers(entry['days'], days):
+                    self._count('hits')
+                    results[series_id] = self._slice(entry['data'], days)
+                else:
+                    self._count('misses')
+                    fetch_days = _widest(days, self.supersets.get(key, days))
+                    if entry is not None:
+                        fetch_days = _widest(fetch_days, entry['days'])
+                    missing.setdefault(fetch_days, []).append(series_id)
+            RECORDER.note_cache('registry', 'miss' if missing else 'hit')
+            for fetch_days, ids in missing.items():
+                fetched = loader(ids, fetch_days)
+                now = time.monotonic()
+                for series_id, data in fetched.items():
+                    key = (source, series_id)
+                    self._entries[key] = {'days': fetch_days, 'data': data, 'fetched_at': now}
+                    with self._lock:
+                        self.supersets[key] = fetch_days
+                    results[series_id] = self._slice(data, days)
+            return results
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def peek(self, source, series_id):
+        """Return the data currently held for a series without fetching, or None"""
+        entry = self._fresh_entry((source, series_id))
+        return None if entry is None else entry['data']
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _slice(self, data, days):
+        if days is None or data is None or len(data) == 0:
+            return data
+        start = pd.Timestamp(datetime.now() - timedelta(days=days))
+        index = data.index
+        if getattr(index, 'tz', None) is not None:
+            start = start.tz_localize(index.tz)
+        return data[index >= start]
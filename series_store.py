@@ -0,0 +1,255 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from provenance import RECORDER
+from rate_limiter import RateLimited
+from refresh_policy import policy_for
+
+DEFAULT_STORE_DIR = os.environ.get('MACROCYCLE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+# How far back to re-pull on each sync so upstream revisions to recent points are picked up
+REVISION_DAYS = {
+    ('fred', 'GDP'): 400,
+    ('fred', 'CPIAUCSL'): 120,
+    ('fred', 'UNRATE'): 120,
+    ('fred', 'M2SL'): 120,
+    ('fred', 'NFCI'): 365,
+    ('fred', 'DFF'): 14,
+}
+DEFAULT_REVISION_DAYS = 10
+
+# Sources that restate their whole history when a split or dividend is adjusted for (Yahoo's
+# auto-adjusted closes), and the relative change in an overlapping close taken to mean that
+# happened: a delta on the new basis cannot be spliced onto the stored copy
+ADJUSTED_SOURCES = {'yahoo'}
+ADJUSTMENT_TOLERANCE = 1e-4
+
+# Sync modes from cheapest to most expensive; a batch reports its most expensive one
+_MODE_COST = ['fresh', 'delta', 'full']
+
+
+class SeriesStore:
+    """
+    On-disk columnar store of upstream series with delta sync.
+
+    Each (source, series_id) is one Parquet file of observations indexed by date plus a small
+    JSON sidecar recording the window it covers and when it was last synced. A sync skips
+    upstream entirely while the series' RefreshPolicy says no new observation can have been
+    published; otherwise it only asks for observations from shortly before the last stored
+    date (the revision tail) and merges them in, so a refresh moves a few rows instead of the
+    full history and restarts start warm. For ADJUSTED_SOURCES, a delta whose closes disagree
+    with the stored ones on the overlap means history was restated, and the full window is
+    fetched again instead. While upstream is throttling (RateLimited) the stored copy is
+    served as is.
+    """
+
+    def __init__(self, root=None, revision_days=None, policy=policy_for):
+        self.root = os.path.join(root or DEFAULT_STORE_DIR, 'series')
+        self.revision_days = dict(REVISION_DAYS if revision_days is None else revision_days)
+        # Callable (source, series_id) -> RefreshPolicy, or None to always ask upstream
+        self.policy = policy
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, source, series_id):
+        name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in series_id)
+        base = os.path.join(self.root, source, name)
+        return base + '.parquet', base + '.json'
+
+    def _series_lock(self, key):
+        with self._lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def read(self, source, series_id):
+        """Return (data, meta) for a stored series, or (None, None) if it is not stored"""
+        data_path, meta_path = self._paths(source, series_id)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            frame = pd.read_parquet(data_path)
+        except (OSError, ValueError):
+            return None, None
+        frame = frame.set_index('date')
+        frame.index.name = None
+        if meta.get('kind') == 'series':
+            return frame['value'], meta
+        return frame, meta
+
+    def write(self, source, series_id, data, meta):
+        data_path, meta_path = self._paths(source, series_id)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        kind = 'series' if isinstance(data, pd.Series) else 'frame'
+        frame = data.to_frame('value') if kind == 'series' else data
+        frame = frame.rename_axis('date').reset_index()
+        meta = dict(meta, kind=kind)
+        # Write to temp files and rename so readers in other threads/processes never see a partial file
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        frame.to_parquet(data_path + tmp_suffix, index=False)
+        with open(meta_path + tmp_suffix, 'w') as f:
+            json.dump(meta, f)
+        os.replace(data_path + tmp_suffix, data_path)
+        os.replace(meta_path + tmp_suffix, meta_path)
+
+    def _start_for(self, days):
+        if days is None:
+            return None
+        return (datetime.now() - timedelta(days=days)).date()
+
+    def is_fresh(self, source, series_id, stored, meta):
+        """True if the series' refresh policy says nothing new can have been published yet"""
+        if self.policy is None or meta is None:
+            return False
+        last_observation = stored.index.max() if len(stored) > 0 else None
+        return self.policy(source, series_id).is_fresh(last_observation, meta.get('synced_at'))
+
+    def _plan(self, source, series_id, days):
+        """Work out what to request upstream: returns (stored, meta, fetch_start, mode)"""
+        start = self._start_for(days)
+        stored, meta = self.read(source, series_id)
+        covered_from = None if meta is None else meta.get('start')
+        covers = meta is not None and (covered_from is None or (start is not None and covered_from <= start.isoformat()))
+        if stored is None or not covers or len(stored) == 0:
+            return stored, meta, start, 'full'
+        if self.is_fresh(source, series_id, stored, meta):
+            return stored, meta, None, 'fresh'
+        tail = self.revision_days.get((source, series_id), DEFAULT_REVISION_DAYS)
+        fetch_start = (pd.Timestamp(stored.index.max()) - timedelta(days=tail)).date()
+        return stored, meta, fetch_start, 'delta'
+
+    def _window(self, data, days):
+        start = self._start_for(days)
+        if start is None or len(data) == 0:
+            return data
+        lower = pd.Timestamp(start)
+        if getattr(data.index, 'tz', None) is not None:
+            lower = lower.tz_localize(data.index.tz)
+        return data[data.index >= lower]
+
+    def _rebased(self, source, stored, fresh):
+        """True if a delta restates stored prices on a different adjustment basis"""
+        if source not in ADJUSTED_SOURCES or fresh is None or len(fresh) == 0:
+            return False
+        if isinstance(stored, pd.DataFrame):
+            if 'Close' not in stored or 'Close' not in fresh:
+                return False
+            stored, fresh = stored['Close'], fresh['Close']
+        # The last stored day may have been stored mid-session
+        stored = stored[stored.index < stored.index.max()]
+        overlap = pd.concat([stored, fresh], axis=1, join='inner').dropna()
+        if overlap.empty:
+            return False
+        return not np.allclose(overlap.iloc[:, 0].to_numpy(dtype=float), overlap.iloc[:, 1].to_numpy(dtype=float),
+                               rtol=ADJUSTMENT_TOLERANCE, atol=0)
+
+    def _merge(self, source, series_id, days, stored, meta, fetch_start, mode, fresh):
+        start = self._start_for(days)
+        if mode == 'full' and (fresh is None or len(fresh) == 0):
+            # Nothing came back; keep whatever is stored rather than overwrite it, and leave
+            # its metadata alone so the next sync asks for the full window again
+            return fresh if stored is None else self._window(stored, days)
+        if mode == 'full':
+            merged = fresh
+            covered_from = None if start is None else start.isoformat()
+        elif fresh is None or len(fresh) == 0:
+            # Nothing new upstream; keep what is stored
+            merged = stored
+            covered_from = meta.get('start')
+        else:
+            cutoff = pd.Timestamp(fetch_start)
+            index = stored.index
+            if getattr(index, 'tz', None) is not None:
+                cutoff = cutoff.tz_localize(index.tz)
+            merged = pd.concat([stored[index < cutoff], fresh])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            covered_from = meta.get('start')
+        self.write(source, series_id, merged, {'start': covered_from, 'synced_at': time.time()})
+        return self._window(merged, days)
+
+    def sync(self, source, series_id, days, loader):
+        """
+        Bring a stored series up to date and return its last `days` days (full history if None).
+
+        Args:
+            loader: Callable taking an observation start date (or None for the full history)
+                and returning a Series or DataFrame indexed by date
+        """
+        with self._series_lock((source, series_id)):
+            stored, meta, fetch_start, mode = self._plan(source, series_id, days)
+            RECORDER.note_cache('store', mode)
+            if mode == 'fresh':
+                return self._window(stored, days)
+            try:
+                fresh = loader(fetch_start)
+                if mode == 'delta' and self._rebased(source, stored, fresh):
+                    # Restated upstream (split or dividend): refetch the window on the new basis
+                    mode, fetch_start = 'full', self._start_for(days)
+                    RECORDER.note_cache('store', mode)
+                    fresh = loader(fetch_start)
+            except RateLimited:
+                if stored is None or len(stored) == 0:
+                    raise
+                # Throttled: serve the last stored copy; the next sync tries upstream again
+                RECORDER.note_cache('store', 'stale')
+                return self._window(stored, days)
+            return self._merge(source, series_id, days, stored, meta, fetch_start, mode, fresh)
+
+    def sync_many(self, source, series_ids, days, loader):
+        """
+        Batched variant of sync() for sources that accept several IDs per request.
+
+        IDs that need the same upstream start date are requested together.
+
+        Args:
+            loader: Callable taking (series_ids, start) and returning a dict of series_id -> data
+        """
+        series_ids = list(dict.fromkeys(series_ids))
+        locks = [self._series_lock((source, series_id)) for series_id in sorted(series_ids)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            plans = {series_id: self._plan(source, series_id, days) for series_id in series_ids}
+            RECORDER.note_cache('store', max((plan[3] for plan in plans.values()), key=_MODE_COST.index, default='fresh'))
+            results = {}
+            groups = {}
+            for series_id, (stored, _, fetch_start, mode) in plans.items():
+                if mode == 'fresh':
+                    results[series_id] = self._window(stored, days)
+                else:
+                    groups.setdefault(fetch_start, []).append(series_id)
+            for fetch_start, ids in groups.items():
+                try:
+                    fetched = loader(ids, fetch_start)
+                    rebased = [series_id for series_id in ids if plans[series_id][3] == 'delta'
+                               and self._rebased(source, plans[series_id][0], fetched.get(series_id))]
+                    if rebased:
+                        # Restated upstream (split or dividend): refetch those on the new basis
+                        RECORDER.note_cache('store', 'full')
+                        refetched = loader(rebased, self._start_for(days))
+                        for series_id in rebased:
+                            stored, meta, _, _ = plans[series_id]
+                            plans[series_id] = (stored, meta, self._start_for(days), 'full')
+                            fetched.pop(series_id, None)
+                            if series_id in refetched:
+                                fetched[series_id] = refetched[series_id]
+                except RateLimited:
+                    if any(plans[series_id][0] is None or len(plans[series_id][0]) == 0 for series_id in ids):
+                        raise
+                    RECORDER.note_cache('store', 'stale')
+                    results.update((series_id, self._window(plans[series_id][0], days)) for series_id in ids)
+                    continue
+                for series_id in ids:
+                    stored, meta, series_start, mode = plans[series_id]
+                    merged = self._merge(source, series_id, days, stored, meta, series_start, mode,
+                                         fetched.get(series_id))
+                    if merged is not None:
+                        results[series_id] = merged
+            return results
+        finally:
+            for lock in reversed(locks):
+                lock.release()
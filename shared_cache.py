@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import snapshot_format
+from series_store import DEFAULT_STORE_DIR
+from snapshot_store import SharedSnapshotCache
+
+logger = logging.getLogger('macrocycle.snapshots')
+
+# Unset: share bundles through this database. Set to a path to move it, or to '' to disable.
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_STORE_DIR, 'shared_cache.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    hash TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    referenced_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS bundles (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    members TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS derived (
+    name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (name, version)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Unreferenced series are kept this long after the publish that dropped them, for readers
+# that read a manifest just before it was replaced
+RETAIN_SECONDS = 3600
+
+# Attempts at loading a bundle whose members were pruned between reading its manifest and them
+LOAD_ATTEMPTS = 3
+
+
+def shared_cache_path():
+    """Database path from MACROCYCLE_SHARED_CACHE, or None if sharing is disabled"""
+    return os.environ.get('MACROCYCLE_SHARED_CACHE', DEFAULT_CACHE_PATH) or None
+
+
+class SQLiteSnapshotStore:
+    """
+    Host-wide store of data bundles in one SQLite database in WAL mode.
+
+    Each getter result of a bundle is stored once (zstd-compressed snapshot_format) under the
+    hash of its content, and a bundle version is the mapping of its keys to those hashes, so
+    an unchanged series is never written twice and a refetch that changes nothing does not
+    create a new version.
+    Derived artefacts (the indicator graph values) are stored per bundle version. WAL lets any
+    number of processes read while one writes. A lease per bundle lets exactly one process
+    on the host fetch it while the others keep serving what is stored.
+
+    Same interface as SnapshotStore (latest / load / publish), so SharedSnapshotCache can read
+    from either. Rows written as pickles by older versions of the app are still read.
+    """
+
+    def __init__(self, path, timeout=30, keep=3):
+        self.path = path
+        self.timeout = timeout
+        self.keep = keep
+        self.root = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(series)')}
+            if 'referenced_at' not in columns:
+                # Databases created before series were stamped on every publish
+                conn.execute('ALTER TABLE series ADD COLUMN referenced_at REAL NOT NULL DEFAULT 0')
+
+    def _connection(self):
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def latest(self, name):
+        """{'version', 'created_at', 'members'} of the stored bundle, or None"""
+        row = self._connection().execute(
+            'SELECT version, created_at, members FROM bundles WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            return None
+        return {'version': row[0], 'created_at': row[1], 'members': json.loads(row[2])}
+
+    def load(self, name, manifest=None):
+        """
+        Read a bundle (the stored version by default).
+
+        Returns:
+            (manifest, data, derived), or None if nothing has been stored
+        """
+        for attempt in range(LOAD_ATTEMPTS):
+            manifest = manifest or self.latest(name)
+            if manifest is None:
+                return None
+            conn = self._connection()
+            hashes = sorted(set(manifest['members'].values()))
+            values = {}
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT hash, value FROM series WHERE hash IN ({','.join('?' * len(chunk))})", chunk)
+                values.update((digest, snapshot_format.loads(blob)) for digest, blob in rows)
+            if len(values) < len(hashes):
+                # Superseded and pruned after we read the manifest; read the current one
+                manifest = None
+                continue
+            data = {key: values[digest] for key, digest in manifest['members'].items()}
+            row = conn.execute('SELECT value FROM derived WHERE name = ? AND version = ?',
+                               (name, manifest['version'])).fetchone()
+            derived = snapshot_format.loads(row[0]) if row else {}
+            return manifest, data, derived
+        raise KeyError(f"{name} bundle members missing from {self.path} after {LOAD_ATTEMPTS} attempts")
+
+    def publish(self, name, data, derived=None, created_at=None):
+        """
+        Store a freshly fetched bundle.
+
+        Args:
+            name: Bundle name ('economic', 'market')
+            data: The bundle
+            derived: Optional artefacts computed from it, keyed like Snapshot.derive
+            created_at: When the data was fetched (defaults to now)
+
+        Returns:
+            The stored manifest; the version only moves if some member's content changed
+        """
+        created_at = created_at or time.time()
+        blobs = {key: snapshot_format.dumps(value) for key, value in data.items()}
+        members = {key: hashlib.sha1(blob).hexdigest() for key, blob in blobs.items()}
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('INSERT OR IGNORE INTO series (hash, value, created_at) VALUES (?, ?, ?)',
+                             [(members[key], blob, created_at) for key, blob in blobs.items()])
+            previous = self.latest(name)
+            version = previous['version'] if previous else 0
+            if previous is None or previous['members'] != members:
+                version += 1
+            # Stamp the new members and those of the version being replaced, so a series that
+            # drops out now is retained for RETAIN_SECONDS from now, however old it is
+            stamped = set(members.values()) | set(previous['members'].values() if previous else ())
+            conn.executemany('UPDATE series SET referenced_at = ? WHERE hash = ?',
+                             [(time.time(), digest) for digest in stamped])
+            conn.execute('INSERT OR REPLACE INTO bundles (name, version, created_at, members) VALUES (?, ?, ?, ?)',
+                         (name, version, created_at, json.dumps(members, sort_keys=True)))
+            if derived:
+                conn.execute('INSERT OR REPLACE INTO derived (name, version, value) VALUES (?, ?, ?)',
+                             (name, version, snapshot_format.dumps(derived)))
+            conn.execute('DELETE FROM derived WHERE name = ? AND version <= ?', (name, version - self.keep))
+            self._prune(conn)
+        return {'version': version, 'created_at': created_at, 'members': members}
+
+    def _prune(self, conn):
+        # Series no bundle refers to any more, once RETAIN_SECONDS have passed since the
+        # publish that dropped them
+        referenced = set()
+        for (members,) in conn.execute('SELECT members FROM bundles'):
+            referenced.update(json.loads(members).values())
+        stale = [digest for (digest,) in conn.execute(
+            'SELECT hash FROM series WHERE referenced_at < ?', (time.time() - RETAIN_SECONDS,))
+            if digest not in referenced]
+        conn.executemany('DELETE FROM series WHERE hash = ?', [(digest,) for digest in stale])
+
+    def acquire(self, name, ttl):
+        """Take the fetch lease for a bundle unless another live process holds it"""
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT owner, expires_at FROM leases WHERE name = ?', (name,)).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                return False
+            conn.execute('INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)',
+                         (name, owner, now + ttl))
+        return True
+
+    def release(self, name):
+        owner = f"{os.getpid()}:{threading.get_ident()}"
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, owner))
+
+
+class HostSnapshotCache(SharedSnapshotCache):
+    """
+    SharedSnapshotCache over a SQLiteSnapshotStore where the app processes fetch themselves.
+
+    When the stored bundle is missing or older than max_age, whichever process takes the
+    lease fetches and stores it (with its derived artefacts); the others keep serving the
+    stored version, or wait for the first one, and pick the new version up on their next poll.
+    """
+
+    def __init__(self, store, name, loader, max_age, derive=None, poll_interval=30, lease_ttl=120):
+        super().__init__(store, name, poll_interval=poll_interval, wait=lease_ttl, fallback=loader)
+        self.refresh_age = max_age
+        self.derive = derive
+        self.lease_ttl = lease_ttl
+
+    def _fetch_published(self):
+        manifest = self.store.latest(self.name)
+        if manifest is None or time.time() - manifest['created_at'] > self.refresh_age:
+            if self.store.acquire(self.name, self.lease_ttl):
+                try:
+                    started = time.time()
+                    data = self.loader()
+                    self.store.publish(self.name, data, self._derive(data), created_at=started)
+                finally:
+                    self.store.release(self.name)
+        return super()._fetch_published()
+
+    def _derive(self, data):
+        # Best effort: readers compute whatever is missing, so a failure never holds back the data
+        if self.derive is None:
+            return None
+        try:
+            return self.derive(self.name, data)
+        except Exception:
+            logger.exception("Deriving artefacts of the %s bundle failed; storing it without them", self.name)
+            return None
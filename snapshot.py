@@ -0,0 +1,130 @@
+import threading
+import time
+from rate_limiter import BACKGROUND, request_priority
+
+
+class Snapshot:
+    """An immutable bundle of loaded data plus when it was built"""
+    __slots__ = ('data', 'created_at', 'version', '_derived', '_lock')
+
+    def __init__(self, data, created_at, version, derived=None):
+        self.data = data
+        self.created_at = created_at
+        self.version = version
+        # Artefacts already derived elsewhere (e.g. by the refresher process) are served as is
+        self._derived = dict(derived or {})
+        self._lock = threading.Lock()
+
+    @property
+    def age(self):
+        return time.time() - self.created_at
+
+    def restamped(self, created_at):
+        """The same data and derived artefacts, built (or confirmed unchanged) at created_at"""
+        return Snapshot(self.data, created_at, self.version, self._derived)
+
+    def derive(self, key, builder):
+        """
+        Build something from this snapshot's data once and reuse it until the snapshot is replaced.
+
+        Args:
+            key: Name of the derived artefact, e.g. 'indicator_panel'
+            builder: Callable taking the snapshot data
+        """
+        if key not in self._derived:
+            with self._lock:
+                if key not in self._derived:
+                    self._derived[key] = builder(self.data)
+        return self._derived[key]
+
+
+class SnapshotCache:
+    """
+    Stale-while-revalidate holder for an expensive data bundle.
+
+    get() always returns the last good snapshot immediately. Once that snapshot is older than
+    max_age, a single background thread rebuilds it and swaps the new one in atomically; if
+    the rebuild fails the old snapshot keeps being served. Only the very first call, when no
+    snapshot exists yet, blocks on the loader (or on a warm() already under way).
+    """
+
+    def __init__(self, loader, max_age, name='snapshot'):
+        self.loader = loader
+        self.max_age = max_age
+        self.name = name
+        self.last_error = None
+        self._snapshot = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    @property
+    def refreshing(self):
+        thread = self._refresh_thread
+        return thread is not None and thread.is_alive()
+
+    def peek(self):
+        """Return the current snapshot without loading or refreshing, or None"""
+        return self._snapshot
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            thread = self._refresh_thread
+            if thread is not None and thread.is_alive():
+                # A warm-up is already loading the first snapshot; wait for it rather than load twice
+                thread.join()
+            with self._lock:
+                if self._snapshot is None:
+                    self._load()
+                return self._snapshot
+        if self._stale(snapshot):
+            self.refresh()
+        return snapshot
+
+    def _stale(self, snapshot):
+        return snapshot.age > self.max_age
+
+    def refresh(self, wait=False):
+        """Start a background rebuild unless one is already running"""
+        with self._lock:
+            if not self.refreshing:
+                self._refresh_thread = threading.Thread(
+                    target=self._run_background, name=f"{self.name}-refresh", daemon=True
+                )
+                self._refresh_thread.start()
+            thread = self._refresh_thread
+        if wait:
+            thread.join()
+
+    def warm(self):
+        """Start loading the first snapshot in the background, without blocking"""
+        if self._snapshot is None:
+            self.refresh()
+
+    def publish(self, data, created_at=None, derived=None):
+        """Swap in a bundle built elsewhere"""
+        with self._lock:
+            self._version += 1
+            self._snapshot = Snapshot(data, created_at or time.time(), self._version, derived)
+        return self._snapshot
+
+    def _load(self):
+        data = self.loader()
+        self._version += 1
+        self._snapshot = Snapshot(data, time.time(), self._version)
+        self.last_error = None
+
+    def _run_background(self):
+        # Refreshes and warm-ups queue behind requests a user is waiting on
+        with request_priority(BACKGROUND):
+            self._background_load()
+
+    def _background_load(self):
+        try:
+            data = self.loader()
+        except Exception as e:
+            self.last_error = e
+            return
+        self.publish(data)
+        self.last_error = None
@@ -0,0 +1,257 @@
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from price_store import MappedPriceHistory, open_history
+from timeseries import PriceHistory, TimeSeries
+
+# Arrow IPC file magic; blobs without it are legacy pickles
+MAGIC = b'ARROW1'
+FORMAT_VERSION = 1
+
+# Compression codecs Arrow can apply per buffer; None keeps buffers mappable without copies
+CODECS = (None, 'lz4', 'zstd')
+
+_TAG = '__t'
+
+
+class _Encoder:
+    # Turns a bundle into a JSON skeleton plus a list of arrays the skeleton refers to by number
+
+    def __init__(self):
+        self.buffers = {}
+        self._sizes = {}
+        self._seen = {}
+
+    def array(self, values):
+        # Arrays are appended to one buffer per dtype and referred to as [dtype, start, stop].
+        # Arrays shared between leaves (e.g. PriceHistory dates of one panel) are stored once;
+        # the array is kept alongside its id so the id cannot be reused while encoding.
+        key = id(values)
+        if key not in self._seen:
+            dtype = values.dtype.str
+            start = self._sizes.get(dtype, 0)
+            self.buffers.setdefault(dtype, []).append(values)
+            self._sizes[dtype] = start + len(values)
+            self._seen[key] = (values, [dtype, start, start + len(values)])
+        return self._seen[key][1]
+
+    def column(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind == 'M' and values.dtype == np.dtype('datetime64[ns]'):
+            return {'data': self.array(values.view(np.int64)), 'dtype': 'datetime64[ns]'}
+        if values.dtype.kind not in 'biuf' or values.ndim != 1:
+            raise TypeError(f"no columnar encoding for {values.dtype}")
+        return {'data': self.array(values)}
+
+    def index(self, index):
+        if isinstance(index, pd.RangeIndex):
+            return {_TAG: 'RangeIndex', 'start': index.start, 'stop': index.stop, 'step': index.step,
+                    'name': self.encode(index.name)}
+        if isinstance(index, pd.DatetimeIndex) and index.tz is None:
+            # Keyed on the index, since frames of one panel usually share it but asi8 is a new view each time
+            key = ('index', id(index))
+            if key not in self._seen:
+                self._seen[key] = (index, self.array(index.as_unit('ns').asi8))
+            return {_TAG: 'DatetimeIndex', 'data': self._seen[key][1], 'freq': index.freqstr,
+                    'name': self.encode(index.name)}
+        raise TypeError(f"no columnar encoding for {type(index).__name__}")
+
+    def encode(self, value):
+        if isinstance(value, np.generic):
+            # Before the builtins: np.float64 is a float
+            return {_TAG: 'np', 'dtype': value.dtype.str, 'v': value.item()}
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, dict):
+            return {_TAG: 'dict', 'k': [self.encode(k) for k in value], 'v': [self.encode(v) for v in value.values()]}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, tuple) and type(value) is tuple:
+            return {_TAG: 'tuple', 'v': [self.encode(item) for item in value]}
+        if isinstance(value, pd.Timestamp) and value.tz is None:
+            return {_TAG: 'Timestamp', 'v': value.as_unit('ns').value}
+        try:
+            return self._encode_arrays(value)
+        except TypeError:
+            # Anything else (rare) is kept as a pickle inside the file
+            return {_TAG: 'pickle', 'data': self.array(np.frombuffer(
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8))}
+
+    def _encode_arrays(self, value):
+        if isinstance(value, MappedPriceHistory):
+            # A reference: readers map the same PriceStore file rather than load a copy
+            return {_TAG: 'MappedPriceHistory', 'root': value.root, 'ticker': value.ticker,
+                    'generation': value.generation, 'start': value.start, 'stop': value.stop}
+        if isinstance(value, TimeSeries):
+            return {_TAG: 'TimeSeries', 'timestamps': self.array(value.timestamps), 'values': self.array(value.values),
+                    'freq': value.freq, 'name': self.encode(value.name), 'value_name': value.value_name}
+        if isinstance(value, PriceHistory):
+            return {_TAG: 'PriceHistory', 'timestamps': self.array(value.timestamps),
+                    'closes': self.array(value.closes), 'ticker': value.ticker}
+        if isinstance(value, pd.DataFrame):
+            if not value.columns.is_unique:
+                raise TypeError("duplicate column labels")
+            return {_TAG: 'DataFrame', 'columns': [self.encode(c) for c in value.columns],
+                    'data': [self.column(value[c].to_numpy()) for c in value.columns], 'index': self.index(value.index)}
+        if isinstance(value, pd.Series):
+            return {_TAG: 'Series', 'data': self.column(value.to_numpy()), 'index': self.index(value.index),
+                    'name': self.encode(value.name)}
+        if isinstance(value, np.ndarray):
+            return {_TAG: 'ndarray', 'data': self.column(value)}
+        raise TypeError(f"no columnar encoding for {type(value).__name__}")
+
+
+class _Decoder:
+
+    def __init__(self, batch):
+        self.batch = batch
+        self._buffers = {}
+        self._arrays = {}
+        self._indexes = {}
+
+    def array(self, ref):
+        # Views into the dtype's buffer: no copy when the file is memory-mapped and uncompressed
+        # Keyed on the whole ref: an empty array starts where the next one of its dtype does
+        key = tuple(ref)
+        if key not in self._arrays:
+            dtype, start, stop = key
+            if dtype not in self._buffers:
+                column = self.batch.column(self.batch.schema.get_field_index(dtype))
+                self._buffers[dtype] = column.flatten().to_numpy(zero_copy_only=False)
+            self._arrays[key] = self._buffers[dtype][start:stop]
+        return self._arrays[key]
+
+    def column(self, spec):
+        values = self.array(spec['data'])
+        return values.view(spec['dtype']) if 'dtype' in spec else values
+
+    def index(self, spec):
+        if spec[_TAG] == 'RangeIndex':
+            return pd.RangeIndex(spec['start'], spec['stop'], spec['step'], name=self.decode(spec['name']))
+        key = (tuple(spec['data']), spec['freq'], json.dumps(spec['name']))
+        if key not in self._indexes:
+            self._indexes[key] = pd.DatetimeIndex(self.array(spec['data']).view('datetime64[ns]'), freq=spec['freq'],
+                                                  name=self.decode(spec['name']), copy=False)
+        return self._indexes[key]
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        tag = value[_TAG]
+        if tag == 'dict':
+            return {self.decode(k): self.decode(v) for k, v in zip(value['k'], value['v'])}
+        if tag == 'tuple':
+            return tuple(self.decode(item) for item in value['v'])
+        if tag == 'np':
+            return np.dtype(value['dtype']).type(value['v'])
+        if tag == 'Timestamp':
+            return pd.Timestamp(value['v'])
+        if tag == 'TimeSeries':
+            return TimeSeries(self.array(value['timestamps']), self.array(value['values']), value['freq'],
+                              self.decode(value['name']), value['value_name'])
+        if tag == 'PriceHistory':
+            return PriceHistory(self.array(value['timestamps']), self.array(value['closes']), value['ticker'])
+        if tag == 'MappedPriceHistory':
+            return open_history(value['root'], value['ticker'], value['generation'], value['start'], value['stop'])
+        if tag == 'DataFrame':
+            columns = [self.decode(c) for c in value['columns']]
+            # Index set afterwards: passing it to the constructor aligns every column as a Series
+            index = self.index(value['index'])
+            if not columns:
+                return pd.DataFrame(index=index)
+            frame = pd.DataFrame({c: self.column(spec) for c, spec in zip(columns, value['data'])}, copy=False)
+            frame.index = index
+            return frame
+        if tag == 'Series':
+            return pd.Series(self.column(value['data']), index=self.index(value['index']),
+                             name=self.decode(value['name']), copy=False)
+        if tag == 'ndarray':
+            return self.column(value['data'])
+        if tag == 'pickle':
+            return pickle.loads(self.array(value['data']).tobytes())
+        raise ValueError(f"Unknown snapshot value tag: {tag}")
+
+
+def _batch(value):
+    encoder = _Encoder()
+    skeleton = encoder.encode(value)
+    # One single-row list column per dtype holding all arrays of that dtype back to back
+    columns, fields = [], []
+    for dtype, chunks in encoder.buffers.items():
+        values = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+        columns.append(pa.LargeListArray.from_arrays(pa.array([0, len(values)], type=pa.int64()), pa.array(values)))
+        fields.append(pa.field(dtype, columns[-1].type))
+    schema = pa.schema(fields, metadata={'skeleton': json.dumps(skeleton), 'format': str(FORMAT_VERSION)})
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def _write(sink, value, compression):
+    if compression not in CODECS:
+        raise ValueError(f"compression must be one of {CODECS}")
+    batch = _batch(value)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(sink, batch.schema, options=options) as writer:
+        writer.write_batch(batch)
+
+
+def _read(source):
+    reader = pa.ipc.open_file(source)
+    batch = reader.get_batch(0)
+    metadata = reader.schema.metadata
+    if int(metadata[b'format']) > FORMAT_VERSION:
+        raise ValueError(f"Snapshot format {metadata[b'format'].decode()} is newer than this reader")
+    return _Decoder(batch).decode(json.loads(metadata[b'skeleton']))
+
+
+def dumps(value, compression='zstd'):
+    """
+    Serialize a data bundle (nested dicts of TimeSeries, PriceHistory, DataFrames and scalars)
+    to one Arrow IPC file in memory.
+
+    Args:
+        value: The bundle
+        compression: None, 'lz4' or 'zstd', applied to each buffer
+
+    Returns:
+        bytes
+    """
+    sink = pa.BufferOutputStream()
+    _write(sink, value, compression)
+    return sink.getvalue().to_pybytes()
+
+
+def loads(payload):
+    """Read a bundle written by dumps() (or a legacy pickle)"""
+    if not payload.startswith(MAGIC):
+        return pickle.loads(payload)
+    return _read(pa.BufferReader(payload))
+
+
+def dump(value, path, compression=None):
+    """
+    Write a bundle to an Arrow IPC file.
+
+    Uncompressed files (the default) are read back by load() straight from the page cache;
+    lz4 or zstd make the file smaller but load() then has to decompress into memory.
+    """
+    with pa.OSFile(os.fspath(path), 'wb') as sink:
+        _write(sink, value, compression)
+
+
+def load(path):
+    """
+    Read a bundle written by dump() by memory-mapping the file.
+
+    Arrays of an uncompressed file are zero-copy views of the mapping, so loading costs
+    little more than rebuilding the small dict skeleton whatever the bundle's size.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            f.seek(0)
+            return pickle.load(f)
+    return _read(pa.memory_map(os.fspath(path), 'r'))
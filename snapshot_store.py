@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import snapshot_format
+from snapshot import Snapshot, SnapshotCache
+
+logger = logging.getLogger('macrocycle.snapshots')
+
+MANIFEST = 'manifest.json'
+
+
+def _atomic_write(path, payload):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SnapshotStore:
+    """
+    Versioned data bundles on local disk, shared between processes.
+
+    A writer (the refresher) publishes each bundle as a new numbered file and then swaps the
+    bundle's manifest.json to point at it; both writes are atomic renames, so readers in any
+    number of app processes see either the previous or the new version, never a partial one.
+    The last `keep` versions are retained so a reader still loading an older file is not cut
+    short. One writer per directory is assumed.
+
+    Versions are snapshot_format (Arrow IPC) files. Uncompressed, the default, a reader maps
+    the file and its series are views of the page cache shared by every process on the host;
+    with compression='lz4' or 'zstd' files are smaller but each reader decompresses a copy.
+    Versions written as pickles by older refreshers are still read.
+    """
+
+    def __init__(self, root, keep=3, compression=None):
+        self.root = root
+        self.keep = keep
+        self.compression = compression
+
+    def _dir(self, name):
+        return os.path.join(self.root, name)
+
+    def latest(self, name):
+        """Manifest of the newest published version ({'version', 'created_at', 'file'}), or None"""
+        try:
+            with open(os.path.join(self._dir(name), MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, name, data, derived=None, created_at=None):
+        """
+        Write a new version of a bundle.
+
+        Args:
+            name: Bundle name ('economic', 'market')
+            data: The bundle
+            derived: Optional artefacts already computed from it, keyed like Snapshot.derive
+            created_at: When the data was fetched (defaults to now)
+
+        Returns:
+            The new manifest
+        """
+        directory = self._dir(name)
+        os.makedirs(directory, exist_ok=True)
+        previous = self.latest(name)
+        version = (previous['version'] if previous else 0) + 1
+        manifest = {'version': version, 'created_at': created_at or time.time(), 'file': f"{version:08d}.arrow"}
+        payload = snapshot_format.dumps({'data': data, 'derived': derived or {}}, self.compression)
+        _atomic_write(os.path.join(directory, manifest['file']), payload)
+        _atomic_write(os.path.join(directory, MANIFEST), json.dumps(manifest).encode('utf-8'))
+        self._prune(directory, version)
+        return manifest
+
+    def load(self, name, manifest=None):
+        """
+        Read a published version (the latest by default).
+
+        Returns:
+            (manifest, data, derived), or None if nothing has been published
+        """
+        manifest = manifest or self.latest(name)
+        if manifest is None:
+            return None
+        payload = snapshot_format.load(os.path.join(self._dir(name), manifest['file']))
+        return manifest, payload['data'], payload['derived']
+
+    def _prune(self, directory, version):
+        for filename in os.listdir(directory):
+            stem, ext = os.path.splitext(filename)
+            if ext in ('.arrow', '.pkl') and stem.isdigit() and int(stem) <= version - self.keep:
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass
+
+
+class SharedSnapshotCache(SnapshotCache):
+    """
+    SnapshotCache fed by a refresher process through a SnapshotStore instead of by fetching.
+
+    get() serves the loaded snapshot and, every poll_interval seconds, checks the store's
+    manifest in the background, loading only when a newer version has been published. If
+    nothing has been published yet, the first get() waits up to `wait` seconds for the
+    refresher and then falls back to the local loader, if one was given.
+    """
+
+    def __init__(self, store, name, poll_interval=30, wait=60, fallback=None):
+        super().__init__(fallback, max_age=poll_interval, name=name)
+        self.store = store
+        self.wait = wait
+        self.published_version = None
+        self._checked_at = 0.0
+
+    def _stale(self, snapshot):
+        return time.time() - self._checked_at > self.max_age
+
+    def _load(self):
+        # Runs with the cache lock held, so installs the snapshot directly rather than via publish()
+        deadline = time.time() + self.wait
+        published = self._fetch_published()
+        while published is None and time.time() < deadline:
+            time.sleep(1.0)
+            published = self._fetch_published()
+        if published is not None:
+            manifest, data, derived = published
+            self._version += 1
+            self._snapshot = Snapshot(data, manifest['created_at'], self._version, derived)
+            self.published_version = manifest['version']
+            return
+        if self.loader is None:
+            raise RuntimeError(f"No {self.name} snapshot has been published to {self.store.root}")
+        logger.warning("No %s snapshot published to %s; fetching in this process", self.name, self.store.root)
+        super()._load()
+
+    def _background_load(self):
+        try:
+            published = self._fetch_published()
+        except Exception as e:
+            self.last_error = e
+            return
+        if published is not None:
+            manifest, data, derived = published
+            self.publish(data, manifest['created_at'], derived)
+            self.published_version = manifest['version']
+        self.last_error = None
+
+    def _fetch_published(self):
+        # (manifest, data, derived) of a version newer than the one being served, or None
+        self._checked_at = time.time()
+        manifest = self.store.latest(self.name)
+        if manifest is None:
+            return None
+        if manifest['version'] == self.published_version:
+            # A store that keeps the version for unchanged content (SQLiteSnapshotStore) still
+            # moves created_at on each refresh; take it, so the age shown is from that refresh
+            snapshot = self._snapshot
+            if snapshot is not None and manifest['created_at'] > snapshot.created_at:
+                self._snapshot = snapshot.restamped(manifest['created_at'])
+            return None
+        return self.store.load(self.name, manifest)
@@ -0,0 +1,292 @@
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+import requests
+from http_session import get_session
+from refresh_policy import SERIES_FREQUENCIES
+from synthetic_data import SyntheticDataGenerator
+
+# pandas frequency used to generate each native FRED frequency
+FREQUENCY_CODES = {
+    'quarterly': 'QS',
+    'monthly': 'MS',
+    'weekly': 'W-WED',
+    'daily': 'B',
+}
+
+# Rough level of each series so derived indicators stay in a plausible range
+FRED_LEVELS = {
+    'GDP': 27000, 'CPIAUCSL': 310, 'UNRATE': 4.0, 'M2SL': 21000, 'FEDFUNDS': 5.0, 'DFF': 5.0,
+    'NFCI': -0.4, 'WALCL': 7500000, 'RRPONTSYD': 500, 'PUTCALL': 0.9, 'PCCE': 0.8, 'VVIXCLS': 90,
+    'BAMLH0A0HYM2': 3.5, 'BAMLC0A0CM': 1.1, 'DGS2': 4.5, 'DGS5': 4.2, 'DGS10': 4.3, 'DGS30': 4.5,
+}
+
+YAHOO_LEVELS = {'^VIX': 16, '^GSPC': 5000, 'GC=F': 2000, 'BTC-USD': 60000, 'DX-Y.NYB': 104, 'TLT': 95}
+
+HISTORY_START = '1990-01-01'
+
+
+class StandInServer:
+    """
+    Local HTTP stand-in for the FRED series endpoint, the Yahoo chart endpoint and the CNN
+    fear & greed endpoint, serving deterministic synthetic data.
+
+    Every request is delayed by `latency` seconds plus uniform jitter of up to `jitter`
+    seconds, and answered with HTTP 503 with probability `failure_rate`. The settings can be
+    changed while the server is running.
+
+    Usage:
+        with StandInServer(latency=0.05) as server:
+            os.environ['MACROCYCLE_FRED_URL'] = server.fred_url
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, seed=42, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.data = SyntheticDataGenerator(seed=seed)
+        self.requests = {}
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._series = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def fred_url(self):
+        return f"{self.url}/fred"
+
+    @property
+    def yahoo_url(self):
+        return self.url
+
+    @property
+    def cnn_url(self):
+        return f"{self.url}/index/fearandgreed/graphdata"
+
+    def configure(self, latency=None, jitter=None, failure_rate=None):
+        with self._lock:
+            if latency is not None:
+                self.latency = latency
+            if jitter is not None:
+                self.jitter = jitter
+            if failure_rate is not None:
+                self.failure_rate = failure_rate
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = {}
+            self.failures = 0
+
+    def stats(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'total': sum(self.requests.values()), 'failures': self.failures}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='stand-in-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _admit(self, endpoint):
+        """Apply latency and count the request; returns False if it should fail"""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        time.sleep(delay)
+        return not failed
+
+    def _history(self, key, freq, level):
+        with self._lock:
+            series = self._series.get(key)
+        if series is None:
+            index = pd.date_range(HISTORY_START, pd.Timestamp.today().normalize(), freq=freq)
+            periods = len(index)
+            wave = self.data.wave(periods, 1.0, 0.1, max(periods // 8, 2))
+            noise = self.data.noise(key, periods, 0.01)
+            series = pd.Series(level * (wave + noise), index=index)
+            with self._lock:
+                self._series[key] = series
+        return series
+
+    # FRED ------------------------------------------------------------------------------------
+
+    def fred_observations(self, query):
+        series_id = query.get('series_id', '')
+        frequency = SERIES_FREQUENCIES.get(('fred', series_id), 'daily')
+        series = self._history(('fred', series_id), FREQUENCY_CODES[frequency], FRED_LEVELS.get(series_id, 100))
+        if 'observation_start' in query:
+            series = series[series.index >= pd.Timestamp(query['observation_start'])]
+        if 'observation_end' in query:
+            series = series[series.index <= pd.Timestamp(query['observation_end'])]
+        if query.get('sort_order') == 'desc':
+            series = series.iloc[::-1]
+        if 'limit' in query:
+            series = series.iloc[:int(query['limit'])]
+        today = datetime.now().strftime('%Y-%m-%d')
+        rows = ''.join(
+            f'<observation realtime_start="{today}" realtime_end="{today}" date="{date:%Y-%m-%d}" value="{value:.4f}"/>'
+            for date, value in series.items()
+        )
+        return ('<?xml version="1.0" encoding="utf-8" ?>'
+                f'<observations count="{len(series)}">{rows}</observations>').encode()
+
+    # Yahoo -----------------------------------------------------------------------------------
+
+    def yahoo_chart(self, ticker, query):
+        close = self._history(('yahoo', ticker), 'B', YAHOO_LEVELS.get(ticker, 100))
+        if 'period1' in query:
+            close = close[close.index >= pd.Timestamp(int(query['period1']), unit='s')]
+        elif query.get('range', 'max') != 'max':
+            close = close[close.index >= close.index[-1] - _range_offset(query['range'])]
+        values = close.round(4).tolist()
+        result = {
+            'meta': {'symbol': ticker, 'currency': 'USD', 'dataGranularity': '1d'},
+            'timestamp': (close.index.astype('int64') // 10 ** 9).tolist(),
+            'indicators': {
+                'quote': [{
+                    'open': values, 'high': values, 'low': values, 'close': values,
+                    'volume': [1000000] * len(values)
+                }],
+                'adjclose': [{'adjclose': values}]
+            }
+        }
+        return json.dumps({'chart': {'result': [result], 'error': None}}).encode()
+
+    # CNN -------------------------------------------------------------------------------------
+
+    def fear_greed(self):
+        score = float(self.data.rng('fear_greed', datetime.now().strftime('%Y-%m-%d')).uniform(20, 80))
+        rating = 'fear' if score < 45 else 'greed' if score > 55 else 'neutral'
+        return json.dumps({'fear_and_greed': {
+            'score': score, 'rating': rating, 'timestamp': datetime.now().isoformat(),
+            'previous_close': score - 1, 'previous_1_week': score - 3, 'previous_1_month': score + 5
+        }}).encode()
+
+
+def _range_offset(period):
+    count = int(''.join(ch for ch in period if ch.isdigit()) or 1)
+    unit = period.lstrip('0123456789')
+    return {'d': pd.DateOffset(days=count), 'wk': pd.DateOffset(weeks=count), 'mo': pd.DateOffset(months=count),
+            'y': pd.DateOffset(years=count)}.get(unit, pd.DateOffset(years=count))
+
+
+def _handler_for(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            if parts.path.startswith('/fred/series/observations'):
+                endpoint, body = 'fred', lambda: server.fred_observations(query)
+                content_type = 'text/xml'
+            elif parts.path.startswith('/v8/finance/chart/'):
+                ticker = parts.path.rsplit('/', 1)[-1]
+                endpoint, body = 'yahoo', lambda: server.yahoo_chart(ticker, query)
+                content_type = 'application/json'
+            elif parts.path.startswith('/index/fearandgreed/graphdata'):
+                endpoint, body = 'cnn', server.fear_greed
+                content_type = 'application/json'
+            else:
+                return self._send(404, b'not found', 'text/plain')
+            if not server._admit(endpoint):
+                return self._send(503, b'service unavailable', 'text/plain')
+            self._send(200, body(), content_type)
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class StandInYahoo:
+    """
+    Drop-in for the `yf` module used by data_fetcher that downloads from a stand-in chart
+    endpoint over the shared requests session.
+
+    yfinance's curl_cffi cookie/crumb handshake always talks to Yahoo's own hosts, so it cannot
+    be pointed at a local server; this reproduces yf.download(group_by='ticker') instead.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def download(self, tickers, period=None, start=None, group_by='ticker', **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        params = {'interval': '1d'}
+        if start is not None:
+            params['period1'] = int(pd.Timestamp(start).timestamp())
+        else:
+            params['range'] = period or 'max'
+        frames = {}
+        for ticker in tickers:
+            try:
+                response = get_session().get(f"{self.base_url}/v8/finance/chart/{ticker}", params=params, timeout=20)
+                response.raise_for_status()
+                frames[ticker] = _chart_frame(response.json())
+            except (requests.RequestException, ValueError) as e:
+                # yfinance logs failed tickers and leaves them out of the frame
+                logging.getLogger('yfinance').error("['%s']: %r", ticker, e)
+                continue
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+class StandInFearGreedCalculator:
+    """
+    Drop-in for fear_greed_calculator.FearGreedCalculator, for checkouts without that module.
+
+    The indicator graph's fear_greed node runs it on every economic bundle the shared cache
+    publishes; this returns a neutral reading so bundles can be built without it.
+    """
+
+    def calculate(self, data):
+        return {'score': 50.0, 'rating': 'Neutral'}
+
+
+def _chart_frame(payload):
+    result = payload['chart']['result'][0]
+    quote = result['indicators']['quote'][0]
+    index = pd.to_datetime(np.asarray(result['timestamp'], dtype=np.int64), unit='s')
+    return pd.DataFrame({
+        'Open': quote['open'],
+        'High': quote['high'],
+        'Low': quote['low'],
+        'Close': quote['close'],
+        'Volume': quote['volume'],
+    }, index=index.rename('Date'))
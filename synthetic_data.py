@@ -0,0 +1,74 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+
+def stable_seed(*parts):
+    """Seed derived from the given parts that is identical across processes (unlike hash())"""
+    return zlib.crc32('|'.join(str(part) for part in parts).encode())
+
+
+class SyntheticDataGenerator:
+    """
+    Vectorized, seeded generator for sample fallbacks and offline scale tests.
+
+    Every random draw comes from a Generator seeded from (seed, key), so the same key always
+    yields the same values regardless of call order, and every series ends on today's date at
+    a fixed length, so sample fallbacks are stable within a day and safe to cache.
+    """
+
+    def __init__(self, seed=42):
+        self.seed = seed
+
+    def rng(self, *key):
+        return np.random.default_rng(stable_seed(self.seed, *key))
+
+    def dates(self, periods, freq, end=None):
+        end = pd.Timestamp.today().normalize() if end is None else pd.Timestamp(end)
+        return pd.date_range(end=end, periods=periods, freq=freq)
+
+    def ramp(self, periods, start, step):
+        return start + step * np.arange(periods, dtype=np.float64)
+
+    def sawtooth(self, periods, base, period, scale):
+        return base + (np.arange(periods) % period) * scale
+
+    def wave(self, periods, base, amplitude, period, phase=0.0):
+        return base + amplitude * np.sin(np.arange(periods) * 2 * np.pi / period + phase)
+
+    def noise(self, key, periods, scale, loc=0.0):
+        return self.rng('noise', key).normal(loc, scale, periods)
+
+    def prices(self, key, periods, start, drift, volatility):
+        """Geometric random walk starting at `start`"""
+        returns = self.rng('prices', key).normal(drift, volatility, periods)
+        return start * np.cumprod(1 + returns)
+
+    def panel(self, n_series, years=100, freq='D', dtype=np.float32, prefix='series'):
+        """
+        Wide ticker-by-date style panel for load tests, e.g. 100 years daily x 500 series.
+
+        Each column is a random walk plus a business-cycle wave with its own phase, generated
+        in one vectorized pass per column block.
+
+        Returns:
+            DataFrame indexed by date with n_series columns of the given dtype
+        """
+        per_year = {'D': 365, 'B': 261, 'W': 52, 'M': 12, 'ME': 12, 'Q': 4, 'QE': 4}[freq]
+        periods = years * per_year
+        index = self.dates(periods, freq)
+        columns = [f"{prefix}_{i:04d}" for i in range(n_series)]
+        values = np.empty((periods, n_series), dtype=dtype)
+        block = max(1, 4_000_000 // periods)
+        t = np.arange(periods)[:, None]
+        for first in range(0, n_series, block):
+            last = min(n_series, first + block)
+            rng = self.rng('panel', prefix, first)
+            steps = rng.normal(0, 1, (periods, last - first))
+            phases = rng.uniform(0, 2 * np.pi, last - first)
+            cycle = 10 * np.sin(t * 2 * np.pi / (7 * per_year) + phases)
+            values[:, first:last] = 100 + np.cumsum(steps, axis=0) + cycle
+        return pd.DataFrame(values, index=index, columns=columns)
+
+
+SAMPLE_DATA = SyntheticDataGenerator(seed=42)
@@ -0,0 +1,28 @@
+import types
+import pytest
+import data_fetcher
+from circuit_breaker import reset_breakers
+from provenance import RECORDER
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """
+    Economic getters with every upstream unreachable, without leaving the process: FRED is
+    off without a key, Yahoo downloads and the shared HTTP session (CNN) fail. Yields the
+    calls that were attempted.
+    """
+    monkeypatch.delenv('FRED_API_KEY', raising=False)
+    monkeypatch.delenv('MACROCYCLE_CASSETTE', raising=False)
+    calls = []
+
+    def unreachable(*args, **kwargs):
+        calls.append(args)
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(data_fetcher, '_download_panel', unreachable)
+    monkeypatch.setattr(data_fetcher, 'get_session', lambda: types.SimpleNamespace(get=unreachable))
+    reset_breakers()
+    RECORDER.clear()
+    yield calls
+    reset_breakers()
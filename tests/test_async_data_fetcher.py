@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from async_data_fetcher import AsyncEconomicDataFetcher, AsyncMarketDataFetcher
+from circuit_breaker import reset_breakers
+from data_fetcher import EconomicDataFetcher, MarketDataFetcher
+from provenance import RECORDER
+from rate_limiter import RateLimited, get_limiter, reset_limiters
+
+
+def _observations(values, start='2015-01-01', freq='QS'):
+    dates = pd.date_range(start, periods=len(values), freq=freq)
+    rows = ''.join(f'<observation date="{d:%Y-%m-%d}" value="{v}"/>' for d, v in zip(dates, values))
+    return f'<observations>{rows}</observations>'.encode()
+
+
+class Upstream:
+    # httpx mock answering FRED and CNN requests from a dict of series ID -> (status, body)
+
+    def __init__(self, series=None, fear_greed=None):
+        self.series = series or {}
+        self.fear_greed = fear_greed
+        self.requests = []
+        self.threads = set()
+
+    def __call__(self, request):
+        self.requests.append(request)
+        self.threads.add(threading.get_ident())
+        if 'fearandgreed' in request.url.path:
+            if self.fear_greed is None:
+                return httpx.Response(503)
+            return httpx.Response(200, json=self.fear_greed)
+        series_id = request.url.params['series_id']
+        status, body = self.series.get(series_id, (400, b'<error message="Bad Request. The series does not exist."/>'))
+        return httpx.Response(status, content=body)
+
+    def asked(self, series_id):
+        return sum(r.url.params.get('series_id') == series_id for r in self.requests)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setenv('FRED_API_KEY', 'test')
+    monkeypatch.delenv('MACROCYCLE_CASSETTE', raising=False)
+    reset_breakers()
+    reset_limiters()
+    RECORDER.clear()
+    yield
+    reset_breakers()
+    reset_limiters()
+
+
+def _economic(upstream):
+    fetcher = EconomicDataFetcher()
+
+    def blocking(*args, **kwargs):
+        raise AssertionError("FRED and CNN must not go through the blocking session")
+    fetcher.fred.session.get = blocking
+    return AsyncEconomicDataFetcher(fetcher, client=httpx.AsyncClient(transport=httpx.MockTransport(upstream)))
+
+
+def test_fred_series_over_httpx():
+    upstream = Upstream({'GDP': (200, _observations([100.0, 101.5, 103.0]))})
+    result = asyncio.run(_economic(upstream).get_gdp_data(years=20))
+    np.testing.assert_array_equal(result.values, [100.0, 101.5, 103.0])
+    assert upstream.threads == {threading.get_ident()}
+    record, = [r for r in RECORDER.records() if r.getter == 'get_gdp_data']
+    assert record.requests == {'api.stlouisfed.org': 1}
+    assert not record.substituted
+
+
+def test_dependent_requests_are_fetched_in_turn():
+    # DFF fails, so the getter falls back to FEDFUNDS, which it only asks for after seeing that
+    upstream = Upstream({'DFF': (500, b''), 'FEDFUNDS': (200, _observations([5.25, 5.5], freq='MS'))})
+    result = asyncio.run(_economic(upstream).get_interest_rate_data(years=20))
+    np.testing.assert_array_equal(result.values, [5.25, 5.5])
+    assert upstream.asked('DFF') == 1 and upstream.asked('FEDFUNDS') == 1
+    records = [r for r in RECORDER.records() if r.getter == 'get_interest_rate_data']
+    assert len(records) == 1 and not records[0].substituted
+
+
+def test_fallback_series_is_only_asked_for_when_needed():
+    upstream = Upstream({'DFF': (200, _observations([5.33, 5.33], freq='D')), 'FEDFUNDS': (500, b'')})
+    result = asyncio.run(_economic(upstream).get_interest_rate_data(years=20))
+    np.testing.assert_array_equal(result.values, [5.33, 5.33])
+    assert upstream.asked('DFF') == 1 and upstream.asked('FEDFUNDS') == 0
+
+
+def test_requests_not_fetched_yet_do_not_trigger_fallbacks(monkeypatch):
+    fallbacks = []
+    monkeypatch.setattr(EconomicDataFetcher, 'fallback', lambda self, getter, *args, **kwargs: fallbacks.append(getter))
+    upstream = Upstream({'GDP': (200, _observations([100.0, 101.5])),
+                         'BAMLH0A0HYM2': (200, _observations([4.0, 3.5], freq='D')),
+                         'BAMLC0A0CM': (200, _observations([1.0, 1.25], freq='D'))})
+    fetcher = _economic(upstream)
+    asyncio.run(fetcher.get_gdp_data(years=20))
+    assert asyncio.run(fetcher.get_hy_ig_credit_spread()) == pytest.approx(2.25)
+    assert fallbacks == []
+
+
+def test_getter_bodies_run_in_the_executor(monkeypatch):
+    body_threads = []
+    timeseries = EconomicDataFetcher._timeseries
+
+    def recording(self, *args, **kwargs):
+        body_threads.append(threading.get_ident())
+        return timeseries(self, *args, **kwargs)
+
+    monkeypatch.setattr(EconomicDataFetcher, '_timeseries', recording)
+    upstream = Upstream({'GDP': (200, _observations([100.0, 101.5]))})
+    asyncio.run(_economic(upstream).get_gdp_data(years=20))
+    # httpx requests go out on the loop thread, the getter's parsing does not
+    assert body_threads and threading.get_ident() not in body_threads
+    assert upstream.threads == {threading.get_ident()}
+
+
+def test_failures_fall_back_like_the_sync_getter():
+    upstream = Upstream()
+    fetcher = _economic(upstream)
+    assert asyncio.run(fetcher.get_credit_spread()) == 3.5
+    record, = [r for r in RECORDER.records() if r.getter == 'get_credit_spread']
+    assert record.substituted
+
+
+def test_fear_greed_over_httpx():
+    upstream = Upstream(fear_greed={'fear_and_greed': {'score': 61.0, 'rating': 'greed', 'timestamp': 't'}})
+    result = asyncio.run(_economic(upstream).get_fear_greed_index())
+    assert (result['score'], result['rating']) == (61.0, 'greed')
+
+
+def test_gather_shares_the_registry():
+    upstream = Upstream({'BAMLH0A0HYM2': (200, _observations([4.0, 3.5], freq='D')),
+                         'BAMLC0A0CM': (200, _observations([1.0, 1.25], freq='D'))})
+    fetcher = _economic(upstream)
+
+    async def run():
+        return await fetcher.gather({'hy_ig': 'get_hy_ig_credit_spread', 'hy': 'get_credit_spread'})
+
+    results = asyncio.run(run())
+    assert results['hy_ig'] == pytest.approx(2.25)
+    assert results['hy'] == 3.5
+
+
+def test_rate_limited_propagates():
+    upstream = Upstream({'GDP': (429, b'')})
+    with pytest.raises(RateLimited):
+        asyncio.run(_economic(upstream).get_gdp_data())
+
+
+def test_yahoo_downloads_run_in_the_executor():
+    loop_threads = []
+    download_threads = []
+    frame = pd.DataFrame({'Close': [1.0, 2.0]}, index=pd.date_range('2024-01-01', periods=2, freq='D'))
+
+    def download(tickers, period):
+        download_threads.append(threading.get_ident())
+        return {ticker: frame for ticker in tickers}
+
+    fetcher = MarketDataFetcher(prices=None)
+    fetcher.prices = None
+    fetcher._price_panel = download
+
+    async def run():
+        loop_threads.append(threading.get_ident())
+        return await AsyncMarketDataFetcher(fetcher).get_market_index_data('SPY', '5d')
+
+    result = asyncio.run(run())
+    pd.testing.assert_frame_equal(result, frame)
+    assert download_threads and download_threads[0] != loop_threads[0]
+
+
+def test_acquire_async_waits_its_turn():
+    limiter = get_limiter('cnn')
+    limiter.tokens = 0.9
+
+    async def run():
+        return await limiter.acquire_async(timeout=5)
+
+    assert asyncio.run(run()) > 0
+    limiter.tokens = 0.0
+    limiter.pause(60)
+    with pytest.raises(RateLimited):
+        asyncio.run(limiter.acquire_async(timeout=0.1))
@@ -0,0 +1,198 @@
+import logging
+import threading
+import warnings
+import pandas as pd
+import pytest
+import data_fetcher
+from circuit_breaker import SourceUnavailable, get_breaker, reset_breakers
+from data_fetcher import EconomicDataFetcher, fetch_concurrently
+from data_pipeline import fetch_economic_data
+from provenance import RECORDER
+from rate_limiter import RateLimited, reset_limiters
+from series_registry import SeriesRegistry
+
+OUTAGE = ("['^VIX']: DNSError('Failed to perform, curl: (6) Could not resolve host: query2.finance.yahoo.com')")
+NO_DATA = "['^NYA-HI']: YFPricesMissingError('$^NYA-HI: possibly delisted; no price data found (period=5d)')"
+
+
+class Yahoo:
+    # Stands in for the yf module: downloads come back empty, with the errors yfinance would log
+
+    def __init__(self, *errors):
+        self.errors = errors
+        self.calls = 0
+
+    def download(self, tickers, **kwargs):
+        self.calls += 1
+        for message in self.errors:
+            logging.getLogger('yfinance').error(message)
+        return pd.DataFrame()
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    monkeypatch.delenv('MACROCYCLE_CASSETTE', raising=False)
+    monkeypatch.setattr(data_fetcher, 'get_yahoo_session', lambda: None)
+    reset_breakers()
+    reset_limiters()
+    yield lambda fake: monkeypatch.setattr(data_fetcher, 'yf', fake)
+    reset_breakers()
+    reset_limiters()
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    # No FRED key: FRED getters return their fallback without going upstream
+    monkeypatch.delenv('FRED_API_KEY', raising=False)
+    monkeypatch.delenv('MACROCYCLE_CASSETTE', raising=False)
+    RECORDER.clear()
+    return EconomicDataFetcher()
+
+
+def test_every_getter_with_a_default_has_a_fallback(fetcher):
+    getters = {name for name in dir(fetcher) if name.startswith('get_')}
+    assert set(fetcher.FALLBACKS) <= getters
+    for name in fetcher.FALLBACKS:
+        assert fetcher.fallback(name) is not None
+
+
+def test_fallback_is_what_the_getter_returns(fetcher):
+    assert fetcher.fallback('get_credit_spread') == fetcher.get_credit_spread() == 3.5
+    pd.testing.assert_series_equal(fetcher.fallback('get_gdp_data').to_series(), fetcher.get_gdp_data().to_series())
+
+
+def test_fallback_takes_the_getter_arguments(fetcher):
+    assert len(fetcher.fallback('get_gdp_data')) == 10 * 4
+    assert len(fetcher.fallback('get_gdp_data', 2)) == 2 * 4
+    assert len(fetcher.fallback('get_sp500_data', days=30)) == 30
+    with pytest.raises(TypeError):
+        fetcher.fallback('get_vix', 1)
+
+
+def test_getter_falling_back_is_recorded_as_sample_data(fetcher):
+    fetcher.get_gdp_data()
+    record = RECORDER.records()[-1]
+    assert (record.getter, record.substituted) == ('get_gdp_data', True)
+
+
+def test_pipeline_falls_back_to_the_getter_defaults(offline, monkeypatch):
+    def failing(self, *args, **kwargs):
+        raise ConnectionError("upstream down")
+
+    # One getter failing outright exercises fetch_concurrently's fallbacks; the rest fall back themselves
+    monkeypatch.setattr(EconomicDataFetcher, 'get_vix', failing)
+    data = fetch_economic_data()
+    assert data['vix'] == 15.0
+    assert data['gold_price'] == 2000.0
+    assert data['fear_greed']['score'] is not None
+    assert offline
+
+
+def test_fetch_concurrently_uses_fallbacks_for_failed_tasks():
+    def failing():
+        raise ValueError("no data")
+
+    results = fetch_concurrently({'ok': lambda: 1, 'failed': failing}, fallbacks={'failed': lambda: 2})
+    assert results == {'ok': 1, 'failed': 2}
+
+
+def test_yahoo_outage_opens_the_breaker(yahoo):
+    fake = Yahoo(OUTAGE)
+    yahoo(fake)
+    breaker = get_breaker('yahoo')
+    for _ in range(breaker.failure_threshold):
+        assert data_fetcher._download_panel(['^VIX'], period='5d') == {}
+    with pytest.raises(SourceUnavailable):
+        data_fetcher._download_panel(['^VIX'], period='5d')
+    assert fake.calls == breaker.failure_threshold
+
+
+def test_empty_download_without_a_reason_is_a_failure(yahoo):
+    # e.g. with yfinance's logger silenced: nothing says the symbols just have no prices
+    yahoo(Yahoo())
+    data_fetcher._download_panel(['^VIX', 'SPY'], period='5d')
+    assert get_breaker('yahoo').failures == 1
+
+
+def test_symbols_without_prices_leave_the_breaker_closed(yahoo):
+    yahoo(Yahoo(NO_DATA))
+    for _ in range(5):
+        assert data_fetcher._download_panel(['^NYA-HI'], period='5d') == {}
+    assert get_breaker('yahoo').failures == 0
+
+
+def test_errors_logged_by_other_threads_are_not_collected():
+    errors = data_fetcher._YahooErrors()
+    with errors:
+        worker = threading.Thread(target=logging.getLogger('yfinance').error, args=(OUTAGE,))
+        worker.start()
+        worker.join()
+        logging.getLogger('yfinance').error(NO_DATA)
+    assert errors.messages == [NO_DATA]
+
+
+def test_throttled_empty_download_raises(yahoo, fetcher):
+    yahoo(Yahoo("['^VIX']: YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')"))
+    with pytest.raises(RateLimited):
+        data_fetcher._download_panel(['^VIX'], period='5d')
+    assert get_breaker('yahoo').failures == 0
+    reset_limiters()
+    # Getters surface it rather than serve their fallback
+    with pytest.raises(RateLimited):
+        fetcher.get_vix()
+
+
+def test_fallback_reraises_only_throttling(fetcher):
+    try:
+        raise RateLimited("fred is throttling requests")
+    except Exception:
+        with pytest.raises(RateLimited):
+            fetcher.fallback('get_vix')
+    try:
+        raise ConnectionError("upstream down")
+    except Exception:
+        assert fetcher.fallback('get_vix') == 15.0
+
+
+@pytest.mark.parametrize('errors', [(OUTAGE,), (NO_DATA,)])
+def test_empty_download_is_not_recorded_as_upstream_data(yahoo, fetcher, errors):
+    yahoo(Yahoo(*errors))
+    assert fetcher.get_vix() == 15.0
+    record = RECORDER.records()[-1]
+    assert record.getter == 'get_vix'
+    assert record.requests == {'yahoo': 1}
+    assert (record.sourced, record.substituted) == (False, True)
+
+
+def test_constant_fallback_marks_the_getter_substituted(fetcher):
+    assert fetcher.get_credit_spread() == 3.5
+    record = RECORDER.records()[-1]
+    assert (record.getter, record.substituted, record.reason) == ('get_credit_spread', True, 'get_credit_spread')
+
+
+def test_sample_data_uses_current_frequency_aliases(fetcher):
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        for name in ('get_gdp_data', 'get_inflation_data', 'get_m2_supply_data', 'get_ism_manufacturing'):
+            fetcher.fallback(name)
+
+
+def test_day_periods_are_trading_sessions(monkeypatch):
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=5 * 252)
+    history = pd.DataFrame({'Close': range(len(index))}, index=index, dtype=float)
+    windows = []
+
+    def download(tickers, period=None, start=None):
+        windows.append(period)
+        return {ticker: history for ticker in tickers}
+
+    monkeypatch.setattr(data_fetcher, '_download_panel', download)
+    registry = SeriesRegistry()
+    # The 5y superset is fetched once; narrower 'Nd' periods take its last N rows
+    for period, rows in (('252d', 252), ('5d', 5), ('300d', 300)):
+        panel = data_fetcher.download_price_panel(['^GSPC'], period, registry)
+        assert len(panel['^GSPC']) == rows
+        assert panel['^GSPC'].index[-1] == index[-1]
+    assert windows == ['5y']
+    # Without a superset the window fetched covers the sessions asked for
+    assert len(data_fetcher.download_price_panel(['SPY'], '252d', SeriesRegistry(supersets={}))['SPY']) == 252
@@ -0,0 +1,56 @@
+import sys
+import types
+import pytest
+from data_pipeline import derive_bundle, fetch_economic_data
+from indicator_graph import build_indicator_graph
+from refresher import Refresher
+from snapshot_store import SnapshotStore
+
+
+@pytest.fixture
+def no_calculator(monkeypatch):
+    # As in checkouts without the module: importing it fails
+    monkeypatch.setitem(sys.modules, 'fear_greed_calculator', None)
+
+
+@pytest.fixture
+def economic(offline):
+    return fetch_economic_data()
+
+
+def test_failing_indicator_is_left_out(economic, no_calculator, caplog):
+    derived = derive_bundle('economic', economic)
+    indicators = derived['indicators']
+    assert 'fear_greed' not in indicators
+    assert 'yield_spread' in indicators
+    assert 'Indicator fear_greed not derived' in caplog.text
+
+
+class Calculator:
+
+    def calculate(self, data):
+        return {'score': 42.0}
+
+
+def test_readers_compute_left_out_indicators(economic, no_calculator, monkeypatch):
+    indicators = derive_bundle('economic', economic)['indicators']
+    module = types.ModuleType('fear_greed_calculator')
+    module.FearGreedCalculator = Calculator
+    monkeypatch.setitem(sys.modules, 'fear_greed_calculator', module)
+    graph = build_indicator_graph()
+    graph.sync(economic, 1, indicators)
+    assert graph.value('fear_greed') == {'score': 42.0}
+    # Published indicators are taken as they are
+    assert graph.runs('yield_spread') == 0
+
+
+def test_refresher_publishes_despite_a_failing_indicator(economic, no_calculator, tmp_path):
+    snapshots = SnapshotStore(str(tmp_path))
+    refresher = Refresher(snapshots, {'economic': 3600, 'market': 1800})
+    refresher.store = None
+    refresher.bundles['economic'] = lambda registry, store: economic
+    manifest = refresher.refresh('economic')
+    _, data, derived = snapshots.load('economic', manifest)
+    assert set(data) == set(economic)
+    assert 'fear_greed' not in derived['indicators']
+    assert 'yield_spread' in derived['indicators']
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+from indicator_panel import IndicatorPanel
+from timeseries import TimeSeries
+
+
+def _monthly(n, start='2020-01-01'):
+    return TimeSeries(pd.date_range(start, periods=n, freq='MS'), np.arange(100.0, 100.0 + n),
+                      freq='monthly', name='M2SL')
+
+
+def test_change_is_year_over_year_on_the_monthly_calendar():
+    panel = IndicatorPanel.build({'m2_supply': _monthly(13)})
+    assert panel.change('m2_supply', 12) == pytest.approx(12.0)
+    # Not enough history: the default
+    assert panel.change('m2_supply', 13) == 0.0
+    assert panel.change('unknown', 12, default=None) is None
+
+
+def test_latest_reads_native_series_and_scalars():
+    panel = IndicatorPanel.build({'m2_supply': _monthly(3), 'vix': 15.0, 'flag': True})
+    assert panel.latest('m2_supply') == 102.0
+    assert panel.latest('vix') == 15.0
+    assert np.isnan(panel.latest('flag'))
+
+
+def test_quarterly_series_fill_the_following_months_only():
+    gdp = TimeSeries(pd.date_range('2020-01-01', periods=2, freq='QS'), np.array([1.0, 2.0]),
+                     freq='quarterly', name='GDP')
+    frame = IndicatorPanel.build({'gdp': gdp, 'm2_supply': _monthly(12)}).frame()
+    assert frame['gdp'].loc['2020-03-31'] == 1.0
+    assert frame['gdp'].loc['2020-06-30'] == 2.0
+    assert frame['gdp'].last_valid_index() < frame.index[-1]
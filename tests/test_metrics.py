@@ -0,0 +1,52 @@
+import logging
+import socket
+import pytest
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def no_server(monkeypatch):
+    for name in ('MACROCYCLE_METRICS_PORT', 'MACROCYCLE_METRICS_PORT_OFFSET', 'MACROCYCLE_METRICS_PORT_SPAN'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(metrics, '_server', None)
+    yield
+    if metrics._server is not None:
+        metrics._server.shutdown()
+        metrics._server.server_close()
+
+
+@pytest.fixture
+def taken():
+    # A listening socket holding a port, and the port after it (free, most likely)
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen()
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def test_disabled_without_a_port():
+    assert metrics.start_metrics_server() is None
+
+
+def test_taken_port_is_logged(taken, caplog):
+    with caplog.at_level(logging.WARNING, logger='macrocycle.metrics'):
+        assert metrics.start_metrics_server(taken, host='127.0.0.1') is None
+    assert f"127.0.0.1:{taken}-{taken}" in caplog.text
+
+
+def test_span_takes_the_next_free_port(taken):
+    server = metrics.start_metrics_server(taken, host='127.0.0.1', span=5)
+    assert server is not None
+    assert taken < server.server_address[1] < taken + 5
+    # Once per process
+    assert metrics.start_metrics_server(taken, host='127.0.0.1', span=5) is server
+
+
+def test_offset_from_the_environment(taken, monkeypatch):
+    monkeypatch.setenv('MACROCYCLE_METRICS_PORT', str(taken - 1))
+    monkeypatch.setenv('MACROCYCLE_METRICS_PORT_OFFSET', '1')
+    monkeypatch.setenv('MACROCYCLE_METRICS_PORT_SPAN', '4')
+    server = metrics.start_metrics_server(host='127.0.0.1')
+    assert server is not None
+    assert taken < server.server_address[1] < taken + 4
@@ -0,0 +1,84 @@
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import snapshot_format
+from price_store import MappedPriceHistory, PriceStore, open_history
+
+
+def _frame(values, start='2024-01-01'):
+    return pd.DataFrame({'Close': values}, index=pd.date_range(start, periods=len(values), freq='D'))
+
+
+def test_store_maps_closes(tmp_path):
+    store = PriceStore(tmp_path)
+    history = store.store({'SPY': _frame([1.0, 2.0, 3.0])})['SPY']
+    assert isinstance(history, MappedPriceHistory)
+    np.testing.assert_array_equal(history.closes, [1.0, 2.0, 3.0])
+    assert history.index[0] == pd.Timestamp('2024-01-01')
+    assert store.tickers == ['SPY']
+
+
+def test_published_windows_do_not_change(tmp_path):
+    store = PriceStore(tmp_path)
+    first = store.store({'SPY': _frame([1.0, 2.0, 3.0])})['SPY']
+    payload = snapshot_format.dumps({'SPY': first})
+    second = store.store({'SPY': _frame([1.5, 2.5, 3.5, 4.5])})['SPY']
+    assert second.generation == first.generation + 1
+    np.testing.assert_array_equal(first.closes, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(snapshot_format.loads(payload)['SPY'].closes, [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(second.closes, [1.5, 2.5, 3.5, 4.5])
+
+
+def test_unchanged_closes_reuse_the_generation(tmp_path):
+    store = PriceStore(tmp_path)
+    first = store.store({'SPY': _frame([1.0, 2.0, 3.0])})['SPY']
+    again = store.store({'SPY': _frame([2.0, 3.0], start='2024-01-02')})['SPY']
+    assert again.generation == first.generation
+    assert (again.start, again.stop) == (first.start + 1, first.stop)
+
+
+def test_new_generation_keeps_earlier_days(tmp_path):
+    store = PriceStore(tmp_path)
+    store.store({'SPY': _frame([1.0, 2.0])})
+    later = store.store({'SPY': _frame([5.0], start='2024-01-03')})['SPY']
+    wide = store.history('SPY', later.generation, later.start - 2, later.stop)
+    np.testing.assert_array_equal(wide.closes, [1.0, 2.0, 5.0])
+
+
+def test_superseded_generations_are_pruned(tmp_path):
+    store = PriceStore(tmp_path, retain=60)
+    first = store.store({'SPY': _frame([1.0])})['SPY']
+    second = store.store({'SPY': _frame([2.0])})['SPY']
+    # Within retention both generations are kept
+    assert os.path.exists(store._path('SPY', first.generation))
+    old = time.time() - 120
+    os.utime(store._path('SPY', second.generation), (old, old))
+    store.store({'SPY': _frame([3.0])})
+    assert not os.path.exists(store._path('SPY', first.generation))
+    assert os.path.exists(store._path('SPY', second.generation))
+    with pytest.raises(FileNotFoundError):
+        snapshot_format.loads(snapshot_format.dumps(first))
+    # Already mapped histories keep their closes
+    np.testing.assert_array_equal(first.closes, [1.0])
+
+
+def test_pickles_as_reference(tmp_path):
+    history = PriceStore(tmp_path).store({'QQQ': _frame([1.0, 2.0])})['QQQ']
+    result = pickle.loads(pickle.dumps(history))
+    assert isinstance(result, MappedPriceHistory)
+    np.testing.assert_array_equal(result.closes, history.closes)
+
+
+def test_open_history_raises_for_missing_store(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_history(str(tmp_path / 'elsewhere'), 'SPY', 1, 0, 10)
+    assert not os.path.exists(tmp_path / 'elsewhere')
+
+
+def test_days_outside_calendar_are_skipped(tmp_path):
+    store = PriceStore(tmp_path)
+    assert store.write('OLD', _frame([1.0], start='1980-01-01')['Close']) is None
+    assert store.tickers == []
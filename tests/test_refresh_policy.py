@@ -0,0 +1,30 @@
+from datetime import datetime
+import pandas as pd
+from refresh_policy import FREQUENCY_POLICIES, policy_for
+
+
+def _at(day):
+    return pd.Timestamp(day).timestamp()
+
+
+def test_monthly_release_is_due_after_the_next_period_ends():
+    # CPI for January is dated 2024-01-01; February's print lands mid-March
+    policy = policy_for('fred', 'CPIAUCSL')
+    assert datetime(2024, 3, 1) < policy.next_release('2024-01-01') < datetime(2024, 3, 31)
+    assert policy.is_fresh('2024-01-01', _at('2024-02-20'), now=_at('2024-02-25'))
+    # Once the release is due the series is re-checked every min_ttl
+    synced_at = _at('2024-03-20')
+    assert policy.next_refresh('2024-01-01', synced_at) == synced_at + policy.min_ttl
+
+
+def test_quarterly_release_is_due_after_the_next_quarter_ends():
+    # GDP for Q1 is dated 2024-01-01; Q2's advance estimate comes out at the end of July
+    policy = policy_for('fred', 'GDP')
+    assert datetime(2024, 7, 1) < policy.next_release('2024-01-01') < datetime(2024, 8, 15)
+    synced_at = _at('2024-05-01')
+    assert policy.next_refresh('2024-01-01', synced_at) == synced_at + policy.max_ttl
+
+
+def test_daily_observations_are_dated_at_the_day_they_cover():
+    policy = FREQUENCY_POLICIES['daily']
+    assert policy.next_release('2024-01-01') == datetime(2024, 1, 3)
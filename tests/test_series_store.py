@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+from rate_limiter import RateLimited
+from series_store import SeriesStore
+
+
+def _prices(closes, end):
+    index = pd.date_range(end=end, periods=len(closes), freq='D')
+    return pd.DataFrame({'Close': closes, 'Volume': np.ones(len(closes))}, index=index)
+
+
+class Upstream:
+    # Serves slices of a price history and records the starts asked for
+
+    def __init__(self, history):
+        self.history = history
+        self.starts = []
+
+    def __call__(self, start):
+        self.starts.append(start)
+        if start is None:
+            return self.history
+        return self.history[self.history.index >= pd.Timestamp(start)]
+
+    def many(self, ids, start):
+        return {series_id: self(start) for series_id in ids}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SeriesStore(str(tmp_path), policy=None)
+
+
+def test_delta_sync_only_fetches_the_tail(store):
+    today = pd.Timestamp.now().normalize()
+    upstream = Upstream(_prices(np.arange(100.0, 160.0), today - pd.Timedelta(days=1)))
+    store.sync('yahoo', 'SPY', None, upstream)
+    upstream.history = _prices(np.arange(100.0, 161.0), today)
+    result = store.sync('yahoo', 'SPY', None, upstream)
+    assert upstream.starts[0] is None and upstream.starts[1] is not None
+    pd.testing.assert_frame_equal(result, upstream.history, check_freq=False)
+
+
+def test_restated_prices_are_refetched_in_full(store):
+    today = pd.Timestamp.now().normalize()
+    upstream = Upstream(_prices(np.arange(100.0, 160.0), today - pd.Timedelta(days=1)))
+    store.sync('yahoo', 'SPY', None, upstream)
+    # A dividend: every earlier close is scaled down on the new basis
+    restated = _prices(np.arange(100.0, 161.0), today)
+    restated.loc[restated.index < today, 'Close'] *= 0.98
+    upstream.history = restated
+    result = store.sync('yahoo', 'SPY', None, upstream)
+    assert upstream.starts[-1] is None
+    pd.testing.assert_frame_equal(result, restated, check_freq=False)
+
+
+def test_restated_prices_in_a_batch(store):
+    today = pd.Timestamp.now().normalize()
+    upstream = Upstream(_prices(np.arange(100.0, 160.0), today - pd.Timedelta(days=1)))
+    store.sync_many('yahoo', ['SPY', 'QQQ'], None, upstream.many)
+    restated = _prices(np.arange(100.0, 161.0), today)
+    restated.loc[restated.index < today, 'Close'] *= 0.5
+    upstream.history = restated
+    results = store.sync_many('yahoo', ['SPY', 'QQQ'], None, upstream.many)
+    for ticker in ('SPY', 'QQQ'):
+        pd.testing.assert_frame_equal(results[ticker], restated, check_freq=False)
+
+
+def test_revisions_of_other_sources_are_merged(store):
+    today = pd.Timestamp.now().normalize()
+    index = pd.date_range(end=today - pd.Timedelta(days=1), periods=30, freq='D')
+    calls = []
+
+    def loader(start):
+        calls.append(start)
+        values = pd.Series(np.arange(30.0), index=index) if start is None else pd.Series([99.0, 100.0], index=[index[-1], today])
+        return values
+
+    store.sync('fred', 'DFF', None, loader)
+    result = store.sync('fred', 'DFF', None, loader)
+    assert len(calls) == 2
+    assert result.iloc[-2:].tolist() == [99.0, 100.0]
+
+
+def test_empty_full_sync_keeps_the_stored_copy(store):
+    today = pd.Timestamp.now().normalize()
+    upstream = Upstream(_prices(np.arange(100.0, 110.0), today))
+    before = store.sync('yahoo', 'SPY', 5, upstream)
+    # A wider window is a full sync; upstream returning nothing must not wipe the store
+    pd.testing.assert_frame_equal(store.sync('yahoo', 'SPY', 30, lambda start: None), before, check_freq=False)
+    stored, _ = store.read('yahoo', 'SPY')
+    pd.testing.assert_frame_equal(stored, before, check_freq=False)
+    assert store.sync('yahoo', 'NEW', 30, lambda start: None) is None
+    assert store.read('yahoo', 'NEW') == (None, None)
+
+
+def test_throttled_sync_serves_stored_copy(store):
+    today = pd.Timestamp.now().normalize()
+    upstream = Upstream(_prices(np.arange(100.0, 110.0), today))
+    store.sync('yahoo', 'SPY', None, upstream)
+
+    def throttled(start):
+        raise RateLimited("yahoo is throttling requests")
+
+    assert len(store.sync('yahoo', 'SPY', None, throttled)) == 10
+    with pytest.raises(RateLimited):
+        store.sync('yahoo', 'QQQ', None, throttled)
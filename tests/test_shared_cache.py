@@ -0,0 +1,129 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import shared_cache
+from shared_cache import HostSnapshotCache, SQLiteSnapshotStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteSnapshotStore(str(tmp_path / 'cache.db'))
+
+
+def _series(value):
+    return pd.Series([value, value + 1.0], index=pd.date_range('2024-01-01', periods=2, freq='D'))
+
+
+def test_publish_and_load(store):
+    manifest = store.publish('economic', {'gdp': _series(1.0), 'label': 'x'}, derived={'panel': [1, 2]})
+    loaded_manifest, data, derived = store.load('economic')
+    assert loaded_manifest == manifest
+    pd.testing.assert_series_equal(data['gdp'], _series(1.0))
+    assert data['label'] == 'x'
+    assert derived == {'panel': [1, 2]}
+
+
+def test_version_moves_only_on_change(store):
+    first = store.publish('economic', {'gdp': _series(1.0)})
+    same = store.publish('economic', {'gdp': _series(1.0)})
+    changed = store.publish('economic', {'gdp': _series(2.0)})
+    assert first['version'] == same['version'] == changed['version'] - 1
+
+
+def test_load_nothing_published(store):
+    assert store.load('market') is None
+
+
+def test_dropped_series_are_kept_from_the_publish_that_dropped_them(store, monkeypatch):
+    # Published long ago and superseded now: still loadable within the retention window
+    old = store.publish('economic', {'gdp': _series(1.0)}, created_at=time.time() - 10 * shared_cache.RETAIN_SECONDS)
+    store.publish('economic', {'gdp': _series(2.0)})
+    _, data, _ = store.load('economic', old)
+    pd.testing.assert_series_equal(data['gdp'], _series(1.0))
+
+    # Once retention has passed since the drop, the next publish prunes it
+    monkeypatch.setattr(shared_cache, 'RETAIN_SECONDS', -1)
+    store.publish('economic', {'gdp': _series(3.0)})
+    count = store._connection().execute('SELECT COUNT(*) FROM series').fetchone()[0]
+    assert count == 1
+
+
+def test_load_retries_with_current_manifest_when_members_are_pruned(store, monkeypatch):
+    old = store.publish('economic', {'gdp': _series(1.0)})
+    monkeypatch.setattr(shared_cache, 'RETAIN_SECONDS', -1)
+    store.publish('economic', {'gdp': _series(2.0)})
+    manifest, data, _ = store.load('economic', old)
+    assert manifest['version'] == old['version'] + 1
+    pd.testing.assert_series_equal(data['gdp'], _series(2.0))
+
+
+def test_opens_databases_without_referenced_at(tmp_path):
+    import sqlite3
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(shared_cache.SCHEMA.replace(',\n    referenced_at REAL NOT NULL DEFAULT 0', ''))
+    conn.close()
+    store = SQLiteSnapshotStore(path)
+    store.publish('economic', {'gdp': _series(1.0)})
+    assert store.load('economic')[1]['gdp'].iloc[0] == 1.0
+
+
+def test_lease_is_exclusive(store):
+    def acquire_elsewhere():
+        results.append(store.acquire('economic', ttl=60))
+
+    results = []
+    assert store.acquire('economic', ttl=60)
+    thread = threading.Thread(target=acquire_elsewhere)
+    thread.start()
+    thread.join()
+    store.release('economic')
+    thread = threading.Thread(target=acquire_elsewhere)
+    thread.start()
+    thread.join()
+    assert results == [False, True]
+
+
+def test_host_cache_fetches_once_and_shares(store):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {'gdp': _series(float(len(calls)))}
+
+    first = HostSnapshotCache(store, 'economic', loader, max_age=3600,
+                              derive=lambda name, data: {'latest': float(data['gdp'].iloc[-1])})
+    second = HostSnapshotCache(store, 'economic', loader, max_age=3600)
+    assert first.get().data['gdp'].iloc[0] == 1.0
+    snapshot = second.get()
+    assert snapshot.data['gdp'].iloc[0] == 1.0
+    assert snapshot.derive('latest', lambda data: np.nan) == 2.0
+    assert len(calls) == 1
+
+
+def test_failing_derive_still_publishes(store, caplog):
+    def derive(name, data):
+        raise ImportError("No module named 'fear_greed_calculator'")
+
+    cache = HostSnapshotCache(store, 'economic', lambda: {'gdp': _series(1.0)}, max_age=3600, derive=derive)
+    assert cache.get().data['gdp'].iloc[0] == 1.0
+    assert store.latest('economic')['version'] == 1
+    assert store.load('economic')[2] == {}
+    assert 'storing it without them' in caplog.text
+
+
+def test_unchanged_refresh_resets_the_age_readers_show(store):
+    store.publish('economic', {'gdp': _series(1.0)}, created_at=time.time() - 1800)
+    reader = HostSnapshotCache(store, 'economic', lambda: {'gdp': _series(1.0)}, max_age=3600, poll_interval=0)
+    snapshot = reader.get()
+    assert snapshot.age > 1700
+    # Another process refreshes: same content, so the version stays
+    manifest = store.publish('economic', {'gdp': _series(1.0)})
+    assert manifest['version'] == reader.published_version
+    reader.refresh(wait=True)
+    current = reader.get()
+    assert current.age < 60
+    assert current.version == snapshot.version
+    assert current.data is snapshot.data
@@ -0,0 +1,165 @@
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+import snapshot_format
+from price_store import MappedPriceHistory, PriceStore
+from timeseries import PriceHistory, TimeSeries
+
+
+def _daily(n, start='2024-01-01'):
+    return pd.date_range(start, periods=n, freq='D')
+
+
+def _roundtrip(value, compression=None, tmp_path=None):
+    if tmp_path is None:
+        return snapshot_format.loads(snapshot_format.dumps(value, compression=compression))
+    path = tmp_path / 'bundle.arrow'
+    snapshot_format.dump(value, path, compression=compression)
+    return snapshot_format.load(path)
+
+
+@pytest.mark.parametrize('value', [
+    None, True, 3, 2.5, 'text', [1, 'a', None],
+    {'a': 1, 2: 'b', ('x', 1): [1.5]},
+    (1, (2, 3)),
+    np.float64(1.25), np.int32(7), np.bool_(True),
+    pd.Timestamp('2024-03-01 12:30'),
+])
+def test_scalars_and_containers(value):
+    result = _roundtrip(value)
+    assert result == value
+    assert type(result) is type(value)
+
+
+def test_time_series():
+    ts = TimeSeries(_daily(4), [1.0, np.nan, 3.0, 4.0], freq='daily', name='GDP', value_name='gdp')
+    result = _roundtrip(ts)
+    assert isinstance(result, TimeSeries)
+    np.testing.assert_array_equal(result.timestamps, ts.timestamps)
+    np.testing.assert_array_equal(result.values, ts.values)
+    assert (result.freq, result.name, result.value_name) == ('daily', 'GDP', 'gdp')
+
+
+def test_price_history():
+    history = PriceHistory(_daily(3), np.array([1, 2, np.nan], dtype=np.float32), 'SPY')
+    result = _roundtrip(history)
+    assert type(result) is PriceHistory
+    assert result.closes.dtype == np.float32
+    np.testing.assert_array_equal(result.closes, history.closes)
+    np.testing.assert_array_equal(result.timestamps, history.timestamps)
+    assert result.ticker == 'SPY'
+
+
+def test_mapped_price_history_is_a_reference(tmp_path):
+    store = PriceStore(tmp_path / 'prices')
+    history = store.store({'SPY': pd.DataFrame({'Close': [1.0, 2.0, 3.0]}, index=_daily(3))})['SPY']
+    assert isinstance(history, MappedPriceHistory)
+    payload = snapshot_format.dumps(history)
+    assert len(payload) < 2048
+    result = snapshot_format.loads(payload)
+    assert isinstance(result, MappedPriceHistory)
+    np.testing.assert_array_equal(result.closes, [1.0, 2.0, 3.0])
+    assert (result.root, result.ticker, result.start, result.stop) == (
+        history.root, history.ticker, history.start, history.stop)
+
+
+@pytest.mark.parametrize('index', [
+    pd.RangeIndex(2, 8, 2, name='n'),
+    _daily(3),
+    pd.DatetimeIndex(['2024-01-01', '2024-01-05', '2024-02-01'], name='date'),
+])
+def test_data_frame(index):
+    frame = pd.DataFrame({'Close': [1.0, 2.0, np.nan], 'Volume': np.array([1, 2, 3], dtype=np.int64),
+                          'Flag': [True, False, True]}, index=index)
+    frame['When'] = pd.to_datetime(['2020-01-01', '2020-06-01', '2021-01-01'])
+    result = _roundtrip(frame)
+    pd.testing.assert_frame_equal(result, frame)
+    assert getattr(result.index, 'freq', None) == getattr(frame.index, 'freq', None)
+
+
+def test_empty_data_frame():
+    frame = pd.DataFrame(index=_daily(0))
+    pd.testing.assert_frame_equal(_roundtrip(frame), frame)
+
+
+def test_series():
+    series = pd.Series([1.0, 2.0], index=_daily(2), name='cpi')
+    result = _roundtrip(series)
+    pd.testing.assert_series_equal(result, series)
+    assert result.index.freqstr == 'D'
+
+
+def test_ndarray():
+    values = np.arange(5, dtype=np.int16)
+    result = _roundtrip(values)
+    assert result.dtype == np.int16
+    np.testing.assert_array_equal(result, values)
+
+
+def test_unencodable_values_are_pickled():
+    value = {'frame': pd.DataFrame({'label': ['a', 'b']}), 'set': {1, 2}}
+    result = _roundtrip(value)
+    pd.testing.assert_frame_equal(result['frame'], value['frame'])
+    assert result['set'] == {1, 2}
+
+
+def test_empty_array_does_not_alias_the_next():
+    # Both refs start at the same offset of the float64 buffer
+    value = {'empty': np.array([], dtype=np.float64), 'full': np.array([1.0, 2.0])}
+    result = _roundtrip(value)
+    assert len(result['empty']) == 0
+    np.testing.assert_array_equal(result['full'], [1.0, 2.0])
+
+
+def test_empty_series_before_full_ones():
+    value = {'empty': TimeSeries(_daily(0), []), 'full': TimeSeries(_daily(2), [1.0, 2.0])}
+    result = _roundtrip(value)
+    assert result['empty'].empty
+    np.testing.assert_array_equal(result['full'].values, [1.0, 2.0])
+
+
+def test_shared_arrays_are_stored_once():
+    panel = PriceHistory.panel({ticker: pd.DataFrame({'Close': np.arange(1000, dtype=float)}, index=_daily(1000))
+                                for ticker in ('SPY', 'QQQ', 'IWM')})
+    single = snapshot_format.dumps({'SPY': panel['SPY']}, compression=None)
+    shared = snapshot_format.dumps(panel, compression=None)
+    # Dates are shared, so each extra history only adds its float32 closes
+    assert len(shared) - len(single) < 2 * 1000 * 8
+    result = snapshot_format.loads(shared)
+    assert result['SPY'].timestamps is result['QQQ'].timestamps
+    np.testing.assert_array_equal(result['IWM'].closes, panel['IWM'].closes)
+
+
+def test_duplicate_arrays():
+    values = np.array([1.0, 2.0, 3.0])
+    series = pd.Series(values, index=_daily(3))
+    value = {'a': values, 'b': values, 'series': series, 'same_series': series, 'copy': values.copy()}
+    result = _roundtrip(value)
+    for key in ('a', 'b', 'copy'):
+        np.testing.assert_array_equal(result[key], values)
+    pd.testing.assert_series_equal(result['same_series'], series)
+    assert result['series'].index is result['same_series'].index
+
+
+@pytest.mark.parametrize('compression', snapshot_format.CODECS)
+def test_compression(compression, tmp_path):
+    value = {'frame': pd.DataFrame({'Close': np.linspace(0, 1, 500)}, index=_daily(500)),
+             'series': TimeSeries(_daily(500), np.linspace(1, 2, 500), freq='daily')}
+    for result in (_roundtrip(value, compression), _roundtrip(value, compression, tmp_path)):
+        pd.testing.assert_frame_equal(result['frame'], value['frame'])
+        np.testing.assert_array_equal(result['series'].values, value['series'].values)
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        snapshot_format.dumps({}, compression='gzip')
+
+
+def test_legacy_pickles(tmp_path):
+    value = {'frame': pd.DataFrame({'Close': [1.0]})}
+    payload = pickle.dumps(value)
+    pd.testing.assert_frame_equal(snapshot_format.loads(payload)['frame'], value['frame'])
+    path = tmp_path / 'legacy.pkl'
+    path.write_bytes(payload)
+    pd.testing.assert_frame_equal(snapshot_format.load(path)['frame'], value['frame'])
@@ -0,0 +1,59 @@
+import pickle
+import numpy as np
+import pandas as pd
+from timeseries import PriceHistory, TimeSeries
+
+
+def _series(n=5):
+    return TimeSeries(pd.date_range('2024-01-01', periods=n, freq='D'), np.arange(n, dtype=float),
+                      freq='daily', name='TEST')
+
+
+def _history():
+    closes = np.array([1.0, np.nan, 3.0, 4.0], dtype=np.float32)
+    return PriceHistory(pd.date_range('2024-01-01', periods=4, freq='D'), closes, 'SPY')
+
+
+def test_timeseries_proxies_dataframe_attributes_from_one_frame():
+    ts = _series()
+    assert ts.iloc[-1]['value'] == 4.0
+    frame = ts._frame
+    assert frame is not None
+    assert ts.dropna().shape == (5, 2)
+    assert ts._frame is frame
+    # The frame wraps the arrays rather than copying them
+    assert np.shares_memory(frame['value'].to_numpy(), ts.values)
+
+
+def test_timeseries_to_frame_is_not_the_cached_frame():
+    ts = _series()
+    ts.iloc
+    frame = ts.to_frame()
+    frame['value'] = 0.0
+    assert ts.iloc[-1]['value'] == 4.0
+
+
+def test_slices_do_not_share_the_cached_frame():
+    ts = _series()
+    ts.iloc
+    assert len(ts.tail(2).iloc[:]) == 2
+
+
+def test_price_history_builds_its_series_once():
+    history = _history()
+    series = history.to_series()
+    assert history['Close'] is series
+    assert history.index is series.index
+    assert list(series) == [1.0, 3.0, 4.0]
+    assert history.iloc[-1]['Close'] == 4.0
+    assert history._frame is not None
+    assert history.tail(1)['Close'].iloc[0] == 4.0
+
+
+def test_cached_views_are_not_pickled():
+    ts, history = _series(), _history()
+    ts.iloc, history.iloc
+    ts_copy, history_copy = pickle.loads(pickle.dumps((ts, history)))
+    assert ts_copy._frame is None and history_copy._series is None
+    np.testing.assert_array_equal(ts_copy.values, ts.values)
+    np.testing.assert_array_equal(history_copy.closes, history.closes)
@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_int64_timestamps(timestamps):
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype == np.int64:
+        return timestamps
+    index = pd.DatetimeIndex(timestamps)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+class TimeSeries:
+    """
+    Compact, immutable-by-convention dated series.
+
+    Holds int64 nanosecond timestamps and float64 values in two contiguous NumPy arrays plus
+    its native frequency ('daily', 'weekly', 'monthly', 'quarterly' or None). Latest-value
+    access is O(1) and conversion to pandas (to_series, to_frame, ts['date'], ts['value'])
+    wraps the arrays without copying.
+
+    For existing consumers it behaves like the two-column DataFrame the getters used to
+    return: ts['date'] / ts['value'] give columns, len() and .empty work, slices and boolean
+    masks give TimeSeries, and any other DataFrame attribute (.iloc, .dropna, ...) is served
+    from a zero-copy DataFrame view, built on first use and kept.
+    """
+    __slots__ = ('timestamps', 'values', 'freq', 'name', 'value_name', '_frame')
+
+    def __init__(self, timestamps, values, freq=None, name=None, value_name='value'):
+        self.timestamps = np.ascontiguousarray(_as_int64_timestamps(timestamps))
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        if self.timestamps.shape != self.values.shape or self.values.ndim != 1:
+            raise ValueError("timestamps and values must be 1-D arrays of equal length")
+        self.freq = freq
+        self.name = name
+        self.value_name = value_name
+        self._frame = None
+
+    @classmethod
+    def from_series(cls, series, freq=None, name=None, value_name='value'):
+        """Build from a pandas Series indexed by date"""
+        return cls(series.index, series.to_numpy(dtype=np.float64, na_value=np.nan), freq=freq,
+                   name=name if name is not None else series.name, value_name=value_name)
+
+    @classmethod
+    def from_frame(cls, frame, value_column='value', date_column='date', freq=None, name=None):
+        """Build from a DataFrame with a date column and one value column"""
+        return cls(frame[date_column], frame[value_column].to_numpy(dtype=np.float64, na_value=np.nan),
+                   freq=freq, name=name, value_name=value_column)
+
+    # Cheap accessors -------------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def empty(self):
+        return len(self.values) == 0
+
+    @property
+    def shape(self):
+        return (len(self.values), 2)
+
+    @property
+    def latest(self):
+        """Most recent value, or NaN if the series is empty"""
+        return self.values[-1] if len(self.values) else np.nan
+
+    @property
+    def latest_date(self):
+        return pd.Timestamp(self.timestamps[-1]) if len(self.timestamps) else None
+
+    def _with(self, timestamps, values):
+        return TimeSeries(timestamps, values, self.freq, self.name, self.value_name)
+
+    def tail(self, n=5):
+        return self._with(self.timestamps[-n:] if n else self.timestamps[:0], self.values[-n:] if n else self.values[:0])
+
+    def head(self, n=5):
+        return self._with(self.timestamps[:n], self.values[:n])
+
+    def copy(self):
+        return self._with(self.timestamps.copy(), self.values.copy())
+
+    # pandas views (no copies of the underlying arrays) ----------------------------------------
+
+    @property
+    def dates(self):
+        return self.timestamps.view('datetime64[ns]')
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self.dates, copy=False)
+
+    @property
+    def columns(self):
+        return pd.Index(['date', self.value_name])
+
+    def to_series(self):
+        return pd.Series(self.values, index=self.index, name=self.name, copy=False)
+
+    def to_frame(self):
+        return pd.DataFrame({'date': self.dates, self.value_name: self.values}, copy=False)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == 'date':
+                return pd.Series(self.dates, name='date', copy=False)
+            if key == self.value_name:
+                return pd.Series(self.values, name=self.value_name, copy=False)
+            raise KeyError(key)
+        if isinstance(key, pd.Series):
+            key = key.to_numpy()
+        return self._with(self.timestamps[key], self.values[key])
+
+    def __contains__(self, column):
+        return column in ('date', self.value_name)
+
+    def __iter__(self):
+        # Iterates column labels, like a DataFrame
+        return iter(('date', self.value_name))
+
+    def __getattr__(self, attr):
+        # Anything else is answered by the equivalent DataFrame; never for slots or dunders,
+        # which would recurse while unpickling
+        if attr.startswith('__') or attr in TimeSeries.__slots__:
+            raise AttributeError(attr)
+        if self._frame is None:
+            # Kept, since callers tend to reach for several attributes in a row (.iloc, .dropna, ...)
+            self._frame = self.to_frame()
+        return getattr(self._frame, attr)
+
+    def __reduce__(self):
+        return (TimeSeries, (self.timestamps, self.values, self.freq, self.name, self.value_name))
+
+    def __repr__(self):
+        span = '' if self.empty else f", {pd.Timestamp(self.timestamps[0]):%Y-%m-%d}..{self.latest_date:%Y-%m-%d}, latest={self.latest:g}"
+        return f"TimeSeries({self.name or self.value_name!s}, n={len(self)}, freq={self.freq}{span})"
+
+
+class PriceHistory:
+    """
+    Daily closes of one ticker: a contiguous float32 array on an int64 nanosecond date index.
+
+    Tickers downloaded in one panel share a single date index array (days a ticker did not
+    trade hold NaN), so a bundle of sectors pickles the dates once. Stands in for the OHLCV
+    DataFrame the market bundle used to carry: .empty, len(), .index and ['Close'] work as
+    before, and other DataFrame attributes are served from a one-column Close frame. The Close
+    series and frame are built on first use and kept, so treat them as read-only. Open,
+    High, Low and Volume are not kept; fetch them with MarketDataFetcher.get_market_index_data
+    when a chart needs them.
+    """
+    __slots__ = ('timestamps', 'closes', 'ticker', '_series', '_frame')
+
+    def __init__(self, timestamps, closes, ticker=None):
+        self.timestamps = np.ascontiguousarray(_as_int64_timestamps(timestamps))
+        self.closes = np.ascontiguousarray(closes, dtype=np.float32)
+        if self.timestamps.shape != self.closes.shape or self.closes.ndim != 1:
+            raise ValueError("timestamps and closes must be 1-D arrays of equal length")
+        self.ticker = ticker
+        self._series = None
+        self._frame = None
+
+    @classmethod
+    def panel(cls, frames):
+        """
+        Close histories of several tickers on one shared date index.
+
+        Args:
+            frames: Dict mapping ticker to its OHLCV DataFrame
+
+        Returns:
+            Dict mapping each ticker to its PriceHistory
+        """
+        closes = pd.DataFrame({ticker: frame['Close'] for ticker, frame in frames.items()})
+        if closes.empty:
+            return {}
+        timestamps = np.ascontiguousarray(_as_int64_timestamps(closes.index))
+        return {ticker: cls(timestamps, closes[ticker].to_numpy(dtype=np.float32, na_value=np.nan), ticker)
+                for ticker in closes.columns}
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self.closes)))
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def nbytes(self):
+        return self.timestamps.nbytes + self.closes.nbytes
+
+    def to_series(self):
+        if self._series is None:
+            series = pd.Series(self.closes, index=pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'), copy=False),
+                               name='Close', copy=False)
+            self._series = series.dropna() if np.isnan(self.closes).any() else series
+        return self._series
+
+    @property
+    def index(self):
+        return self.to_series().index
+
+    def __getitem__(self, key):
+        if key == 'Close':
+            return self.to_series()
+        raise KeyError(f"{key} is not kept in the market bundle; only Close is")
+
+    def __contains__(self, column):
+        return column == 'Close'
+
+    def __getattr__(self, attr):
+        if attr.startswith('__') or attr in PriceHistory.__slots__:
+            raise AttributeError(attr)
+        if self._frame is None:
+            self._frame = self.to_series().to_frame()
+        return getattr(self._frame, attr)
+
+    def __reduce__(self):
+        return (PriceHistory, (self.timestamps, self.closes, self.ticker))
+
+    def __repr__(self):
+        series = self.to_series()
+        span = '' if series.empty else f", {series.index[0]:%Y-%m-%d}..{series.index[-1]:%Y-%m-%d}, latest={series.iloc[-1]:g}"
+        return f"PriceHistory({self.ticker}, n={len(series)}{span})"